@@ -0,0 +1,523 @@
+"""
+Asyncio counterpart of BingImageScraper.
+Searches, probes and downloads with non-blocking HTTP (aiohttp by default),
+so image lookups can overlap Gemini generation inside one event loop without
+a thread per request. Filtering, caching, probing and the image store follow
+the same rules as bingimage.BingImageScraper.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from config import Config
+from cache import DiskCache
+from backends import AiohttpBackend
+from bingparse import BingImageResult, extract_image_results
+from bingimage import (BROWSER_HEADERS, search_page_url, usable_results, search_cache_key,
+                       merge_result_pages, probe_rejection)
+from imageproc import ImageProcessor, is_near_duplicate
+from imagestore import ImageStore
+from utils import clean_filename, is_valid_image_url
+
+
+class AsyncHostLimiter:
+    """Per-host politeness limits for coroutines (same rules as bingimage.HostLimiter)."""
+
+    def __init__(self, max_concurrent=2, min_interval=0.5):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Wait for a request slot on the URL's host."""
+        host = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrent))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+class AsyncBingImageScraper:
+    """Bing image search, probing and downloading on asyncio."""
+
+    # Bytes requested by the ranged GET fallback of probe_image_url
+    PROBE_BYTES = 1024
+
+    def __init__(self, backend=None, cache=None, store=None, max_concurrency=None):
+        """
+        Args:
+            backend (AsyncHttpBackend): HTTP backend (default: aiohttp)
+            cache (DiskCache): Search result cache; None for the default, False to disable
+            store (ImageStore): Image store; None for the default, False to disable
+            max_concurrency (int): Requests in flight at once (default: IMAGE_ASYNC_CONCURRENCY)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = Config()
+        self.max_concurrency = max_concurrency or self.config.IMAGE_ASYNC_CONCURRENCY
+        self.backend = backend or AiohttpBackend(
+            BROWSER_HEADERS,
+            limit=self.max_concurrency,
+            limit_per_host=self.config.IMAGE_HTTP_POOL_SIZE
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.host_limiter = AsyncHostLimiter(
+            self.config.IMAGE_HOST_CONCURRENCY,
+            self.config.IMAGE_HOST_MIN_INTERVAL
+        )
+        # CPU work runs on the process pool and blocking calls (image decoding for the
+        # fingerprint, SQLite cache and store, file writes) on worker threads, so
+        # coroutines only await futures
+        self.image_processor = ImageProcessor(
+            widths=self.config.IMAGE_VARIANT_WIDTHS,
+            formats=self.config.IMAGE_VARIANT_FORMATS,
+            max_size=self.config.IMAGE_MAX_SIZE,
+            jpeg_quality=self.config.IMAGE_JPEG_QUALITY,
+            webp_quality=self.config.IMAGE_WEBP_QUALITY,
+            max_workers=self.config.IMAGE_PROCESS_WORKERS or None
+        )
+
+        self.cache = cache or None
+        self._owns_cache = False
+        if cache is None and self.config.IMAGE_SEARCH_CACHE_ENABLED:
+            try:
+                self.cache = DiskCache(
+                    self.config.IMAGE_SEARCH_CACHE_PATH,
+                    max_bytes=self.config.IMAGE_SEARCH_CACHE_MAX_BYTES,
+                    ttl_seconds=self.config.IMAGE_SEARCH_CACHE_TTL,
+                    memory_entries=self.config.IMAGE_SEARCH_CACHE_MEMORY_ENTRIES
+                )
+                self._owns_cache = True
+            except Exception as e:
+                self.logger.warning(f"Image search cache disabled: {str(e)}")
+
+        self.store = store or None
+        self._owns_store = False
+        if store is None and self.config.IMAGE_STORE_ENABLED:
+            try:
+                self.store = ImageStore(
+                    self.config.IMAGE_STORE_DIR,
+                    match_distance=self.config.IMAGE_STORE_MATCH_DISTANCE
+                )
+                self._owns_store = True
+            except Exception as e:
+                self.logger.warning(f"Image store disabled: {str(e)}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _request(self, method, url, headers=None, timeout=30, max_bytes=None):
+        """Send a request within the scraper-wide concurrency limit."""
+        async with self._semaphore:
+            return await self.backend.request(method, url, headers=headers, timeout=timeout, max_bytes=max_bytes)
+
+    @staticmethod
+    async def _cancel(tasks):
+        """Cancel unfinished tasks and wait until they are gone."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch_result_page(self, query, first):
+        """Fetch one Bing result page and keep the usable image results."""
+        response = await self._request("GET", search_page_url(query, first))
+        response.raise_for_status()
+        return usable_results(extract_image_results(response.content))
+
+    async def search_image_results(self, query, max_images=10):
+        """
+        Search for images on Bing, keeping thumbnail URL, title and dimensions.
+
+        Same caching and pagination rules as BingImageScraper.search_image_results;
+        pages are fetched as concurrent tasks.
+
+        Args:
+            query (str): Search query
+            max_images (int): Maximum number of images to find
+
+        Returns:
+            list: List of BingImageResult objects
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = search_cache_key(query, max_images)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self.logger.debug(f"Image search served from cache: {query}")
+                return [BingImageResult.from_dict(item) for item in cached]
+
+        try:
+            self.logger.info(f"Searching for images: {query}")
+            results = await self._search_pages(query, max_images)
+
+            self.logger.info(f"Found {len(results)} image URLs")
+            if cache_key is not None and results:
+                await asyncio.to_thread(self.cache.set, cache_key, [result.to_dict() for result in results])
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error searching images: {str(e)}")
+            return []
+
+    async def _search_pages(self, query, max_images):
+        """Collect ``max_images`` results from as many result pages as needed."""
+        page_size = self.config.IMAGE_SEARCH_PAGE_SIZE
+        max_pages = max(1, self.config.IMAGE_SEARCH_MAX_PAGES)
+        wanted_pages = min(max_pages, max(1, -(-max_images * 2 // page_size)))
+
+        async def fetch(page):
+            try:
+                return page, await self._fetch_result_page(query, 1 + page * page_size), None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return page, None, e
+
+        pages = {}
+        errors = []
+        next_page = 0
+        while True:
+            batch = range(next_page, min(next_page + wanted_pages, max_pages))
+            tasks = [asyncio.ensure_future(fetch(page)) for page in batch]
+            next_page += len(tasks)
+            try:
+                for done in asyncio.as_completed(tasks):
+                    page, page_results, error = await done
+                    if error is not None:
+                        errors.append(error)
+                        self.logger.warning(f"Error fetching result page {page + 1} for {query}: {str(error)}")
+                        continue
+                    pages[page] = page_results
+                    if len(merge_result_pages(pages, max_images)) >= max_images:
+                        return merge_result_pages(pages, max_images)
+            finally:
+                await self._cancel([task for task in tasks if not task.done()])
+
+            # Not enough yet: stop when out of pages or Bing ran out of results
+            if next_page >= max_pages or not pages or any(not pages.get(page, [True]) for page in batch):
+                break
+
+        if not pages and errors:
+            raise errors[0]
+        return merge_result_pages(pages, max_images)
+
+    async def search_images(self, query, max_images=10):
+        """
+        Search for images on Bing.
+
+        Returns:
+            list: List of image URLs
+        """
+        return [result.murl for result in await self.search_image_results(query, max_images)]
+
+    async def probe_image_url(self, url, timeout=None):
+        """
+        Check that a hotlinked image is alive, is an image and is not too large.
+
+        HEAD first, small ranged GET when HEAD is refused or incomplete
+        (see BingImageScraper.probe_image_url).
+
+        Returns:
+            bool: True if the URL can be hotlinked
+        """
+        if timeout is None:
+            timeout = self.config.IMAGE_PROBE_TIMEOUT
+
+        try:
+            async with self.host_limiter.slot(url):
+                response = await self._request("HEAD", url, timeout=timeout)
+                status = response.status_code
+                content_type = response.headers.get('content-type', '').lower()
+                size = response.headers.get('content-length')
+
+                if status in (404, 410):
+                    self.logger.debug(f"Image probe rejected {url}: HTTP {status}")
+                    return False
+
+                first_bytes = b''
+                if status >= 400 or not content_type.startswith('image/') or not size:
+                    # Many hosts refuse HEAD or omit headers; ask for the first bytes only
+                    response = await self._request(
+                        "GET", url, timeout=timeout, max_bytes=self.PROBE_BYTES,
+                        headers={'Range': f'bytes=0-{self.PROBE_BYTES - 1}'}
+                    )
+                    status = response.status_code
+                    content_type = response.headers.get('content-type', '').lower()
+                    content_range = response.headers.get('content-range', '')
+                    if '/' in content_range:
+                        size = content_range.rsplit('/', 1)[1]
+                    else:
+                        size = response.headers.get('content-length')
+                    first_bytes = response.content[:self.PROBE_BYTES]
+
+            rejection = probe_rejection(status, content_type, size, first_bytes, self.config.IMAGE_MAX_BYTES)
+            if rejection:
+                self.logger.debug(f"Image probe rejected {url}: {rejection}")
+                return False
+            return True
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.debug(f"Image probe failed for {url}: {str(e)}")
+            return False
+
+    async def verify_image_urls(self, urls, max_images, budget=None):
+        """
+        Probe image URLs concurrently and keep the ones that can be hotlinked.
+
+        Stops at ``max_images`` good URLs or when the time budget is used up.
+
+        Returns:
+            list: Verified URLs in their original order
+        """
+        if not urls:
+            return []
+        if budget is None:
+            budget = self.config.IMAGE_PROBE_BUDGET
+
+        started = time.monotonic()
+        timeout = min(self.config.IMAGE_PROBE_TIMEOUT, budget)
+        verified = set()
+
+        async def probe(url):
+            return url, await self.probe_image_url(url, timeout)
+
+        tasks = [asyncio.ensure_future(probe(url)) for url in urls]
+        try:
+            for done in asyncio.as_completed(tasks, timeout=budget):
+                url, ok = await done
+                if ok:
+                    verified.add(url)
+                    if len(verified) >= max_images:
+                        break
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Image probe budget of {budget:.1f}s used up, {len(verified)} URL(s) verified")
+        finally:
+            await self._cancel([task for task in tasks if not task.done()])
+
+        self.logger.info(f"Verified {len(verified)}/{len(urls)} image URLs in {time.monotonic() - started:.1f}s")
+        return [url for url in urls if url in verified]
+
+    async def get_image_results(self, query, max_images=3, verify=None):
+        """
+        Get image search results for a given query without downloading.
+
+        Returns:
+            list: BingImageResult objects (full-size URL, thumbnail URL, dimensions)
+        """
+        if verify is None:
+            verify = self.config.IMAGE_PROBE_ENABLED
+
+        try:
+            results = await self.search_image_results(query, max_images * (3 if verify else 2))
+            if not results:
+                self.logger.warning(f"No images found for query: {query}")
+                return []
+
+            candidates = [result for result in results if is_valid_image_url(result.murl)]
+            if verify:
+                verified = set(await self.verify_image_urls([result.murl for result in candidates], max_images))
+                valid_results = [result for result in candidates if result.murl in verified]
+            else:
+                valid_results = candidates[:max_images]
+
+            self.logger.info(f"Found {len(valid_results)} valid image URLs for query: {query}")
+            return valid_results
+
+        except Exception as e:
+            self.logger.error(f"Error in get_image_results: {str(e)}")
+            return []
+
+    async def get_image_urls(self, query, max_images=3, verify=None):
+        """
+        Get image URLs for a given query without downloading.
+
+        Returns:
+            list: List of image URLs for hotlinking
+        """
+        return [result.murl for result in await self.get_image_results(query, max_images, verify)]
+
+    async def get_post_images(self, query, max_images=3, verify=None):
+        """
+        Get hotlinkable images for a post with their Bing thumbnails.
+
+        Returns:
+            list: Dicts for utils.insert_images_to_content
+        """
+        return [
+            result.to_embed(self.config.IMAGE_THUMBNAIL_WIDTH)
+            for result in await self.get_image_results(query, max_images, verify)
+        ]
+
+    async def _process(self, data):
+        """Encode the image variants on the process pool (a worker thread if there is none)."""
+        future = self.image_processor.submit(data)
+        if future is None:
+            return await asyncio.to_thread(self.image_processor.process, data)
+        return await asyncio.wrap_future(future)
+
+    async def fetch_image(self, url, filename=None):
+        """
+        Get a processed image for a URL, from the image store when possible.
+
+        Same rules as BingImageScraper.fetch_image.
+
+        Returns:
+            dict: Asset (phash, path, width, height, variants), or None on failure
+        """
+        use_store = filename is None
+        if use_store and self.store is None:
+            raise ValueError("filename is required when the image store is disabled")
+
+        try:
+            if use_store:
+                asset = await asyncio.to_thread(self.store.lookup_url, url)
+                if asset is not None:
+                    return asset
+
+            async with self.host_limiter.slot(url):
+                response = await self._request("GET", url, max_bytes=self.config.IMAGE_MAX_BYTES)
+            response.raise_for_status()
+
+            if not response.headers.get('content-type', '').startswith('image/'):
+                self.logger.warning(f"URL doesn't return image content: {url}")
+                return None
+            if len(response.content) > self.config.IMAGE_MAX_BYTES:
+                self.logger.warning(f"Image larger than {self.config.IMAGE_MAX_BYTES} bytes, skipped: {url}")
+                return None
+
+            data = response.content
+            phash = await asyncio.to_thread(self.image_processor.fingerprint, data)
+            if use_store:
+                asset = await asyncio.to_thread(self.store.find_similar, phash)
+                if asset is not None:
+                    await asyncio.to_thread(self.store.link_url, url, asset['phash'])
+                    return asset
+                filename = self.store.path_for(phash)
+
+            result = await self._process(data)
+            filename = self.image_processor.primary_path(filename)
+            save = asyncio.ensure_future(asyncio.to_thread(self.image_processor.save, result, filename))
+            try:
+                # Cancelling does not stop the save thread, so the save itself is shielded
+                variants = await asyncio.shield(save)
+            except asyncio.CancelledError:
+                if not use_store:
+                    # Nobody will pick up these files: let the save finish, then remove them
+                    await asyncio.to_thread(self._remove_files, await save)
+                raise
+            self.logger.info(f"Downloaded image: {filename} ({len(variants)} variants)")
+
+            if use_store:
+                return await asyncio.to_thread(self.store.add, phash, variants, url, filename)
+            widest = max(variants, key=lambda v: v['width'])
+            return {
+                'phash': phash,
+                'path': filename,
+                'width': widest['width'],
+                'height': widest['height'],
+                'variants': variants,
+            }
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error downloading image from {url}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _remove_files(variants):
+        for variant in variants:
+            try:
+                os.remove(variant['path'])
+            except FileNotFoundError:
+                pass
+
+    async def download_images(self, query, max_images=3):
+        """
+        Download images for a given query.
+
+        Candidates are downloaded concurrently (within the concurrency and
+        per-host limits); near-duplicates of an image already picked are
+        skipped, and the remaining downloads are cancelled once
+        ``max_images`` images are in hand.
+
+        Returns:
+            list: Assets (phash, path, width, height, variants) in search result order,
+                  ready for utils.insert_images_to_content (srcset over the variants)
+        """
+        image_urls = await self.search_images(query, max_images * 3)
+        if not image_urls:
+            self.logger.warning(f"No images found for query: {query}")
+            return []
+
+        if self.store is not None:
+            filenames = [None] * len(image_urls)
+        else:
+            os.makedirs("images", exist_ok=True)
+            query_clean = clean_filename(query)
+            filenames = [os.path.join("images", f"{query_clean}_{i+1}.jpg") for i in range(len(image_urls))]
+
+        async def fetch(i, url, filename):
+            return i, await self.fetch_image(url, filename)
+
+        downloaded = {}
+        tasks = [asyncio.ensure_future(fetch(i, url, filename))
+                 for i, (url, filename) in enumerate(zip(image_urls, filenames))]
+        try:
+            for done in asyncio.as_completed(tasks):
+                i, asset = await done
+                if asset is None:
+                    continue
+                duplicate = is_near_duplicate(
+                    asset['phash'], (kept['phash'] for kept in downloaded.values()), self.config.IMAGE_DUPLICATE_DISTANCE
+                )
+                if duplicate:
+                    self.logger.info(f"Skipping near-duplicate image {i+1}: {asset['path']}")
+                    continue
+                downloaded[i] = asset
+                if len(downloaded) >= max_images:
+                    break
+        finally:
+            await self._cancel([task for task in tasks if not task.done()])
+
+        if self.store is None:
+            # Not used for this post (near-duplicates and downloads that finished after the
+            # last pick); files in the store are kept for later posts
+            surplus = [
+                task.result()[1] for task in tasks
+                if not task.cancelled() and task.exception() is None
+                and task.result()[1] is not None and task.result()[0] not in downloaded
+            ]
+            for asset in surplus:
+                await asyncio.to_thread(self._remove_files, asset['variants'])
+
+        assets = [downloaded[i] for i in sorted(downloaded)]
+        self.logger.info(f"Downloaded {len(assets)} images for query: {query}")
+        return assets
+
+    async def close(self):
+        """Close the HTTP session, the process pool, the search cache and the image store."""
+        try:
+            await self.backend.close()
+            # Waits for the pool workers to exit
+            await asyncio.to_thread(self.image_processor.close)
+            if self.cache is not None and self._owns_cache:
+                await asyncio.to_thread(self.cache.close)
+            if self.store is not None and self._owns_store:
+                await asyncio.to_thread(self.store.close)
+        except Exception as e:
+            self.logger.error(f"Error closing async image scraper: {str(e)}")
@@ -0,0 +1,182 @@
+"""
+Network backends used by GeminiScraper and BingImageScraper.
+The scrapers talk to Gemini and HTTP hosts only through these small
+interfaces, so offline stand-ins (see fake_backends.py) can replace them.
+"""
+
+import json
+import threading
+
+
+class GeminiBackend:
+    """Interface for sending prompts to Gemini with a specific API key."""
+
+    def get_model(self, api_key, generation_config=None):
+        """Return the model object bound to api_key, or None if the backend has none."""
+        return None
+
+    def generate_content(self, api_key, prompt, generation_config, stream=False):
+        """
+        Run one generation request.
+
+        Returns an object with ``text`` and ``usage_metadata`` attributes, or an
+        iterable of such chunks when ``stream`` is True. Raises on API errors.
+        """
+        raise NotImplementedError
+
+
+class GenaiBackend(GeminiBackend):
+    """
+    Gemini backend using the official google-generativeai client.
+
+    Holds one GenerativeModel per API key and generation config. Each model
+    carries its own client, so the process-wide genai.configure() key is
+    never touched: threads, the dashboard and a background job can use
+    different keys at the same time.
+
+    google-generativeai has no public per-model client option, so the client
+    is set on GenerativeModel._client; requirements.txt pins the 0.8 series,
+    where generate_content uses that client when it is set.
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get_model(self, api_key, generation_config=None):
+        """Get (or create) the GenerativeModel bound to a single API key; safe to call from any thread."""
+        import google.generativeai as genai
+        from google.ai import generativelanguage as glm
+
+        cache_key = (api_key, json.dumps(generation_config, sort_keys=True))
+        with self._lock:
+            model = self._models.get(cache_key)
+            if model is None:
+                model = genai.GenerativeModel(
+                    model_name=self.model_name,
+                    generation_config=generation_config
+                )
+                if not hasattr(model, "_client"):
+                    # Without it the model would fall back to the genai.configure() key
+                    raise RuntimeError("Unsupported google-generativeai version: GenerativeModel has no "
+                                       "_client to bind an API key to (install google-generativeai 0.8.x)")
+                model._client = glm.GenerativeServiceClient(
+                    client_options={"api_key": api_key}
+                )
+                self._models[cache_key] = model
+            return model
+
+    def generate_content(self, api_key, prompt, generation_config, stream=False):
+        model = self.get_model(api_key, generation_config)
+        if stream:
+            return model.generate_content(prompt, stream=True)
+        return model.generate_content(prompt)
+
+
+class HttpBackend:
+    """Interface for HTTP GET requests made by the image scraper."""
+
+    def get(self, url, **kwargs):
+        """Return a requests.Response-like object (status_code, headers, content, iter_content...)."""
+        raise NotImplementedError
+
+    def head(self, url, **kwargs):
+        """Return a response with status_code and headers only."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsBackend(HttpBackend):
+    """HTTP backend over a requests.Session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.session.head(url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHttpResponse:
+    """Fully read response of an AsyncHttpBackend request (header names lowercased)."""
+
+    def __init__(self, url, status_code, headers=None, content=b""):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code} for url: {self.url}")
+
+
+class AsyncHttpBackend:
+    """Interface for HTTP requests made by the asyncio image scraper."""
+
+    async def request(self, method, url, headers=None, timeout=30, max_bytes=None):
+        """
+        Send a GET or HEAD request and read the body.
+
+        Returns an AsyncHttpResponse. With ``max_bytes`` set, reading stops
+        after max_bytes + 1 bytes, so callers can tell the body was too large.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class AiohttpBackend(AsyncHttpBackend):
+    """
+    Async HTTP backend over one aiohttp.ClientSession (keep-alive, pooled per host).
+
+    aiohttp is optional; it is imported when the first request is made.
+    """
+
+    def __init__(self, headers=None, limit=100, limit_per_host=8):
+        self.headers = dict(headers or {})
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session = None
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    async def request(self, method, url, headers=None, timeout=30, max_bytes=None):
+        import aiohttp
+
+        session = self._get_session()
+        async with session.request(method, url, headers=headers, allow_redirects=True,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            content = b""
+            if method != "HEAD":
+                if max_bytes is None:
+                    content = await response.read()
+                else:
+                    chunks, size = [], 0
+                    async for chunk in response.content.iter_chunked(65536):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size > max_bytes:
+                            break
+                    content = b"".join(chunks)
+            return AsyncHttpResponse(str(response.url), response.status, dict(response.headers), content)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
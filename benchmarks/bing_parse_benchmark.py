@@ -0,0 +1,106 @@
+"""
+Benchmark of Bing image result extraction.
+Compares the targeted byte-level extractor in bingparse.py with the previous
+BeautifulSoup path on saved result pages, and checks both find the same images.
+
+Save pages with e.g.
+    curl -A "Mozilla/5.0" "https://www.bing.com/images/search?q=kopi+arabika&first=1" -o pages/kopi.html
+
+Usage:
+    python benchmarks/bing_parse_benchmark.py --pages "pages/*.html" [--repeat 20]
+
+Without --pages, pages are synthesized by FakeBingBackend and padded with
+inline script/style filler to the size of a real results page.
+"""
+
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bingparse import extract_image_results, extract_image_results_soup  # noqa: E402
+
+
+def synthetic_pages(count, results_per_page, filler_kb, seed):
+    """Fake Bing pages padded with script/style blocks like the real ones."""
+    from fake_backends import FakeBingBackend
+
+    backend = FakeBingBackend(seed=seed, results_per_page=results_per_page, time_scale=0)
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        page = backend.get(f"https://www.bing.com/images/search?q=topik+benchmark+{i}&first=1").content
+        filler = []
+        size = 0
+        while size < filler_kb * 1024:
+            block = (
+                f'<script type="text/javascript">var _w{rng.randint(0, 10 ** 6)}={{"a":"{"x" * rng.randint(200, 2000)}"}};</script>'
+                f'<div class="b_hide" data-tag="{rng.randint(0, 10 ** 6)}"><span>{"lorem ipsum " * rng.randint(5, 50)}</span></div>'
+            ).encode("utf-8")
+            filler.append(block)
+            size += len(block)
+        head, body = page.split(b"<body>", 1)
+        pages.append((f"synthetic-{i + 1}", head + b"<body>" + b"".join(filler) + body))
+    return pages
+
+
+def time_extractor(extractor, pages, repeat):
+    """Median seconds per page over ``repeat`` passes."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _, content in pages:
+            extractor(content)
+        timings.append((time.perf_counter() - started) / len(pages))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Bing result extraction paths")
+    parser.add_argument("--pages", help="Glob of saved Bing result pages")
+    parser.add_argument("--synthetic", type=int, default=5, help="Synthetic pages when --pages is not given")
+    parser.add_argument("--results-per-page", type=int, default=35)
+    parser.add_argument("--filler-kb", type=int, default=400, help="Script/style filler per synthetic page")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in sorted(glob.glob(args.pages)):
+            with open(path, "rb") as f:
+                pages.append((os.path.basename(path), f.read()))
+        if not pages:
+            print(f"No pages match {args.pages}")
+            return 1
+    else:
+        pages = synthetic_pages(args.synthetic, args.results_per_page, args.filler_kb, args.seed)
+
+    mismatches = 0
+    for name, content in pages:
+        fast = extract_image_results(content)
+        soup = extract_image_results_soup(content)
+        if [r.murl for r in fast] != [r.murl for r in soup] or [(r.width, r.height) for r in fast] != [(r.width, r.height) for r in soup]:
+            mismatches += 1
+            print(f"MISMATCH {name}: fast found {len(fast)}, soup found {len(soup)}")
+
+    fast_seconds = time_extractor(extract_image_results, pages, args.repeat)
+    soup_seconds = time_extractor(extract_image_results_soup, pages, args.repeat)
+    average_kb = statistics.mean(len(content) for _, content in pages) / 1024
+
+    print(f"Pages:            {len(pages)} ({average_kb:.0f} KB avg)")
+    print(f"BeautifulSoup:    {soup_seconds * 1000:.2f} ms/page")
+    print(f"Targeted extract: {fast_seconds * 1000:.3f} ms/page")
+    print(f"Speedup:          {soup_seconds / fast_seconds if fast_seconds else 0:.0f}x")
+    print(f"Result mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark of downloaded image processing.
+Compares the previous path (write to disk, re-open, full decode, thumbnail,
+re-save as JPEG) with imageproc (in-memory, JPEG draft decoding, WebP/JPEG
+variants on a process pool) on photo-like test images.
+
+Usage:
+    python benchmarks/image_benchmark.py [--images 24] [--size 3000x2000] [--workers 4]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from imageproc import ImageProcessor  # noqa: E402
+
+
+def make_images(count, size, seed):
+    """Photo-like JPEGs: gradients plus noise, so they compress like real photos."""
+    from PIL import Image, ImageChops, ImageFilter
+
+    images = []
+    for i in range(count):
+        gradient = Image.linear_gradient("L").resize(size).rotate(i * 37 % 360)
+        noise = Image.effect_noise(size, 40 + (seed + i) % 30).filter(ImageFilter.GaussianBlur(1))
+        red = ImageChops.add(gradient, noise, scale=2.0)
+        image = Image.merge("RGB", (red, noise, gradient))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def legacy_process(data, directory, index):
+    """The previous download_image processing: file on disk, full decode, thumbnail, JPEG 85."""
+    from PIL import Image
+
+    filename = os.path.join(directory, f"legacy_{index}.jpg")
+    with open(filename, "wb") as f:
+        f.write(data)
+    with Image.open(filename) as img:
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGB")
+        max_size = (1200, 800)
+        if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            img.save(filename, "JPEG", quality=85)
+    return os.path.getsize(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy and in-memory image processing")
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--size", default="3000x2000", help="Source image size WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    size = tuple(int(part) for part in args.size.lower().split("x"))
+    images = make_images(args.images, size, args.seed)
+    print(f"Source images:      {len(images)} x {size[0]}x{size[1]}, "
+          f"{statistics.mean(len(d) for d in images) / 1024:.0f} KB avg")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        legacy_bytes = [legacy_process(data, tmp, i) for i, data in enumerate(images)]
+        legacy_seconds = time.perf_counter() - started
+
+    processor = ImageProcessor(max_workers=1)
+    started = time.perf_counter()
+    results = [processor.process(data) for data in images]
+    single_seconds = time.perf_counter() - started
+
+    pool = ImageProcessor(max_workers=args.workers)
+    pool.process(images[0])  # start the worker processes outside the measurement
+    started = time.perf_counter()
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=args.workers) as threads:
+        list(threads.map(pool.process, images))
+    pool_seconds = time.perf_counter() - started
+    pool.close()
+
+    def variant_bytes(width, fmt):
+        sizes = [v["data"] for r in results for v in r["variants"] if v["width"] == width and v["format"] == fmt]
+        return statistics.mean(len(d) for d in sizes) / 1024 if sizes else 0
+
+    variant_count = len(results[0]["variants"])
+    print(f"Legacy (1 JPEG):    {legacy_seconds / len(images) * 1000:.1f} ms/image, "
+          f"{statistics.mean(legacy_bytes) / 1024:.0f} KB at 1200w")
+    print(f"imageproc 1 worker: {single_seconds / len(images) * 1000:.1f} ms/image ({variant_count} variants)")
+    print(f"imageproc {args.workers} workers: {pool_seconds / len(images) * 1000:.1f} ms/image wall")
+    for width in sorted({v["width"] for v in results[0]["variants"]}):
+        print(f"  {width:>5}w: WebP {variant_bytes(width, 'webp'):.0f} KB, JPEG {variant_bytes(width, 'jpeg'):.0f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
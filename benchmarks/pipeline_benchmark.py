@@ -0,0 +1,198 @@
+"""
+Offline load test of the article generation pipeline.
+Runs ScheduledArticleGenerator and BingImageScraper against the fake
+backends in fake_backends.py, so no quota or network is used and the
+same seed always produces the same articles.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py --keywords 50 --keys 10 --error-429 0.05 --images
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import hashlib
+import logging
+import argparse
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fake_backends import FakeGeminiBackend, FakeBingBackend, FakeAsyncBingBackend, LatencyModel  # noqa: E402
+from keypool import KeyPool  # noqa: E402
+from retry import RetryPolicy  # noqa: E402
+
+
+def build_gemini(args):
+    from gemini import GeminiScraper
+
+    backend = FakeGeminiBackend(
+        latency=LatencyModel(args.latency_kind, args.latency, args.latency_spread),
+        error_rates={429: args.error_429, 500: args.error_500},
+        seed=args.seed,
+        tokens_per_second=args.tokens_per_second,
+        time_scale=args.time_scale,
+    )
+    gemini = GeminiScraper(
+        api_keys=[f"fake-key-{i + 1}" for i in range(args.keys)],
+        backend=backend,
+        cache=False,
+    )
+    # Fake keys get the budgets requested on the command line
+    gemini.key_pool = KeyPool(
+        gemini.api_keys,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=gemini.config.GEMINI_TPM_PER_KEY,
+        cooldown_seconds=args.cooldown,
+        max_in_flight=args.concurrency_per_key,
+        failure_threshold=gemini.config.GEMINI_BREAKER_THRESHOLD,
+        breaker_open_seconds=gemini.config.GEMINI_BREAKER_OPEN_SECONDS * args.time_scale,
+    )
+    # Backoff sleeps are real, so they are scaled like the fake latencies
+    gemini.retry_policy = RetryPolicy(
+        max_attempts=gemini.config.GEMINI_RETRY_ATTEMPTS,
+        base_delay=gemini.config.GEMINI_RETRY_BASE_DELAY * args.time_scale,
+        max_delay=gemini.config.GEMINI_RETRY_MAX_DELAY * args.time_scale,
+    )
+    return gemini, backend
+
+
+async def lookup_images_async(posts, args):
+    """Image lookups for all posts as concurrent tasks on one event loop."""
+    from async_bingimage import AsyncBingImageScraper
+
+    backend = FakeAsyncBingBackend(seed=args.seed, time_scale=args.time_scale)
+    async with AsyncBingImageScraper(backend=backend, cache=False, store=False) as scraper:
+        scraper.host_limiter.min_interval *= args.time_scale
+        results = await asyncio.gather(*(scraper.get_image_urls(post["keyword"], 3) for post in posts))
+    return [len(urls) for urls in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test article generation against offline fake backends")
+    parser.add_argument("--keywords", type=int, default=20, help="Number of keywords to generate")
+    parser.add_argument("--keys", type=int, default=5, help="Number of fake API keys")
+    parser.add_argument("--concurrency-per-key", type=int, default=2)
+    parser.add_argument("--rpm", type=int, default=1000, help="Requests per minute budget per fake key")
+    parser.add_argument("--cooldown", type=float, default=2.0, help="Cooldown after a fake 429 (seconds)")
+    parser.add_argument("--latency", type=float, default=1.5, help="Median Gemini latency (seconds)")
+    parser.add_argument("--latency-spread", type=float, default=0.4)
+    parser.add_argument("--tokens-per-second", type=float, default=150.0, help="Gemini output speed used for decode time")
+    parser.add_argument("--latency-kind", default="lognormal", choices=["constant", "uniform", "normal", "lognormal"])
+    parser.add_argument("--error-429", type=float, default=0.0, help="Probability of a fake 429 per request")
+    parser.add_argument("--error-500", type=float, default=0.0, help="Probability of a fake 500 per request")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Real seconds slept per simulated second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sequential", action="store_true", help="Disable concurrent generation")
+    parser.add_argument("--classic", action="store_true", help="Use title + article requests instead of structured mode")
+    parser.add_argument("--sectioned", action="store_true", help="Generate an outline first, then all sections in parallel")
+    parser.add_argument("--images", action="store_true", help="Look up images for every post via the fake Bing backend")
+    parser.add_argument("--async-images", action="store_true",
+                        help="Look up the images of all posts concurrently with AsyncBingImageScraper")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Look up images inside the scheduler pipeline, overlapping generation")
+    parser.add_argument("--image-workers", type=int, default=4, help="Image stage threads with --pipelined")
+    parser.add_argument("--download", action="store_true", help="Download the images too (into a temporary directory)")
+    parser.add_argument("--download-workers", type=int, default=None, help="Parallel image downloads (1 = sequential)")
+    args = parser.parse_args()
+
+    # Configure logging before the scheduler does, so nothing is written to scheduler.log
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s - %(name)s - %(message)s')
+
+    from scheduler import ScheduledArticleGenerator
+
+    gemini, gemini_backend = build_gemini(args)
+    generator = ScheduledArticleGenerator(config_file="")
+    generator.config = {
+        "concurrent_generation": not args.sequential,
+        "structured_generation": not args.classic,
+        "sectioned_generation": args.sectioned,
+        "max_concurrency_per_key": args.concurrency_per_key,
+        "include_images": args.pipelined,
+        "max_images_per_post": 3,
+        "image_workers": args.image_workers,
+    }
+    if args.pipelined:
+        import bingimage
+
+        # The image stage uses the shared scraper; point it at the fake Bing backend
+        bingimage._shared_scraper = bingimage.BingImageScraper(
+            backend=FakeBingBackend(seed=args.seed, time_scale=args.time_scale), cache=False, store=False
+        )
+        bingimage._shared_scraper.host_limiter.min_interval *= args.time_scale
+
+    keywords = [f"topik benchmark {i + 1}" for i in range(args.keywords)]
+
+    started = time.perf_counter()
+    posts = generator.generate_articles_from_keywords(keywords, "id", "Teknologi", "informatif", gemini=gemini)
+    generation_seconds = time.perf_counter() - started
+
+    image_seconds = 0.0
+    image_counts = []
+    store_stats = None
+    if args.images or args.async_images or args.download:
+        from bingimage import BingImageScraper
+
+        bing_backend = FakeBingBackend(seed=args.seed, time_scale=args.time_scale)
+        if args.download:
+            cwd = os.getcwd()
+            with tempfile.TemporaryDirectory() as tmp:
+                # Downloaded files and the image store live in the temporary directory
+                os.chdir(tmp)
+                try:
+                    scraper = BingImageScraper(backend=bing_backend, cache=False)
+                    # Politeness delays are real sleeps, so they are scaled like the fake latencies
+                    scraper.host_limiter.min_interval *= args.time_scale
+                    image_started = time.perf_counter()
+                    for post in posts:
+                        image_counts.append(len(scraper.download_images(post["keyword"], 3, args.download_workers)))
+                    image_seconds = time.perf_counter() - image_started
+                    store_stats = scraper.get_store_stats()
+                    scraper.close()
+                finally:
+                    os.chdir(cwd)
+        elif args.async_images:
+            image_started = time.perf_counter()
+            image_counts = asyncio.run(lookup_images_async(posts, args))
+            image_seconds = time.perf_counter() - image_started
+        else:
+            scraper = BingImageScraper(backend=bing_backend, cache=False, store=False)
+            scraper.host_limiter.min_interval *= args.time_scale
+            image_started = time.perf_counter()
+            for post in posts:
+                image_counts.append(len(scraper.get_image_urls(post["keyword"], 3)))
+            image_seconds = time.perf_counter() - image_started
+            scraper.close()
+
+    total_seconds = generation_seconds + image_seconds
+    digest = hashlib.sha256(json.dumps(sorted((p["keyword"], p["title"]) for p in posts)).encode("utf-8")).hexdigest()[:16]
+    key_status = gemini.get_key_status()
+
+    print(f"Keywords:            {len(keywords)} ({'sequential' if args.sequential else 'concurrent'}, "
+          f"{'sectioned' if args.sectioned else 'classic' if args.classic else 'structured'}, {args.keys} keys)")
+    print(f"Articles generated:  {len(posts)}")
+    print(f"Generation time:     {generation_seconds:.2f} s real "
+          f"({generation_seconds / args.time_scale if args.time_scale else 0:.1f} s simulated)")
+    print(f"Throughput:          {len(posts) / (generation_seconds / args.time_scale) * 60 if args.time_scale and generation_seconds else 0:.1f} articles/min simulated")
+    print(f"Gemini calls:        {gemini_backend.stats['calls']} (injected errors: {gemini_backend.stats['errors'] or 'none'})")
+    print(f"Key requests served: {statistics.mean(k['successes'] for k in key_status):.1f} avg, "
+          f"{max(k['successes'] for k in key_status)} max per key")
+    if args.images or args.async_images or args.download:
+        print(f"{'Image download time:' if args.download else 'Image lookup time:':<21}{image_seconds:.2f} s real, {statistics.mean(image_counts) if image_counts else 0:.1f} images/post")
+    if store_stats:
+        print(f"Image store:         {store_stats['assets']} assets, {store_stats['url_hits']} URL hits, "
+              f"{store_stats['hash_hits']} same-picture hits")
+    if args.pipelined:
+        print(f"Images (pipelined):  {statistics.mean(p['content'].count('<img') for p in posts) if posts else 0:.1f} images/post, "
+              f"overlapped with generation")
+    print(f"Total time:          {total_seconds:.2f} s real")
+    print(f"Result digest:       {digest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Startup benchmark for the blog system entry points.
+Measures how long importing each entry point takes in a fresh interpreter
+and fails when one exceeds its budget in startup_budget.json.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 7] [--importtime] [--update-budget]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# Entry points measured: cron job, dashboard and the modules they pull in
+ENTRY_POINTS = ["gemini", "bingimage", "scheduler", "scheduler_manager", "streamlit_dashboard"]
+
+
+def run_import(module, importtime=False):
+    """Import a module in a fresh interpreter and return (seconds, stderr)."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", f"import {module}" if module else "pass"]
+
+    started = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}")
+    return elapsed, result.stderr
+
+
+def measure(module, runs):
+    """Median import time in milliseconds over several runs (first run warms the bytecode cache)."""
+    run_import(module)
+    return statistics.median(run_import(module)[0] for _ in range(runs)) * 1000
+
+
+def slowest_imports(module, limit=10):
+    """Top modules by cumulative import time from python -X importtime."""
+    _, stderr = run_import(module, importtime=True)
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        # Skip the header line ("self [us] | cumulative | imported package")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def load_budget():
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure entry point import time against a budget")
+    parser.add_argument("--runs", type=int, default=7, help="Runs per entry point (median is reported)")
+    parser.add_argument("--importtime", action="store_true", help="Show the slowest imports of each entry point")
+    parser.add_argument("--update-budget", action="store_true", help="Write current timings (+50%% headroom) as the new budget")
+    args = parser.parse_args()
+
+    budget = load_budget()
+    baseline = measure(None, args.runs)
+    print(f"Interpreter startup: {baseline:.0f} ms (subtracted below)\n")
+    print(f"{'entry point':<22}{'import ms':>10}{'budget ms':>11}  status")
+
+    results = {}
+    failures = []
+    for module in ENTRY_POINTS:
+        try:
+            elapsed = max(0.0, measure(module, args.runs) - baseline)
+        except ImportError as e:
+            print(f"{module:<22}{'-':>10}{'-':>11}  skipped ({e})")
+            continue
+
+        results[module] = elapsed
+        limit = budget.get(module)
+        if limit is None:
+            status = "no budget"
+        elif elapsed > limit:
+            status = "OVER BUDGET"
+            failures.append(module)
+        else:
+            status = "ok"
+        print(f"{module:<22}{elapsed:>10.0f}{limit if limit is not None else '-':>11}  {status}")
+
+        if args.importtime:
+            for cumulative_us, name in slowest_imports(module):
+                print(f"    {cumulative_us / 1000:>8.1f} ms  {name}")
+
+    if args.update_budget:
+        budget.update({module: int(elapsed * 1.5) + 10 for module, elapsed in results.items()})
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"\nBudget written to {BUDGET_FILE}")
+        return 0
+
+    if failures:
+        print(f"\nStartup regression: {', '.join(failures)} over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
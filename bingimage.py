@@ -3,43 +3,217 @@ Bing image scraper for downloading relevant images.
 This module handles searching and downloading images from Bing without using Selenium.
 """
 
+import io
 import os
+import atexit
 import requests
 import time
-import random
-import json
+import threading
 import urllib.parse
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from PIL import Image
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, CancelledError
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 import logging
-from utils import clean_filename, is_valid_image_url
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils import clean_filename, is_valid_image_url, sniff_image_type
 from config import Config
+from cache import DiskCache
+from backends import RequestsBackend
+from bingparse import BingImageResult, extract_image_results
+from imageproc import ImageProcessor, is_near_duplicate
+from imagestore import ImageStore
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+def search_page_url(query, first=1):
+    """Bing image search URL for the result page starting at ``first`` (1-based)."""
+    # Format query for URL
+    query_encoded = '+'.join(query.split())
+    return f"https://www.bing.com/images/search?q={query_encoded}&form=HDRSC2&first={first}&tsc=ImageBasicHover"
+
+def usable_results(results):
+    """Keep results whose full-size URL can be embedded (no data/base64 URLs)."""
+    usable = []
+    for result in results:
+        img_url = result.murl
+        if img_url and is_valid_image_url(img_url):
+            # Skip data URLs and very small images
+            if not img_url.startswith('data:') and 'base64' not in img_url:
+                usable.append(result)
+    return usable
+
+def search_cache_key(query, max_images):
+    """Search cache key; Bing ignores case and extra whitespace, so the key does too."""
+    normalized = " ".join(query.lower().split())
+    return DiskCache.make_key("bing-results", normalized, max_images)
+
+def merge_result_pages(pages, max_images):
+    """Results of the fetched pages ({page index: results}) in page order, without repeated image URLs."""
+    merged = []
+    seen = set()
+    for page in sorted(pages):
+        for result in pages[page]:
+            if result.murl not in seen:
+                seen.add(result.murl)
+                merged.append(result)
+                if len(merged) >= max_images:
+                    return merged
+    return merged
+
+def probe_rejection(status, content_type, size, first_bytes, max_bytes):
+    """
+    Judge the outcome of an image probe.
+    
+    Returns:
+        str: Why the URL can't be hotlinked, or None if it can
+    """
+    if status >= 400:
+        return f"HTTP {status}"
+    if not content_type.startswith('image/') and not sniff_image_type(first_bytes):
+        return f"not an image ({content_type or 'no content-type'})"
+    if size and str(size).isdigit() and int(size) > max_bytes:
+        return f"{int(size)} bytes is too large"
+    return None
+
+class HostLimiter:
+    """
+    Per-host politeness limits shared by all download threads.
+    
+    Each host gets at most ``max_concurrent`` requests at a time, and request
+    starts to the same host are spaced at least ``min_interval`` seconds apart.
+    Requests to different hosts don't wait for each other.
+    """
+    
+    def __init__(self, max_concurrent=2, min_interval=0.5):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+    
+    @contextmanager
+    def slot(self, url, cancel_event=None):
+        """
+        Wait for a request slot on the URL's host.
+        
+        Raises CancelledError if ``cancel_event`` is set while waiting.
+        """
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_concurrent))
+        
+        while not semaphore.acquire(timeout=0.1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError()
+        
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.min_interval
+            
+            wait = start - now
+            if wait > 0:
+                if cancel_event is not None:
+                    if cancel_event.wait(wait):
+                        raise CancelledError()
+                else:
+                    time.sleep(wait)
+            yield
+        finally:
+            semaphore.release()
 
 class BingImageScraper:
     """Scraper for Bing image search using requests and BeautifulSoup."""
     
-    def __init__(self):
+    # Bytes requested by the ranged GET fallback of probe_image_url
+    PROBE_BYTES = 1024
+    
+    def __init__(self, backend=None, cache=None, store=None):
         self.logger = logging.getLogger(__name__)
         self.config = Config()
         self.session = requests.Session()
         self._setup_session()
+        # All HTTP goes through the backend so it can be replaced by an offline stand-in
+        self.backend = backend or RequestsBackend(self.session)
+        self.host_limiter = HostLimiter(
+            self.config.IMAGE_HOST_CONCURRENCY,
+            self.config.IMAGE_HOST_MIN_INTERVAL
+        )
+        # Downloaded images are decoded and re-encoded on a process pool (started on first use)
+        self.image_processor = ImageProcessor(
+            widths=self.config.IMAGE_VARIANT_WIDTHS,
+            formats=self.config.IMAGE_VARIANT_FORMATS,
+            max_size=self.config.IMAGE_MAX_SIZE,
+            jpeg_quality=self.config.IMAGE_JPEG_QUALITY,
+            webp_quality=self.config.IMAGE_WEBP_QUALITY,
+            max_workers=self.config.IMAGE_PROCESS_WORKERS or None
+        )
+        # store=None uses the default content-addressed image store, store=False disables it
+        self.store = store or None
+        self._owns_store = False
+        if store is None and self.config.IMAGE_STORE_ENABLED:
+            try:
+                self.store = ImageStore(
+                    self.config.IMAGE_STORE_DIR,
+                    match_distance=self.config.IMAGE_STORE_MATCH_DISTANCE
+                )
+                self._owns_store = True
+            except Exception as e:
+                self.logger.warning(f"Image store disabled: {str(e)}")
+        # cache=None uses the default search result cache, cache=False disables it
+        self.cache = cache or None
+        self._owns_cache = False
+        if cache is None and self.config.IMAGE_SEARCH_CACHE_ENABLED:
+            try:
+                self.cache = DiskCache(
+                    self.config.IMAGE_SEARCH_CACHE_PATH,
+                    max_bytes=self.config.IMAGE_SEARCH_CACHE_MAX_BYTES,
+                    ttl_seconds=self.config.IMAGE_SEARCH_CACHE_TTL,
+                    memory_entries=self.config.IMAGE_SEARCH_CACHE_MEMORY_ENTRIES
+                )
+                self._owns_cache = True
+            except Exception as e:
+                self.logger.warning(f"Image search cache disabled: {str(e)}")
     
     def _setup_session(self):
-        """Setup requests session with appropriate headers."""
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        """Setup requests session with appropriate headers and a pooled, retrying adapter."""
+        # Keep-alive connections are pooled per host and reused across keywords;
+        # connection errors and 502/503/504 are retried with a short backoff
+        retries = Retry(
+            total=self.config.IMAGE_HTTP_RETRIES,
+            read=1,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.config.IMAGE_HTTP_POOL_HOSTS,
+            pool_maxsize=self.config.IMAGE_HTTP_POOL_SIZE,
+            max_retries=retries
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(BROWSER_HEADERS)
     
     def get_soup(self, url):
         """Get BeautifulSoup object from URL."""
+        # bs4 and PIL are imported on first use to keep module import cheap
+        from bs4 import BeautifulSoup
+        
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.backend.get(url, timeout=30)
             response.raise_for_status()
             return BeautifulSoup(response.content, "html.parser")
         except Exception as e:
@@ -57,155 +231,465 @@ class BingImageScraper:
         Returns:
             list: List of image URLs
         """
-        try:
-            # Format query for URL
-            query_encoded = '+'.join(query.split())
-            search_url = f"https://www.bing.com/images/search?q={query_encoded}&form=HDRSC2&first=1&tsc=ImageBasicHover"
+        return [result.murl for result in self.search_image_results(query, max_images)]
+    
+    def search_image_results(self, query, max_images=10):
+        """
+        Search for images on Bing, keeping thumbnail URL, title and dimensions.
+        
+        Requests for more images than one result page holds fetch further
+        pages concurrently. Results are cached per normalized query and max_images, so repeated
+        searches don't scrape Bing again until the cache entry expires.
+        
+        Args:
+            query (str): Search query
+            max_images (int): Maximum number of images to find
             
+        Returns:
+            list: List of BingImageResult objects
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = search_cache_key(query, max_images)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.debug(f"Image search served from cache: {query}")
+                return [BingImageResult.from_dict(item) for item in cached]
+        
+        try:
             self.logger.info(f"Searching for images: {query}")
+            results = self._search_pages(query, max_images)
             
-            # Get the search page
-            soup = self.get_soup(search_url)
-            if not soup:
-                return []
-            
-            # Find image elements with JSON data
-            image_elements = soup.find_all("a", {"class": "iusc"})
-            
-            image_urls = []
-            for element in image_elements[:max_images * 2]:  # Get more to filter out invalid ones
-                try:
-                    # Extract JSON data from the element
-                    m_attr = element.get("m")
-                    if m_attr:
-                        m_data = json.loads(m_attr)
-                        img_url = m_data.get("murl")  # Main image URL
-                        
-                        if img_url and is_valid_image_url(img_url):
-                            # Skip data URLs and very small images
-                            if not img_url.startswith('data:') and 'base64' not in img_url:
-                                image_urls.append(img_url)
-                                
-                                if len(image_urls) >= max_images:
-                                    break
-                                    
-                except Exception as e:
-                    self.logger.debug(f"Error extracting image URL: {str(e)}")
-                    continue
-            
-            self.logger.info(f"Found {len(image_urls)} image URLs")
-            return image_urls
+            self.logger.info(f"Found {len(results)} image URLs")
+            if cache_key is not None and results:
+                self.cache.set(cache_key, [result.to_dict() for result in results])
+            return results
             
         except Exception as e:
             self.logger.error(f"Error searching images: {str(e)}")
             return []
     
-    def download_image(self, url, filename):
+    def _fetch_result_page(self, query, first):
         """
-        Download a single image.
+        Fetch one Bing result page and keep the usable image results.
         
         Args:
-            url (str): Image URL
-            filename (str): Local filename to save
+            query (str): Search query
+            first (int): 1-based offset of the first result on the page
             
         Returns:
-            bool: True if successful, False otherwise
+            list: BingImageResult objects in page order
         """
-        try:
-            # Add random delay to avoid rate limiting
-            time.sleep(random.uniform(0.5, 1.5))
+        # Get the search page
+        response = self.backend.get(search_page_url(query, first), timeout=30)
+        response.raise_for_status()
+        
+        # Read the a.iusc results straight from the page bytes
+        return usable_results(extract_image_results(response.content))
+    
+    def _search_pages(self, query, max_images):
+        """
+        Collect ``max_images`` results from as many result pages as needed.
+        
+        One page covers most requests. Larger requests fetch the result
+        offsets they need concurrently (more if pages come back short, up to
+        IMAGE_SEARCH_MAX_PAGES), merge them in rank order and drop repeated
+        image URLs. Outstanding pages are abandoned once enough results are in.
+        
+        Args:
+            query (str): Search query
+            max_images (int): Number of results wanted
             
-            response = self.session.get(url, timeout=30, stream=True)
-            response.raise_for_status()
+        Returns:
+            list: Up to max_images BingImageResult objects in rank order
             
-            # Check if the response is actually an image
-            content_type = response.headers.get('content-type', '')
-            if not content_type.startswith('image/'):
-                self.logger.warning(f"URL doesn't return image content: {url}")
-                return False
+        Raises:
+            Exception: If no page could be fetched at all
+        """
+        page_size = self.config.IMAGE_SEARCH_PAGE_SIZE
+        max_pages = max(1, self.config.IMAGE_SEARCH_MAX_PAGES)
+        # Pages with roughly twice the results needed, since some get filtered out
+        wanted_pages = min(max_pages, max(1, -(-max_images * 2 // page_size)))
+        
+        if wanted_pages == 1:
+            return merge_result_pages({0: self._fetch_result_page(query, 1)}, max_images)
+        
+        pages = {}
+        errors = []
+        next_page = 0
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.config.IMAGE_SEARCH_PAGE_WORKERS, max_pages),
+            thread_name_prefix="bing-page"
+        )
+        try:
+            while True:
+                futures = {
+                    executor.submit(self._fetch_result_page, query, 1 + page * page_size): page
+                    for page in range(next_page, min(next_page + wanted_pages, max_pages))
+                }
+                next_page += len(futures)
+                
+                for future in as_completed(futures):
+                    page = futures[future]
+                    try:
+                        pages[page] = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        self.logger.warning(f"Error fetching result page {page + 1} for {query}: {str(e)}")
+                        continue
+                    if len(merge_result_pages(pages, max_images)) >= max_images:
+                        return merge_result_pages(pages, max_images)
+                
+                # Not enough yet: stop when out of pages or Bing ran out of results
+                if next_page >= max_pages or not pages or any(not pages.get(page, [True]) for page in futures):
+                    break
+            
+            if not pages and errors:
+                raise errors[0]
+            return merge_result_pages(pages, max_images)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _fetch_image_bytes(self, url, cancel_event=None):
+        """
+        Download an image into memory.
+        
+        Returns:
+            bytes: Image data, or None if the URL doesn't return an acceptable image
             
-            # Save the image
-            with open(filename, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+        Raises:
+            CancelledError: If ``cancel_event`` is set while downloading
+        """
+        # Politeness limits per host instead of a global random delay
+        with self.host_limiter.slot(url, cancel_event):
+            response = self.backend.get(url, timeout=30, stream=True)
+            try:
+                response.raise_for_status()
+                
+                # Check if the response is actually an image
+                content_type = response.headers.get('content-type', '')
+                if not content_type.startswith('image/'):
+                    self.logger.warning(f"URL doesn't return image content: {url}")
+                    return None
+                
+                # Read the image into memory
+                buffer = io.BytesIO()
+                for chunk in response.iter_content(chunk_size=65536):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise CancelledError()
                     if chunk:
-                        f.write(chunk)
+                        buffer.write(chunk)
+                        if buffer.tell() > self.config.IMAGE_MAX_BYTES:
+                            self.logger.warning(f"Image larger than {self.config.IMAGE_MAX_BYTES} bytes, skipped: {url}")
+                            return None
+            finally:
+                response.close()
+        
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError()
+        return buffer.getvalue()
+    
+    def fetch_image(self, url, cancel_event=None, filename=None):
+        """
+        Get a processed image for a URL, from the image store when possible.
+        
+        Without ``filename`` the image store is used: a URL that was fetched
+        before is not downloaded again, and a new URL whose picture (by
+        perceptual hash) is already stored is downloaded but not re-encoded.
+        New images are saved under their hash. With ``filename`` the image is
+        always downloaded and saved at that path.
+        
+        Args:
+            url (str): Image URL
+            cancel_event (threading.Event): Abort the download when set
+            filename (str): Save here instead of in the image store
+            
+        Returns:
+            dict: Asset (phash, path, width, height, variants), or None on failure
+        """
+        use_store = filename is None
+        if use_store and self.store is None:
+            raise ValueError("filename is required when the image store is disabled")
+        
+        try:
+            if use_store:
+                asset = self.store.lookup_url(url)
+                if asset is not None:
+                    self.logger.info(f"Image served from store: {asset['path']} ({url[:80]})")
+                    return asset
+            
+            data = self._fetch_image_bytes(url, cancel_event)
+            if data is None:
+                return None
             
-            # Verify the image is valid and resize if needed
             try:
-                with Image.open(filename) as img:
-                    # Convert to RGB if necessary
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Resize if too large
-                    max_size = (1200, 800)
-                    if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                        img.save(filename, 'JPEG', quality=85)
-                        self.logger.info(f"Resized image: {filename}")
-                    
-                    self.logger.info(f"Downloaded image: {filename} ({img.size[0]}x{img.size[1]})")
-                    return True
+                phash = self.image_processor.fingerprint(data)
+                
+                if use_store:
+                    asset = self.store.find_similar(phash)
+                    if asset is not None:
+                        # Same picture from another URL: reuse the encoded variants
+                        self.store.link_url(url, asset['phash'])
+                        self.logger.info(f"Image already in store: {asset['path']} ({url[:80]})")
+                        return asset
+                    filename = self.store.path_for(phash)
+                
+                # Verify the image is valid and encode the resized variants
+                result = self.image_processor.process(data)
+                filename = self.image_processor.primary_path(filename)
+                variants = self.image_processor.save(result, filename)
+                
+                widest = max(variants, key=lambda v: v['width'])
+                self.logger.info(f"Downloaded image: {filename} ({widest['width']}x{widest['height']}, "
+                                 f"{len(variants)} variants, source {result['source_width']}x{result['source_height']})")
+                
+                if use_store:
+                    return self.store.add(phash, variants, url, filename)
+                return {
+                    'phash': phash,
+                    'path': filename,
+                    'width': widest['width'],
+                    'height': widest['height'],
+                    'variants': variants,
+                }
                     
             except Exception as e:
-                self.logger.error(f"Error processing image {filename}: {str(e)}")
-                # Remove invalid image file
-                try:
-                    os.remove(filename)
-                except:
-                    pass
-                return False
+                self.logger.error(f"Error processing image {filename or url}: {str(e)}")
+                return None
                 
+        except CancelledError:
+            self.logger.debug(f"Download cancelled: {url}")
+            return None
         except Exception as e:
             self.logger.error(f"Error downloading image from {url}: {str(e)}")
-            return False
+            return None
     
-    def get_image_urls(self, query, max_images=3):
+    def download_image(self, url, filename, cancel_event=None):
+        """
+        Download a single image.
+        
+        The image is downloaded into memory, decoded once and saved as a JPEG
+        of at most IMAGE_MAX_SIZE at ``filename``, plus smaller WebP/JPEG
+        variants next to it for srcset (fetch_image returns them with the asset).
+        
+        Args:
+            url (str): Image URL
+            filename (str): Local filename to save (written as JPEG)
+            cancel_event (threading.Event): Abort the download when set
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.fetch_image(url, cancel_event, filename) is not None
+    
+    def get_image_urls(self, query, max_images=3, verify=None):
         """
         Get image URLs for a given query without downloading.
         
         Args:
             query (str): Search query
             max_images (int): Maximum number of images to get
+            verify (bool): Probe candidates and drop dead, non-image or oversized
+                URLs (default: IMAGE_PROBE_ENABLED)
             
         Returns:
             list: List of image URLs for hotlinking
         """
+        return [result.murl for result in self.get_image_results(query, max_images, verify)]
+    
+    def get_post_images(self, query, max_images=3, verify=None):
+        """
+        Get hotlinkable images for a post with their Bing thumbnails.
+        
+        Args:
+            query (str): Search query
+            max_images (int): Maximum number of images to get
+            verify (bool): Probe the full-size URLs first (default: IMAGE_PROBE_ENABLED)
+            
+        Returns:
+            list: Dicts for utils.insert_images_to_content (url, thumbnail,
+                  thumbnail_width, width, height, title)
+        """
+        return [
+            result.to_embed(self.config.IMAGE_THUMBNAIL_WIDTH)
+            for result in self.get_image_results(query, max_images, verify)
+        ]
+    
+    def get_image_results(self, query, max_images=3, verify=None):
+        """
+        Get image search results for a given query without downloading.
+        
+        Args:
+            query (str): Search query
+            max_images (int): Maximum number of images to get
+            verify (bool): Probe candidates and drop dead, non-image or oversized
+                URLs (default: IMAGE_PROBE_ENABLED)
+            
+        Returns:
+            list: BingImageResult objects (full-size URL, thumbnail URL, dimensions)
+        """
+        if verify is None:
+            verify = self.config.IMAGE_PROBE_ENABLED
+        
         try:
-            # Search for images
-            image_urls = self.search_images(query, max_images * 2)  # Get more URLs to ensure we get enough valid images
+            # Search for images (probing rejects some, so ask for more candidates)
+            results = self.search_image_results(query, max_images * (3 if verify else 2))  # Get more URLs to ensure we get enough valid images
             
-            if not image_urls:
+            if not results:
                 self.logger.warning(f"No images found for query: {query}")
                 return []
             
             # Filter and validate URLs
-            valid_urls = []
-            for url in image_urls:
-                if len(valid_urls) >= max_images:
-                    break
-                    
-                if is_valid_image_url(url):
-                    valid_urls.append(url)
-                    self.logger.info(f"Found valid image URL: {url[:100]}...")
+            candidates = [result for result in results if is_valid_image_url(result.murl)]
+            if verify:
+                verified = set(self.verify_image_urls([result.murl for result in candidates], max_images))
+                valid_results = [result for result in candidates if result.murl in verified]
+            else:
+                valid_results = candidates[:max_images]
+            
+            for result in valid_results:
+                self.logger.info(f"Found valid image URL: {result.murl[:100]}...")
             
-            self.logger.info(f"Found {len(valid_urls)} valid image URLs for query: {query}")
-            return valid_urls
+            self.logger.info(f"Found {len(valid_results)} valid image URLs for query: {query}")
+            return valid_results
             
         except Exception as e:
-            self.logger.error(f"Error in get_image_urls: {str(e)}")
+            self.logger.error(f"Error in get_image_results: {str(e)}")
             return []
+    
+    def probe_image_url(self, url, timeout=None, cancel_event=None):
+        """
+        Check that a hotlinked image is alive, is an image and is not too large.
+        
+        Sends a HEAD request; hosts that reject HEAD or omit the headers get a
+        small ranged GET instead, whose first bytes are sniffed for an image
+        signature. The full file is never downloaded.
+        
+        Args:
+            url (str): Image URL
+            timeout (float): Timeout per request (default: IMAGE_PROBE_TIMEOUT)
+            cancel_event (threading.Event): Give up when set
+            
+        Returns:
+            bool: True if the URL can be hotlinked
+        """
+        if timeout is None:
+            timeout = self.config.IMAGE_PROBE_TIMEOUT
+        
+        try:
+            with self.host_limiter.slot(url, cancel_event):
+                status, content_type, size = None, '', None
+                try:
+                    response = self.backend.head(url, timeout=timeout, allow_redirects=True)
+                    status = response.status_code
+                    content_type = response.headers.get('content-type', '').lower()
+                    size = response.headers.get('content-length')
+                    response.close()
+                except NotImplementedError:
+                    pass
+                
+                if status in (404, 410):
+                    self.logger.debug(f"Image probe rejected {url}: HTTP {status}")
+                    return False
+                
+                first_bytes = b''
+                if status is None or status >= 400 or not content_type.startswith('image/') or not size:
+                    # Many hosts refuse HEAD or omit headers; ask for the first bytes only
+                    response = self.backend.get(
+                        url, timeout=timeout, stream=True,
+                        headers={'Range': f'bytes=0-{self.PROBE_BYTES - 1}'}
+                    )
+                    try:
+                        status = response.status_code
+                        content_type = response.headers.get('content-type', '').lower()
+                        content_range = response.headers.get('content-range', '')
+                        if '/' in content_range:
+                            size = content_range.rsplit('/', 1)[1]
+                        else:
+                            size = response.headers.get('content-length')
+                        if status < 400:
+                            first_bytes = next(iter(response.iter_content(chunk_size=self.PROBE_BYTES)), b'')
+                    finally:
+                        response.close()
+            
+            rejection = probe_rejection(status, content_type, size, first_bytes, self.config.IMAGE_MAX_BYTES)
+            if rejection:
+                self.logger.debug(f"Image probe rejected {url}: {rejection}")
+                return False
+            
+            return True
+            
+        except CancelledError:
+            return False
+        except Exception as e:
+            self.logger.debug(f"Image probe failed for {url}: {str(e)}")
+            return False
+    
+    def verify_image_urls(self, urls, max_images, budget=None):
+        """
+        Probe image URLs in parallel and keep the ones that can be hotlinked.
+        
+        Stops as soon as ``max_images`` URLs passed, or when the time budget is
+        used up; probes still running then are abandoned.
+        
+        Args:
+            urls (list): Candidate image URLs, best first
+            max_images (int): Number of good URLs wanted
+            budget (float): Seconds allowed for the whole check (default: IMAGE_PROBE_BUDGET)
+            
+        Returns:
+            list: Verified URLs in their original order
+        """
+        if not urls:
+            return []
+        if budget is None:
+            budget = self.config.IMAGE_PROBE_BUDGET
+        
+        deadline = time.monotonic() + budget
+        timeout = min(self.config.IMAGE_PROBE_TIMEOUT, budget)
+        cancel_event = threading.Event()
+        verified = {}
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.config.IMAGE_PROBE_WORKERS, len(urls))),
+            thread_name_prefix="image-probe"
+        )
+        futures = {executor.submit(self.probe_image_url, url, timeout, cancel_event): i for i, url in enumerate(urls)}
+        try:
+            for future in as_completed(futures, timeout=budget):
+                i = futures[future]
+                if future.result():
+                    verified[i] = urls[i]
+                    if len(verified) >= max_images:
+                        break
+        except FuturesTimeoutError:
+            self.logger.warning(f"Image probe budget of {budget:.1f}s used up, {len(verified)} URL(s) verified")
+        finally:
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        self.logger.info(f"Verified {len(verified)}/{len(urls)} image URLs in {budget - max(0.0, deadline - time.monotonic()):.1f}s")
+        return [verified[i] for i in sorted(verified)]
 
-    def download_images(self, query, max_images=3):
+    def download_images(self, query, max_images=3, max_workers=None):
         """
         Download images for a given query.
         
+        Candidates are downloaded in parallel (per-host politeness limits
+        apply). Images already in the image store are not downloaded again,
+        and candidates that look like an image already picked for this query
+        (near-identical perceptual hash) are skipped. As soon as
+        ``max_images`` distinct images are in hand, the remaining downloads
+        are cancelled.
+        
         Args:
             query (str): Search query
             max_images (int): Maximum number of images to download
+            max_workers (int): Parallel downloads (1 = one after another)
             
         Returns:
-            list: List of downloaded image file paths
+            list: Assets (phash, path, width, height, variants) in search result order,
+                  ready for utils.insert_images_to_content (srcset over the variants)
         """
         # Search for images
         image_urls = self.search_images(query, max_images * 3)  # Get more URLs to ensure we get enough valid images
@@ -214,46 +698,156 @@ class BingImageScraper:
             self.logger.warning(f"No images found for query: {query}")
             return []
         
-        # Create images directory if it doesn't exist
-        images_dir = "images"
-        os.makedirs(images_dir, exist_ok=True)
+        candidates = []
+        if self.store is not None:
+            # Stored under their perceptual hash, so no per-query filenames to collide
+            candidates = [(i, url, None) for i, url in enumerate(image_urls)]
+        else:
+            # Create images directory if it doesn't exist
+            images_dir = "images"
+            os.makedirs(images_dir, exist_ok=True)
+            
+            query_clean = clean_filename(query)
+            for i, url in enumerate(image_urls):
+                # Generate filename (images are re-encoded, so always JPEG)
+                filename = f"{query_clean}_{i+1}.jpg"
+                candidates.append((i, url, os.path.join(images_dir, filename)))
         
-        # Download images
-        downloaded_paths = []
-        query_clean = clean_filename(query)
+        if max_workers is None:
+            max_workers = self.config.IMAGE_DOWNLOAD_WORKERS
+        max_workers = max(1, min(int(max_workers), len(candidates)))
         
-        for i, url in enumerate(image_urls):
-            if len(downloaded_paths) >= max_images:
-                break
-                
+        # Download images
+        downloaded = {}
+        duplicates = 0
+        cancel_event = threading.Event()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image") as executor:
+            futures = {
+                executor.submit(self.fetch_image, url, cancel_event, filepath): i
+                for i, url, filepath in candidates
+            }
             try:
-                # Generate filename
-                url_path = urlparse(url).path
-                extension = os.path.splitext(url_path)[1].lower()
-                if not extension or extension not in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-                    extension = '.jpg'
-                
-                filename = f"{query_clean}_{i+1}{extension}"
-                filepath = os.path.join(images_dir, filename)
-                
-                # Download the image
-                if self.download_image(url, filepath):
-                    downloaded_paths.append(filepath)
-                    self.logger.info(f"Successfully downloaded: {filepath}")
-                else:
-                    self.logger.warning(f"Failed to download image {i+1}")
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        asset = future.result()
+                    except CancelledError:
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"Error downloading image {i+1}: {str(e)}")
+                        continue
                     
-            except Exception as e:
-                self.logger.error(f"Error downloading image {i+1}: {str(e)}")
-                continue
+                    if asset is None:
+                        if not cancel_event.is_set():
+                            self.logger.warning(f"Failed to download image {i+1}")
+                        continue
+                    
+                    duplicate = is_near_duplicate(
+                        asset['phash'], (kept['phash'] for kept in downloaded.values()), self.config.IMAGE_DUPLICATE_DISTANCE
+                    )
+                    if duplicate:
+                        duplicates += 1
+                        self.logger.info(f"Skipping near-duplicate image {i+1}: {asset['path']}")
+                    
+                    if duplicate or len(downloaded) >= max_images:
+                        # Not used for this post; files in the store are kept for later posts
+                        if self.store is None:
+                            for variant in asset['variants']:
+                                os.remove(variant['path'])
+                        continue
+                    
+                    downloaded[i] = asset
+                    self.logger.info(f"Successfully downloaded: {asset['path']}")
+                    if len(downloaded) >= max_images:
+                        # Enough images: stop queued and in-flight downloads
+                        cancel_event.set()
+                        for pending in futures:
+                            pending.cancel()
+            finally:
+                cancel_event.set()
+        
+        assets = [downloaded[i] for i in sorted(downloaded)]
+        self.logger.info(f"Downloaded {len(assets)} images for query: {query}"
+                         + (f" ({duplicates} near-duplicates skipped)" if duplicates else ""))
+        return assets
+    
+    def get_store_stats(self):
+        """Get asset counts and reuse counters of the image store (None when disabled)."""
+        return self.store.stats() if self.store is not None else None
+    
+    def get_connection_stats(self):
+        """
+        Get connection reuse counters of the pooled session.
+        
+        Counts cover the per-host pools currently held (up to
+        IMAGE_HTTP_POOL_HOSTS hosts; the least recently used are dropped).
         
-        self.logger.info(f"Downloaded {len(downloaded_paths)} images for query: {query}")
-        return downloaded_paths
+        Returns:
+            dict: hosts, requests, connections opened, reused requests and reuse rate
+        """
+        requests_sent = connections = hosts = 0
+        for adapter in {id(a): a for a in self.session.adapters.values()}.values():
+            pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+            if pools is None:
+                continue
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                hosts += 1
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+        reused = max(0, requests_sent - connections)
+        return {
+            'hosts': hosts,
+            'requests': requests_sent,
+            'connections': connections,
+            'reused': reused,
+            'reuse_rate': round(reused / requests_sent, 3) if requests_sent else 0.0,
+        }
+    
+    def get_cache_stats(self):
+        """Get hit/miss counters of the search result cache (None when disabled)."""
+        return self.cache.stats() if self.cache is not None else None
     
     def close(self):
-        """Close the session."""
+        """Close the session, the search result cache and the image store."""
         try:
+            self.backend.close()
             self.session.close()
+            self.image_processor.close()
+            if self.cache is not None and self._owns_cache:
+                self.cache.close()
+            if self.store is not None and self._owns_store:
+                self.store.close()
             self.logger.info("Image scraper session closed successfully")
         except Exception as e:
             self.logger.error(f"Error closing session: {str(e)}")
+
+_shared_scraper = None
+_shared_lock = threading.Lock()
+
+def get_shared_scraper():
+    """
+    Get the process-wide BingImageScraper.
+    
+    Bulk runs, the dashboard and the scheduler share one scraper so its
+    keep-alive connections to Bing and the image hosts, the search cache
+    and the image store are reused across keywords. Don't close it; it is
+    closed at interpreter exit (or by close_shared_scraper).
+    """
+    global _shared_scraper
+    with _shared_lock:
+        if _shared_scraper is None:
+            _shared_scraper = BingImageScraper()
+        return _shared_scraper
+
+def close_shared_scraper():
+    """Close the shared scraper; the next get_shared_scraper() builds a new one."""
+    global _shared_scraper
+    with _shared_lock:
+        if _shared_scraper is not None:
+            _shared_scraper.close()
+            _shared_scraper = None
+
+atexit.register(close_shared_scraper)
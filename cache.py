@@ -0,0 +1,161 @@
+"""
+Persistent on-disk response cache.
+Content-addressed key/value store in SQLite with TTL expiry and
+size-bounded LRU eviction, shared safely between threads and processes.
+An optional in-memory LRU in front of it answers repeat lookups without
+touching the database.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    """SQLite-backed LRU cache for JSON-serializable values."""
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = None, memory_entries: int = 0):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (serialized value, created_at), most recently used last
+        self._memory = OrderedDict()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)")
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a content-addressed key from any JSON-serializable parts."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if self.ttl_seconds is None or now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return json.loads(value)
+                del self._memory[key]
+
+            row = self._conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, value, created_at)
+            self.hits += 1
+
+        return json.loads(value)
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Keep a serialized value in the in-memory LRU (if enabled)."""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def set(self, key: str, value: Any):
+        """Store a value and evict least recently used entries beyond max_bytes."""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, size, now, now)
+            )
+            self._remember(key, data, now)
+            self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones until under max_bytes."""
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self.evictions += max(cursor.rowcount, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at LIMIT 32").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                self.evictions += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size of the cache."""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'memory_hits': self.memory_hits,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': total,
+        }
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._memory.clear()
+
+    def close(self):
+        """Close the underlying database connection."""
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            self.logger.error(f"Error closing cache {self.path}: {str(e)}")
@@ -14,10 +14,85 @@ class Config:
     GEMINI_MODEL: str = "gemini-1.5-flash"
     GEMINI_TEMPERATURE: float = 0.9
     GEMINI_MAX_TOKENS: int = 8192
+    GEMINI_CONCURRENCY_PER_KEY: int = 2
+    GEMINI_RPM_PER_KEY: int = 15
+    GEMINI_TPM_PER_KEY: int = 1000000
+    GEMINI_KEY_COOLDOWN: int = 60
+    GEMINI_KEY_WAIT_TIMEOUT: int = 180
+    
+    # Gemini retry settings (exponential backoff with full jitter)
+    GEMINI_RETRY_ATTEMPTS: int = 4
+    GEMINI_RETRY_BASE_DELAY: float = 2.0
+    GEMINI_RETRY_MAX_DELAY: float = 60.0
+    
+    # Per-key circuit breaker: stop using a key after repeated failures
+    GEMINI_BREAKER_THRESHOLD: int = 5
+    GEMINI_BREAKER_OPEN_SECONDS: int = 120
+    
+    # Gemini response cache settings
+    GEMINI_CACHE_ENABLED: bool = True
+    GEMINI_CACHE_PATH: str = "cache/gemini_responses.db"
+    GEMINI_CACHE_MAX_BYTES: int = 200 * 1024 * 1024
+    GEMINI_CACHE_TTL: int = 30 * 24 * 3600
     
     # Bing Image settings
     MAX_IMAGES_PER_POST: int = 3
     IMAGE_SEARCH_TIMEOUT: int = 30
+    IMAGE_SEARCH_PAGE_SIZE: int = 35  # results per Bing page ("first" offset step)
+    IMAGE_SEARCH_MAX_PAGES: int = 4
+    IMAGE_SEARCH_PAGE_WORKERS: int = 3
+    IMAGE_THUMBNAIL_WIDTH: int = 600  # Bing thumbnail used as <img src>; full image only via srcset
+    
+    # Image download settings (politeness is enforced per host, not globally)
+    IMAGE_DOWNLOAD_WORKERS: int = 6
+    IMAGE_HOST_CONCURRENCY: int = 2
+    IMAGE_HOST_MIN_INTERVAL: float = 0.5
+    
+    # Pooled HTTP session shared by a whole run (keep-alive, per-host pools, retries)
+    IMAGE_HTTP_POOL_HOSTS: int = 32  # hosts with a pool kept open
+    IMAGE_HTTP_POOL_SIZE: int = 8  # keep-alive connections kept per host
+    IMAGE_HTTP_RETRIES: int = 2
+    IMAGE_ASYNC_CONCURRENCY: int = 16  # requests in flight in AsyncBingImageScraper
+    
+    # Downloaded image processing: responsive variants for srcset
+    IMAGE_MAX_SIZE: tuple = (1200, 800)
+    IMAGE_VARIANT_WIDTHS: tuple = (320, 640, 960, 1200)
+    IMAGE_VARIANT_FORMATS: tuple = ("webp", "jpeg")
+    IMAGE_JPEG_QUALITY: int = 85
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_PROCESS_WORKERS: int = 0  # 0 = one per CPU
+    
+    # Content-addressed image store (perceptual hash -> processed variants, URL index)
+    IMAGE_STORE_ENABLED: bool = True
+    IMAGE_STORE_DIR: str = "images/store"
+    IMAGE_STORE_MATCH_DISTANCE: int = 4  # hash bits; reuse a stored image this close
+    IMAGE_DUPLICATE_DISTANCE: int = 8  # hash bits; images this close count as duplicates in a post
+    
+    # Liveness probing of hotlinked image URLs (HEAD / small ranged GET)
+    IMAGE_PROBE_ENABLED: bool = True
+    IMAGE_PROBE_WORKERS: int = 8
+    IMAGE_PROBE_TIMEOUT: float = 4.0
+    IMAGE_PROBE_BUDGET: float = 8.0  # seconds per post
+    IMAGE_MAX_BYTES: int = 5 * 1024 * 1024
+    
+    # Bing image search result cache (query -> image URLs)
+    IMAGE_SEARCH_CACHE_ENABLED: bool = True
+    IMAGE_SEARCH_CACHE_PATH: str = "cache/bing_search.db"
+    IMAGE_SEARCH_CACHE_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_SEARCH_CACHE_TTL: int = 7 * 24 * 3600
+    IMAGE_SEARCH_CACHE_MEMORY_ENTRIES: int = 512
+    
+    # Post storage: indexed SQLite store shared by the dashboard and scheduler
+    POST_STORE_PATH: str = "posts.db"
+    POSTS_FILE: str = "posts.json"  # legacy posts file, imported into an empty store
+    
+    # Scheduled runs: per-keyword checkpoints so an interrupted run is resumed
+    RUN_JOURNAL_PATH: str = "scheduler_runs.db"
+    RUN_MAX_ATTEMPTS: int = 3  # generation attempts per keyword across resumes
+    # "refresh" policy: regenerate a known keyword after this many days. Regenerations bypass
+    # the Gemini response cache, but keep this above GEMINI_CACHE_TTL (30 days) anyway so a
+    # refresh is never due while the previous article is still the cached answer
+    KEYWORD_REFRESH_DAYS: int = 31
     
     # Content generation settings
     MIN_ARTICLE_LENGTH: int = 1000
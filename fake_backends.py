@@ -0,0 +1,391 @@
+"""
+Offline stand-ins for the Gemini API and Bing/image hosts.
+They plug into GeminiScraper(backend=...) and BingImageScraper(backend=...)
+to load-test the generation pipeline without quota or network access.
+
+Every outcome (latency, injected error, payload) is derived from the seed and
+the request itself, so runs are reproducible even when requests are issued
+from many threads in a different order.
+"""
+
+import io
+import json
+import asyncio
+import math
+import time
+import random
+import hashlib
+import threading
+from html import escape
+from urllib.parse import urlparse, parse_qs
+
+from backends import GeminiBackend, HttpBackend, AsyncHttpBackend, AsyncHttpResponse
+
+
+class FakeAPIError(Exception):
+    """Error raised by the fake backends; the message mimics the real API."""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"{status_code} {message}")
+        self.status_code = status_code
+
+
+ERROR_MESSAGES = {
+    429: "Resource has been exhausted (e.g. check quota).",
+    500: "An internal error has occurred. Please retry or report.",
+    503: "The service is currently unavailable.",
+}
+
+
+class LatencyModel:
+    """
+    Latency distribution in seconds.
+
+    Args:
+        kind (str): "constant", "uniform", "normal" or "lognormal"
+        mean (float): Mean (constant/normal) or median (lognormal) latency
+        spread (float): Half-width (uniform), stddev (normal) or sigma (lognormal)
+        minimum (float): Lower bound applied to every sample
+    """
+
+    def __init__(self, kind="lognormal", mean=1.0, spread=0.3, minimum=0.0):
+        if kind not in ("constant", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.mean = mean
+        self.spread = spread
+        self.minimum = minimum
+
+    def sample(self, rng):
+        if self.kind == "constant":
+            value = self.mean
+        elif self.kind == "uniform":
+            value = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            value = rng.gauss(self.mean, self.spread)
+        else:
+            value = self.mean * math.exp(rng.gauss(0.0, self.spread))
+        return max(self.minimum, value)
+
+
+class _Outcomes:
+    """Deterministic per-request random streams and call statistics."""
+
+    def __init__(self, seed, error_rates, latency, time_scale):
+        self.seed = seed
+        self.error_rates = dict(error_rates or {})
+        self.latency = latency
+        self.time_scale = time_scale
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": {}, "simulated_seconds": 0.0}
+
+    def rng_for(self, *parts):
+        """RNG seeded by the request content and how often it was seen before."""
+        request_id = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(request_id, 0)
+            self._attempts[request_id] = attempt + 1
+            self.stats["calls"] += 1
+        return random.Random(f"{self.seed}:{request_id}:{attempt}")
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.stats["simulated_seconds"] += seconds
+        if seconds > 0 and self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def maybe_fail(self, rng):
+        """Raise an injected error according to error_rates ({status: probability})."""
+        roll = rng.random()
+        threshold = 0.0
+        for status, rate in sorted(self.error_rates.items()):
+            threshold += rate
+            if roll < threshold:
+                with self._lock:
+                    self.stats["errors"][status] = self.stats["errors"].get(status, 0) + 1
+                raise FakeAPIError(status, ERROR_MESSAGES.get(status, "Error"))
+
+
+class _FakeUsage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class _FakeGeminiResponse:
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+class FakeGeminiBackend(GeminiBackend):
+    """
+    Gemini stand-in with configurable latency, error rates and canned payloads.
+
+    Args:
+        latency (LatencyModel): Time to the first token of a response
+        error_rates (dict): Probability per status code, e.g. {429: 0.05, 500: 0.01}
+        seed (int): Seed for all random outcomes
+        payloads (dict): Optional canned "title", "article" and "json" responses
+        tokens_per_second (float): Output speed; adds decode time to responses and paces streamed chunks
+        time_scale (float): Multiplier for real sleeping (0 = no sleeping)
+    """
+
+    def __init__(self, latency=None, error_rates=None, seed=0, payloads=None,
+                 tokens_per_second=400.0, time_scale=1.0):
+        self.outcomes = _Outcomes(seed, error_rates, latency or LatencyModel("lognormal", 1.5, 0.4), time_scale)
+        self.payloads = payloads or {}
+        self.tokens_per_second = tokens_per_second
+
+    @property
+    def stats(self):
+        return self.outcomes.stats
+
+    def _topic(self, prompt):
+        start = prompt.find('"')
+        end = prompt.find('"', start + 1)
+        return prompt[start + 1:end] if start != -1 and end != -1 else "topik"
+
+    def _article(self, topic, rng):
+        sections = []
+        for i in range(6):
+            sentences = " ".join(
+                f"Kalimat {j + 1} tentang {topic} membahas aspek {rng.randint(1, 999)} secara rinci."
+                for j in range(14)
+            )
+            sections.append(f"## Subjudul {i + 1}: {topic}\n\n{sentences}")
+        return f"# {topic.title()}\n\n" + "\n\n".join(sections)
+
+    def _section(self, topic, rng):
+        paragraphs = []
+        for i in range(3):
+            paragraphs.append(" ".join(
+                f"Kalimat {j + 1} tentang {topic} membahas aspek {rng.randint(1, 999)} secara rinci."
+                for j in range(5)
+            ))
+        return "\n\n".join(paragraphs)
+
+    def _payload(self, prompt, generation_config, rng):
+        topic = self._topic(prompt)
+        if "article outline" in prompt:
+            return self.payloads.get("outline") or json.dumps({
+                "title": f"{topic.title()} {rng.randint(1, 99)}",
+                "excerpt": f"Ringkasan singkat tentang {topic}.",
+                "tags": [word.lower() for word in topic.split()[:4]],
+                "sections": [
+                    {"heading": f"Subjudul {i + 1}: {topic}", "points": [f"Poin {j + 1}" for j in range(3)]}
+                    for i in range(7)
+                ],
+            }, ensure_ascii=False)
+        if "Write only the section" in prompt:
+            return self.payloads.get("section") or self._section(topic, rng)
+        if "title writer" in prompt:
+            return self.payloads.get("title") or f"{topic.title()} {rng.randint(1, 99)}"
+        if (generation_config or {}).get("response_mime_type") == "application/json":
+            data = self.payloads.get("json") or {
+                "title": f"{topic.title()} {rng.randint(1, 99)}",
+                "excerpt": f"Ringkasan singkat tentang {topic}.",
+                "tags": [word.lower() for word in topic.split()[:4]],
+                "body": self._article(topic, rng).split("\n", 1)[1].strip(),
+            }
+            return json.dumps(data, ensure_ascii=False)
+        return self.payloads.get("article") or self._article(topic, rng)
+
+    def generate_content(self, api_key, prompt, generation_config, stream=False):
+        # The key is left out of the seed: which key serves a request depends on thread timing
+        rng = self.outcomes.rng_for(prompt, generation_config)
+        latency = self.outcomes.latency.sample(rng)
+        text = self._payload(prompt, generation_config, rng)
+        prompt_tokens = len(prompt) // 4
+        output_tokens = len(text) // 4
+
+        if not stream:
+            self.outcomes.sleep(latency + output_tokens / self.tokens_per_second)
+            self.outcomes.maybe_fail(rng)
+            return _FakeGeminiResponse(text, _FakeUsage(prompt_tokens, output_tokens))
+        return self._stream(text, latency, rng, prompt_tokens, output_tokens)
+
+    def _stream(self, text, first_token_latency, rng, prompt_tokens, output_tokens):
+        self.outcomes.sleep(first_token_latency)
+        self.outcomes.maybe_fail(rng)
+
+        chunk_size = 400
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for i, chunk in enumerate(chunks):
+            if i:
+                self.outcomes.sleep((len(chunk) / 4) / self.tokens_per_second)
+            usage = _FakeUsage(prompt_tokens, output_tokens) if i == len(chunks) - 1 else None
+            yield _FakeGeminiResponse(chunk, usage)
+
+
+class FakeHttpResponse:
+    """Minimal requests.Response look-alike."""
+
+    def __init__(self, url, status_code=200, content=b"", headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise FakeAPIError(self.status_code, f"Error for url: {self.url}")
+
+    def close(self):
+        pass
+
+
+class FakeBingBackend(HttpBackend):
+    """
+    Stand-in for Bing image search result pages and the image hosts they link to.
+
+    Args:
+        search_latency (LatencyModel): Latency of a search result page
+        image_latency (LatencyModel): Latency of an image download
+        error_rates (dict): Probability per status code for every request
+        seed (int): Seed for all random outcomes
+        results_per_page (int): Number of a.iusc results on each page
+        image_size (tuple): Width and height of generated images
+        distinct_images (int): Number of different pictures the image URLs map to
+        time_scale (float): Multiplier for real sleeping (0 = no sleeping)
+    """
+
+    def __init__(self, search_latency=None, image_latency=None, error_rates=None, seed=0,
+                 results_per_page=35, image_size=(1600, 1067), distinct_images=500, time_scale=1.0):
+        self.outcomes = _Outcomes(seed, error_rates, search_latency or LatencyModel("lognormal", 0.6, 0.3), time_scale)
+        self.image_latency = image_latency or LatencyModel("lognormal", 0.3, 0.5)
+        self.results_per_page = results_per_page
+        self.image_size = image_size
+        self.distinct_images = distinct_images
+        self._images = {}
+        self._image_lock = threading.Lock()
+
+    @property
+    def stats(self):
+        return self.outcomes.stats
+
+    def _search_page(self, query, first, rng):
+        items = []
+        for i in range(self.results_per_page):
+            n = first + i
+            width, height = rng.choice([(1600, 1067), (1200, 800), (800, 600), (640, 480)])
+            m = {
+                "murl": f"https://img{n % 5}.example.com/photos/{query.replace(' ', '-')}-{n}.jpg",
+                "turl": f"https://tse{n % 4}.mm.bing.net/th?id=OIP.{query.replace(' ', '')}{n}&pid=Api",
+                "t": f"{query} {n}",
+            }
+            items.append(
+                f'<li><div class="imgpt"><a class="iusc" m="{escape(json.dumps(m), quote=True)}" href="#">'
+                f'<img class="mimg" height="{height // 5}" width="{width // 5}"></a>'
+                f'<div class="img_info"><span class="nowrap">{width} x {height} · jpeg</span></div></div></li>'
+            )
+        body = "<ul class=\"dgControl_list\">" + "".join(items) + "</ul>"
+        return f"<!DOCTYPE html><html><head><title>{escape(query)} - Bing images</title></head><body>{body}</body></html>"
+
+    def _image(self, url):
+        """
+        A generated JPEG for an image URL (needs Pillow, like the real pipeline).
+
+        URLs map to one of ``distinct_images`` pictures of random shapes, so
+        different URLs can serve the same picture, as they do on the web.
+        """
+        picture = int(hashlib.sha256(url.encode("utf-8")).hexdigest(), 16) % self.distinct_images
+        with self._image_lock:
+            if picture not in self._images:
+                from PIL import Image, ImageDraw
+
+                rng = random.Random(f"{self.outcomes.seed}:picture:{picture}")
+                width, height = self.image_size
+                image = Image.new("RGB", self.image_size, tuple(rng.randrange(256) for _ in range(3)))
+                draw = ImageDraw.Draw(image)
+                for _ in range(12):
+                    x, y = rng.randrange(width), rng.randrange(height)
+                    box = (x, y, x + rng.randrange(width // 8, width // 2), y + rng.randrange(height // 8, height // 2))
+                    shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+                    shape(box, fill=tuple(rng.randrange(256) for _ in range(3)))
+                buffer = io.BytesIO()
+                image.save(buffer, "JPEG", quality=80)
+                self._images[picture] = buffer.getvalue()
+            return self._images[picture]
+
+    def get(self, url, **kwargs):
+        parsed = urlparse(url)
+        rng = self.outcomes.rng_for(url, kwargs.get("headers"))
+
+        if "bing.com" in parsed.netloc and parsed.path.startswith("/images/search"):
+            self.outcomes.sleep(self.outcomes.latency.sample(rng))
+            try:
+                self.outcomes.maybe_fail(rng)
+            except FakeAPIError as e:
+                return FakeHttpResponse(url, e.status_code, b"", {"content-type": "text/html"})
+            params = parse_qs(parsed.query)
+            query = params.get("q", [""])[0].replace("+", " ")
+            first = int(params.get("first", ["1"])[0])
+            html = self._search_page(query, first, rng).encode("utf-8")
+            return FakeHttpResponse(url, 200, html, {"content-type": "text/html; charset=utf-8"})
+
+        self.outcomes.sleep(self.image_latency.sample(rng))
+        try:
+            self.outcomes.maybe_fail(rng)
+        except FakeAPIError as e:
+            return FakeHttpResponse(url, e.status_code, b"", {"content-type": "text/html"})
+
+        content = self._image(url)
+        range_header = (kwargs.get("headers") or {}).get("Range", "")
+        if range_header.startswith("bytes="):
+            start, _, end = range_header[len("bytes="):].partition("-")
+            start, end = int(start or 0), min(int(end or len(content) - 1), len(content) - 1)
+            return FakeHttpResponse(url, 206, content[start:end + 1], {
+                "content-type": "image/jpeg",
+                "content-length": str(end - start + 1),
+                "content-range": f"bytes {start}-{end}/{len(content)}",
+            })
+        return FakeHttpResponse(url, 200, content, {
+            "content-type": "image/jpeg",
+            "content-length": str(len(content)),
+        })
+
+    def head(self, url, **kwargs):
+        response = self.get(url, **kwargs)
+        response.content = b""
+        return response
+
+
+class FakeAsyncBingBackend(AsyncHttpBackend):
+    """
+    Asyncio stand-in for Bing and the image hosts.
+
+    Serves the same pages, images and injected errors as FakeBingBackend
+    (built with the same arguments), but waits with asyncio.sleep instead
+    of blocking the thread.
+    """
+
+    def __init__(self, time_scale=1.0, **kwargs):
+        self.sync = FakeBingBackend(time_scale=0, **kwargs)
+        self.time_scale = time_scale
+
+    @property
+    def stats(self):
+        return self.sync.stats
+
+    async def request(self, method, url, headers=None, timeout=30, max_bytes=None):
+        # The synchronous fake doesn't sleep (time_scale=0); the latency it
+        # sampled is the growth of simulated_seconds, read before any await
+        before = self.sync.stats["simulated_seconds"]
+        fetch = self.sync.head if method == "HEAD" else self.sync.get
+        response = fetch(url, headers=headers or {})
+        latency = self.sync.stats["simulated_seconds"] - before
+        if latency > 0 and self.time_scale > 0:
+            await asyncio.sleep(latency * self.time_scale)
+        content = response.content if max_bytes is None else response.content[:max_bytes + 1]
+        return AsyncHttpResponse(url, response.status_code, response.headers, content)
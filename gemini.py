@@ -4,25 +4,131 @@ This module handles interaction with Gemini AI using Google's official API.
 """
 
 import os
+import re
+import json
+import time
 import logging
-from langdetect import detect, DetectorFactory
-from langcodes import Language
-import google.generativeai as genai
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
+from cache import DiskCache
+from keypool import KeyPool
+from retry import RetryPolicy
+from backends import GenaiBackend
+from utils import split_title_and_content, extract_excerpt_from_content
 
-# Pastikan deteksi bahasa konsisten
-DetectorFactory.seed = 0
+# Deskripsi gaya penulisan untuk prompt artikel
+STYLE_DESCRIPTIONS = {
+    "formal": "formal dan profesional dengan bahasa baku dan struktur yang teratur",
+    "informal": "santai dan ramah dengan bahasa sehari-hari yang mudah dipahami",
+    "lucu": "humoris dan menghibur dengan gaya yang ringan dan penuh candaan",
+    "serius": "serius dan mendalam dengan analisis yang komprehensif",
+    "informatif": "informatif dan edukatif dengan fakta dan data yang akurat",
+    "persuasif": "persuasif dengan argumen kuat dan call-to-action yang jelas",
+    "naratif": "bercerita dengan alur yang menarik dan detail yang hidup",
+    "deskriptif": "deskriptif dengan penjelasan detail dan gambaran yang jelas",
+    "argumentatif": "argumentatif dengan logika yang kuat dan bukti yang mendukung",
+    "opini": "opini pribadi dengan sudut pandang yang subjektif namun berdasar",
+    "tutorial": "tutorial step-by-step dengan panduan yang mudah diikuti",
+    "review": "review yang objektif dengan evaluasi menyeluruh",
+    "listicle": "format list/poin-poin yang terstruktur dan mudah dibaca",
+    "storytelling": "storytelling yang engaging dengan narasi yang memikat",
+    "akademik": "akademik dan ilmiah dengan referensi yang mendalam",
+    "jurnalistik": "jurnalistik dengan gaya penulisan berita yang faktual",
+    "kreatif": "kreatif dan inovatif dengan pendekatan yang unik",
+    "motivasi": "motivasi dan inspiratif dengan semangat yang membangkitkan",
+    "analitis": "analitis dan kritis dengan pembahasan yang mendalam",
+    "conversational": "percakapan yang natural seperti berbicara dengan teman"
+}
+
+STYLE_DESCRIPTIONS_EN = {
+    "formal": "formal and professional with standard language and structured format",
+    "informal": "casual and friendly with everyday language that's easy to understand",
+    "lucu": "humorous and entertaining with light-hearted and funny approach",
+    "serius": "serious and profound with comprehensive analysis",
+    "informatif": "informative and educational with accurate facts and data",
+    "persuasif": "persuasive with strong arguments and clear call-to-action",
+    "naratif": "narrative with engaging plot and vivid details",
+    "deskriptif": "descriptive with detailed explanations and clear imagery",
+    "argumentatif": "argumentative with strong logic and supporting evidence",
+    "opini": "opinion-based with subjective but well-founded viewpoint",
+    "tutorial": "tutorial with clear step-by-step instructions",
+    "review": "objective review with comprehensive evaluation",
+    "listicle": "structured list format that's easy to read",
+    "storytelling": "engaging storytelling with captivating narratives",
+    "akademik": "academic and scholarly with deep references",
+    "jurnalistik": "journalistic with factual news writing style",
+    "kreatif": "creative and innovative with unique approach",
+    "motivasi": "motivational and inspirational with uplifting spirit",
+    "analitis": "analytical and critical with in-depth discussion",
+    "conversational": "conversational and natural like talking with friends"
+}
+
+@lru_cache(maxsize=1024)
+def _detect_language_name(subject):
+    """Detect the display name of a text's language (langdetect is loaded on first use)."""
+    # google.generativeai, langdetect and langcodes are imported lazily so that
+    # importing this module stays cheap for the dashboard and scheduler
+    from langdetect import detect, DetectorFactory
+    from langcodes import Language
+    
+    # Pastikan deteksi bahasa konsisten
+    DetectorFactory.seed = 0
+    return Language.get(detect(subject)).display_name()
+
+@dataclass
+class ArticleResult:
+    """Structured article returned by Gemini in a single request."""
+    
+    title: str
+    body: str
+    excerpt: str = ""
+    tags: List[str] = field(default_factory=list)
+    
+    @classmethod
+    def from_markdown(cls, article_content, default_title):
+        """Build a result from plain markdown output (title taken from its first heading)."""
+        title, body = split_title_and_content(article_content, default_title)
+        return cls(title=title, body=body, excerpt=extract_excerpt_from_content(body))
+    
+    @classmethod
+    def from_json(cls, text, default_title):
+        """Parse the JSON object requested by the structured prompt."""
+        # Strip a markdown code fence in case the model wrapped the JSON
+        text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+        data = json.loads(text)
+        
+        body = str(data.get("body") or "").strip()
+        tags = data.get("tags") or []
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        return cls(
+            title=str(data.get("title") or default_title).strip().replace("**", ""),
+            body=body,
+            excerpt=str(data.get("excerpt") or "").strip() or extract_excerpt_from_content(body),
+            tags=[str(tag).strip().lower() for tag in tags if str(tag).strip()]
+        )
 
 class GeminiScraper:
     """Scraper for Gemini AI using official API."""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache=None, backend=None, api_keys=None):
         self.logger = logging.getLogger(__name__)
         self.config = Config()
         self.api_key = api_key
+        self.backend = backend
+        self._explicit_api_keys = list(api_keys) if api_keys else None
+        # cache=None uses the default on-disk cache, cache=False disables caching
+        self._cache_enabled = cache is not False and self.config.GEMINI_CACHE_ENABLED
+        self.cache = cache or None
+        self._owns_cache = False
         self.api_keys = []
         self.current_key_index = 0
-        self.model = None
+        self.key_pool = None
+        self.generation_config = None
+        self.json_generation_config = None
         self._setup_gemini()
     
     def _read_api_keys(self, filename="apikey.txt"):
@@ -40,8 +146,11 @@ class GeminiScraper:
     def _setup_gemini(self):
         """Setup Gemini AI API."""
         try:
-            # Load all available API keys
-            self.api_keys = self._read_api_keys()
+            # Load all available API keys (an explicit list replaces apikey.txt)
+            if self._explicit_api_keys is not None:
+                self.api_keys = list(self._explicit_api_keys)
+            else:
+                self.api_keys = self._read_api_keys()
             
             # Add single API key if provided
             if self.api_key:
@@ -64,8 +173,23 @@ class GeminiScraper:
             # Use first API key initially
             self.api_key = self.api_keys[0]
             
-            # Configure Gemini
-            genai.configure(api_key=self.api_key)
+            # Per-key request/token budgets; every call picks the key with the most headroom
+            self.key_pool = KeyPool(
+                self.api_keys,
+                requests_per_minute=self.config.GEMINI_RPM_PER_KEY,
+                tokens_per_minute=self.config.GEMINI_TPM_PER_KEY,
+                cooldown_seconds=self.config.GEMINI_KEY_COOLDOWN,
+                max_in_flight=self.config.GEMINI_CONCURRENCY_PER_KEY,
+                failure_threshold=self.config.GEMINI_BREAKER_THRESHOLD,
+                breaker_open_seconds=self.config.GEMINI_BREAKER_OPEN_SECONDS
+            )
+            
+            # Transient errors are retried with exponential backoff and full jitter
+            self.retry_policy = RetryPolicy(
+                max_attempts=self.config.GEMINI_RETRY_ATTEMPTS,
+                base_delay=self.config.GEMINI_RETRY_BASE_DELAY,
+                max_delay=self.config.GEMINI_RETRY_MAX_DELAY
+            )
             
             # Setup generation config
             generation_config = {
@@ -76,10 +200,24 @@ class GeminiScraper:
                 "response_mime_type": "text/plain",
             }
             
-            self.model = genai.GenerativeModel(
-                model_name="gemini-1.5-flash", 
-                generation_config=generation_config
-            )
+            self.generation_config = generation_config
+            self.json_generation_config = dict(generation_config, response_mime_type="application/json")
+            
+            # Per-key models live in the backend (swappable, e.g. for offline benchmarks)
+            if self.backend is None:
+                self.backend = GenaiBackend(self.config.GEMINI_MODEL)
+            
+            # Responses are cached on disk so reruns and resumed bulk runs don't pay twice
+            if self.cache is None and self._cache_enabled:
+                try:
+                    self.cache = DiskCache(
+                        self.config.GEMINI_CACHE_PATH,
+                        max_bytes=self.config.GEMINI_CACHE_MAX_BYTES,
+                        ttl_seconds=self.config.GEMINI_CACHE_TTL
+                    )
+                    self._owns_cache = True
+                except Exception as e:
+                    self.logger.warning(f"Response cache disabled: {str(e)}")
             
             self.logger.info("Gemini API initialized successfully")
             
@@ -87,40 +225,217 @@ class GeminiScraper:
             self.logger.error(f"Failed to initialize Gemini API: {str(e)}")
             raise
     
+    @property
+    def model(self):
+        """GenerativeModel bound to the current API key (None for backends without one)."""
+        return self.backend.get_model(self.api_key, self.generation_config)
+    
+    def get_model(self, key_index=None, json_mode=False):
+        """
+        Get the model bound to one API key from the backend's per-key pool.
+        
+        Models never share a key through genai.configure(), so they are safe
+        to use from several threads at once.
+        
+        Args:
+            key_index (int): Index into self.api_keys (default: current key)
+            json_mode (bool): Use the JSON generation config
+        """
+        if key_index is None:
+            key_index = self.current_key_index
+        generation_config = self.json_generation_config if json_mode else self.generation_config
+        return self.backend.get_model(self.api_keys[key_index], generation_config)
+    
     def rotate_api_key(self):
-        """Rotate to next API key."""
+        """
+        Make the API key with the most headroom (not cooling down) the current key.
+        
+        Requests always pick their key from the key pool; this only changes
+        which key is reported as current and used by self.model.
+        """
         if len(self.api_keys) <= 1:
             return False
         
-        self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
+        next_index = self.key_pool.best_key(exclude=[self.current_key_index])
+        if next_index is None:
+            self.logger.warning("No other API key available, all keys are cooling down")
+            return False
+        
+        self.current_key_index = next_index
         self.api_key = self.api_keys[self.current_key_index]
+        self.logger.info(f"Rotated to API key {self.current_key_index + 1}/{len(self.api_keys)}")
+        return True
+    
+    def _call_model(self, prompt, expected_output_tokens, json_mode=False, use_cache=True):
+        """
+        Send a prompt using the API key with the most headroom and return the response text.
+        
+        Responses are looked up in the on-disk cache first (keyed by prompt, model
+        and generation config). Otherwise the key's request/token budget is reserved
+        before the call and settled with the token count reported by the API
+        afterwards; 429 errors put the key into cooldown so it is skipped until it recovers.
+        
+        Transient errors (429, 5xx, timeouts) are retried according to
+        self.retry_policy, each attempt on the key the pool picks at that moment.
+        With use_cache=False (regenerating a topic) the cached response is not
+        read, but the new one replaces it.
+        """
+        generation_config = self.json_generation_config if json_mode else self.generation_config
+        cache_key = None
+        if self.cache is not None:
+            cache_key = DiskCache.make_key("gemini", self.config.GEMINI_MODEL, generation_config, prompt)
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                self.logger.debug("Gemini response served from cache")
+                return cached
+        
+        estimated_tokens = len(prompt) // 4 + expected_output_tokens
+        attempt = 0
+        while True:
+            try:
+                text = self._send_prompt(prompt, generation_config, estimated_tokens)
+                break
+            except Exception as e:
+                if not self.retry_policy.should_retry(attempt, e):
+                    raise
+                self._backoff(attempt, e)
+                attempt += 1
+        
+        if cache_key is not None and text and text.strip():
+            self.cache.set(cache_key, text)
+        return text
+    
+    def _send_prompt(self, prompt, generation_config, estimated_tokens):
+        """Make a single request on the key with the most headroom (raises on API errors)."""
+        key_index = self.key_pool.acquire(estimated_tokens, timeout=self.config.GEMINI_KEY_WAIT_TIMEOUT)
+        self.current_key_index = key_index
+        self.api_key = self.api_keys[key_index]
         
         try:
-            genai.configure(api_key=self.api_key)
-            self.logger.info(f"Rotated to API key {self.current_key_index + 1}/{len(self.api_keys)}")
-            return True
+            response = self.backend.generate_content(self.api_keys[key_index], prompt, generation_config)
         except Exception as e:
-            self.logger.error(f"Failed to configure rotated API key: {str(e)}")
-            return False
+            self.key_pool.release(key_index, estimated_tokens=estimated_tokens, error=e)
+            raise
+        
+        usage = getattr(response, "usage_metadata", None)
+        tokens_used = getattr(usage, "total_token_count", None) if usage else None
+        self.key_pool.release(key_index, tokens_used=tokens_used, estimated_tokens=estimated_tokens)
+        return response.text
+    
+    def _backoff(self, attempt, error):
+        """Sleep before retrying after failed attempt number ``attempt``."""
+        delay = self.retry_policy.delay(attempt)
+        self.logger.warning(f"Gemini request failed (attempt {attempt + 1}/{self.retry_policy.max_attempts}): "
+                            f"{str(error)}; retrying in {delay:.1f}s")
+        time.sleep(delay)
+    
+    def _stream_model(self, prompt, expected_output_tokens, use_cache=True):
+        """
+        Stream the response text for a prompt chunk by chunk.
+        
+        Uses the same key pool, cache and retry policy as _call_model (retries
+        only happen before the first chunk), and records time-to-first-token
+        and output tokens/sec for the key that served it.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = DiskCache.make_key("gemini", self.config.GEMINI_MODEL, self.generation_config, prompt)
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                self.logger.debug("Gemini response served from cache")
+                yield cached
+                return
+        
+        estimated_tokens = len(prompt) // 4 + expected_output_tokens
+        attempt = 0
+        while True:
+            key_index = self.key_pool.acquire(estimated_tokens, timeout=self.config.GEMINI_KEY_WAIT_TIMEOUT)
+            self.current_key_index = key_index
+            self.api_key = self.api_keys[key_index]
+            
+            started = time.monotonic()
+            first_chunk_at = None
+            chunks = []
+            tokens_used = None
+            output_tokens = None
+            error = None
+            cancelled = False
+            try:
+                response = self.backend.generate_content(self.api_keys[key_index], prompt, self.generation_config, stream=True)
+                for chunk in response:
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunk without text parts (e.g. only finish reason / safety data)
+                        continue
+                    
+                    usage = getattr(chunk, "usage_metadata", None)
+                    if usage and getattr(usage, "total_token_count", None):
+                        tokens_used = usage.total_token_count
+                        output_tokens = getattr(usage, "candidates_token_count", None)
+                    
+                    if not text:
+                        continue
+                    if first_chunk_at is None:
+                        first_chunk_at = time.monotonic()
+                    chunks.append(text)
+                    yield text
+            
+                full_text = "".join(chunks)
+                if cache_key is not None and full_text.strip():
+                    self.cache.set(cache_key, full_text)
+                return
+            except GeneratorExit:
+                # The consumer stopped reading: not the key's fault, and not a success either
+                cancelled = True
+                raise
+            except Exception as e:
+                error = e
+                # Text already yielded cannot be taken back, so only retry before the first chunk
+                if chunks or not self.retry_policy.should_retry(attempt, e):
+                    raise
+            finally:
+                self.key_pool.release(key_index, tokens_used=tokens_used, estimated_tokens=estimated_tokens,
+                                      error=error, cancelled=cancelled)
+                if first_chunk_at is not None:
+                    ttft = first_chunk_at - started
+                    elapsed = time.monotonic() - first_chunk_at
+                    if not output_tokens:
+                        output_tokens = len("".join(chunks)) // 4
+                    tokens_per_second = output_tokens / elapsed if elapsed > 0 else 0.0
+                    self.key_pool.record_stream(key_index, ttft, tokens_per_second)
+                    self.logger.info(f"Streamed response with API key {key_index + 1}: "
+                                     f"first token after {ttft * 1000:.0f} ms, {tokens_per_second:.1f} tokens/s")
+            
+            self._backoff(attempt, error)
+            attempt += 1
     
     def get_current_key_info(self):
         """Get current API key information."""
+        key_status = self.key_pool.status() if self.key_pool else []
         return {
             'current_index': self.current_key_index,
             'total_keys': len(self.api_keys),
+            'available_keys': sum(1 for k in key_status if k['cooldown_seconds'] == 0),
             'key_preview': f"...{self.api_key[-6:]}" if self.api_key else "None"
         }
     
+    def get_key_status(self):
+        """Get budget and health status of every API key."""
+        return self.key_pool.status()
+    
+    def get_cache_stats(self):
+        """Get hit/miss counters of the response cache (None when disabled)."""
+        return self.cache.stats() if self.cache is not None else None
+    
     def detect_language(self, subject):
         """Detect language of the subject."""
         try:
-            lang_code = detect(subject)
-            lang_name = Language.get(lang_code).display_name()
-            return lang_name
+            return _detect_language_name(subject)
         except:
             return "English"  # Default ke bahasa Inggris jika terjadi error
     
-    def generate_title(self, subject, language):
+    def generate_title(self, subject, language, use_cache=True):
         """Generate title for the article."""
         try:
             title_prompt = (
@@ -130,8 +445,8 @@ class GeminiScraper:
                 f"Use metaphor, emotion, or an unexpected twist. Do not repeat the subject word exactly."
             )
             
-            response = self.model.generate_content(title_prompt)
-            title = response.text.strip().replace('"', '').replace("**", "").replace("##", "")
+            response_text = self._call_model(title_prompt, expected_output_tokens=64, use_cache=use_cache)
+            title = response_text.strip().replace('"', '').replace("**", "").replace("##", "")
             
             self.logger.info(f"Generated title: {title}")
             return title
@@ -140,79 +455,12 @@ class GeminiScraper:
             self.logger.error(f"Error generating title: {str(e)}")
             return subject  # Fallback to original subject
 
-    def generate_article(self, topic, language="id", writing_style="professional", retry_count=0):
-        """
-        Generate article content using Gemini AI.
-        
-        Args:
-            topic (str): The topic for the article
-            language (str): Language code (id=Indonesian, en=English)
-            writing_style (str): Writing style for the article
-            retry_count (int): Current retry attempt
-            
-        Returns:
-            str: Generated article content or None if failed
-        """
-        max_retries = len(self.api_keys)
-        
-        try:
-            # Detect language automatically
-            detected_lang = self.detect_language(topic)
-            
-            # Generate title first
-            title = self.generate_title(topic, detected_lang)
-            
-            # Get writing style description
-            style_descriptions = {
-                "formal": "formal dan profesional dengan bahasa baku dan struktur yang teratur",
-                "informal": "santai dan ramah dengan bahasa sehari-hari yang mudah dipahami",
-                "lucu": "humoris dan menghibur dengan gaya yang ringan dan penuh candaan",
-                "serius": "serius dan mendalam dengan analisis yang komprehensif",
-                "informatif": "informatif dan edukatif dengan fakta dan data yang akurat",
-                "persuasif": "persuasif dengan argumen kuat dan call-to-action yang jelas",
-                "naratif": "bercerita dengan alur yang menarik dan detail yang hidup",
-                "deskriptif": "deskriptif dengan penjelasan detail dan gambaran yang jelas",
-                "argumentatif": "argumentatif dengan logika yang kuat dan bukti yang mendukung",
-                "opini": "opini pribadi dengan sudut pandang yang subjektif namun berdasar",
-                "tutorial": "tutorial step-by-step dengan panduan yang mudah diikuti",
-                "review": "review yang objektif dengan evaluasi menyeluruh",
-                "listicle": "format list/poin-poin yang terstruktur dan mudah dibaca",
-                "storytelling": "storytelling yang engaging dengan narasi yang memikat",
-                "akademik": "akademik dan ilmiah dengan referensi yang mendalam",
-                "jurnalistik": "jurnalistik dengan gaya penulisan berita yang faktual",
-                "kreatif": "kreatif dan inovatif dengan pendekatan yang unik",
-                "motivasi": "motivasi dan inspiratif dengan semangat yang membangkitkan",
-                "analitis": "analitis dan kritis dengan pembahasan yang mendalam",
-                "conversational": "percakapan yang natural seperti berbicara dengan teman"
-            }
-
-            style_descriptions_en = {
-                "formal": "formal and professional with standard language and structured format",
-                "informal": "casual and friendly with everyday language that's easy to understand",
-                "lucu": "humorous and entertaining with light-hearted and funny approach",
-                "serius": "serious and profound with comprehensive analysis",
-                "informatif": "informative and educational with accurate facts and data",
-                "persuasif": "persuasive with strong arguments and clear call-to-action",
-                "naratif": "narrative with engaging plot and vivid details",
-                "deskriptif": "descriptive with detailed explanations and clear imagery",
-                "argumentatif": "argumentative with strong logic and supporting evidence",
-                "opini": "opinion-based with subjective but well-founded viewpoint",
-                "tutorial": "tutorial with clear step-by-step instructions",
-                "review": "objective review with comprehensive evaluation",
-                "listicle": "structured list format that's easy to read",
-                "storytelling": "engaging storytelling with captivating narratives",
-                "akademik": "academic and scholarly with deep references",
-                "jurnalistik": "journalistic with factual news writing style",
-                "kreatif": "creative and innovative with unique approach",
-                "motivasi": "motivational and inspirational with uplifting spirit",
-                "analitis": "analytical and critical with in-depth discussion",
-                "conversational": "conversational and natural like talking with friends"
-            }
-
-            # Create the prompt based on language
-            if language == "id":
-                style_desc = style_descriptions.get(writing_style, "profesional")
-                article_prompt = f"""Buatkan artikel lengkap tentang "{title}" dalam bahasa Indonesia dengan gaya penulisan {style_desc} dan struktur sebagai berikut:
+    def _build_article_prompt(self, title, language, writing_style):
+        """Build the article prompt for a title in the requested language and style."""
+        # Create the prompt based on language
+        if language == "id":
+            style_desc = STYLE_DESCRIPTIONS.get(writing_style, "profesional")
+            article_prompt = f"""Buatkan artikel lengkap tentang "{title}" dalam bahasa Indonesia dengan gaya penulisan {style_desc} dan struktur sebagai berikut:
 
 1. Judul yang menarik dan SEO-friendly
 2. Pendahuluan yang engaging (100-150 kata)
@@ -230,9 +478,9 @@ Pastikan artikel:
 - Sesuai dengan karakteristik gaya penulisan {writing_style}
 
 Gunakan format markdown untuk heading dan formatting."""
-            else:
-                style_desc = style_descriptions_en.get(writing_style, "professional")
-                article_prompt = f"""Write a comprehensive article about "{title}" in English with {style_desc} writing style and following structure:
+        else:
+            style_desc = STYLE_DESCRIPTIONS_EN.get(writing_style, "professional")
+            article_prompt = f"""Write a comprehensive article about "{title}" in English with {style_desc} writing style and following structure:
 
 1. Engaging and SEO-friendly title
 2. Compelling introduction (100-150 words)
@@ -250,10 +498,41 @@ Ensure the article:
 - Matches the characteristics of {writing_style} style
 
 Use markdown format for headings and formatting."""
+        
+        return article_prompt
+    
+    def _generate_article_content(self, topic, language, writing_style, use_cache=True):
+        """Generate title and article text for a topic (raises on API errors)."""
+        # Detect language automatically
+        detected_lang = self.detect_language(topic)
+        
+        # Generate title first
+        title = self.generate_title(topic, detected_lang, use_cache)
+        
+        article_prompt = self._build_article_prompt(title, language, writing_style)
+        
+        # Generate the article
+        response_text = self._call_model(article_prompt, expected_output_tokens=2048, use_cache=use_cache)
+        return response_text.strip()
+    
+    def generate_article(self, topic, language="id", writing_style="professional", use_cache=True):
+        """
+        Generate article content using Gemini AI.
+        
+        Quota/rate limit and other transient errors are retried with backoff
+        inside each request (see _call_model), on whichever key has headroom.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English)
+            writing_style (str): Writing style for the article
+            use_cache (bool): Reuse a cached response (False when regenerating the topic)
             
-            # Generate the article
-            response = self.model.generate_content(article_prompt)
-            article_content = response.text.strip()
+        Returns:
+            str: Generated article content or None if failed
+        """
+        try:
+            article_content = self._generate_article_content(topic, language, writing_style, use_cache)
             
             if article_content and len(article_content) > 200:
                 self.logger.info(f"Successfully generated article content ({len(article_content)} characters)")
@@ -264,15 +543,300 @@ Use markdown format for headings and formatting."""
                 
         except Exception as e:
             self.logger.error(f"Error generating article with API key {self.current_key_index + 1}: {str(e)}")
+            return None
+    
+    def generate_article_stream(self, topic, language="id", writing_style="professional", use_cache=True):
+        """
+        Generate article content as a stream of markdown chunks.
+        
+        The title is generated first (short request), then the article text is
+        yielded as it arrives so callers can render or post-process it early.
+        Unlike generate_article, API errors are raised to the caller.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English)
+            writing_style (str): Writing style for the article
+            use_cache (bool): Reuse a cached response (False when regenerating the topic)
             
-            # If quota exceeded or rate limited, try rotating API key
-            if ("quota" in str(e).lower() or "rate" in str(e).lower() or "limit" in str(e).lower()) and retry_count < max_retries - 1:
-                self.logger.info("Quota/rate limit detected, rotating API key...")
-                if self.rotate_api_key():
-                    return self.generate_article(topic, language, retry_count + 1)
+        Yields:
+            str: Article text chunks in order
+        """
+        detected_lang = self.detect_language(topic)
+        title = self.generate_title(topic, detected_lang, use_cache)
+        article_prompt = self._build_article_prompt(title, language, writing_style)
+        
+        yield from self._stream_model(article_prompt, expected_output_tokens=2048, use_cache=use_cache)
+    
+    def _build_structured_prompt(self, topic, language, writing_style, title_language):
+        """Build a prompt asking for title, excerpt, tags and article body as one JSON object."""
+        article_prompt = self._build_article_prompt(topic, language, writing_style)
+        return article_prompt + f"""
+
+Return ONLY a JSON object with exactly these keys:
+- "title": 1 unique, emotional, curiosity-driven blog title in {title_language}, under 60 characters, avoiding clichés and not repeating the topic word for word
+- "excerpt": a 1-2 sentence summary of the article, under 200 characters
+- "tags": a list of 3-5 short lowercase tags
+- "body": the complete article in markdown, without the title heading"""
+    
+    def generate_structured_article(self, topic, language="id", writing_style="professional", use_cache=True):
+        """
+        Generate title, excerpt, tags and article body with a single API call.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English)
+            writing_style (str): Writing style for the article
+            use_cache (bool): Reuse a cached response (False when regenerating the topic)
             
+        Returns:
+            ArticleResult: Structured article or None if failed
+        """
+        try:
+            result = self._generate_structured_content(topic, language, writing_style, use_cache)
+            
+            if result and len(result.body) > 200:
+                self.logger.info(f"Successfully generated structured article: {result.title} ({len(result.body)} characters)")
+                return result
+            else:
+                self.logger.warning("Generated content is too short or empty")
+                return None
+                
+        except Exception as e:
+            self.logger.error(f"Error generating structured article: {str(e)}")
+            return None
+    
+    def _generate_structured_content(self, topic, language, writing_style, use_cache=True):
+        """Generate an ArticleResult in one request (raises on API errors)."""
+        detected_lang = self.detect_language(topic)
+        prompt = self._build_structured_prompt(topic, language, writing_style, detected_lang)
+        
+        response_text = self._call_model(prompt, expected_output_tokens=2048, json_mode=True, use_cache=use_cache)
+        try:
+            return ArticleResult.from_json(response_text, topic)
+        except (ValueError, AttributeError) as e:
+            # Model ignored the JSON instruction; fall back to reading it as markdown
+            self.logger.warning(f"Structured response was not valid JSON ({str(e)}), parsing as markdown")
+            return ArticleResult.from_markdown(response_text, topic)
+    
+    def _build_outline_prompt(self, topic, language, writing_style, title_language):
+        """Build a prompt asking for title, excerpt, tags and a section outline as one JSON object."""
+        if language == "id":
+            article_language = "Indonesian"
+            style_desc = STYLE_DESCRIPTIONS.get(writing_style, "profesional")
+        else:
+            article_language = "English"
+            style_desc = STYLE_DESCRIPTIONS_EN.get(writing_style, "professional")
+        
+        return f"""Plan an article outline for a blog post about "{topic}" written in {article_language} with a {style_desc} writing style.
+The full article will be at least {self.config.MIN_ARTICLE_LENGTH} words.
+
+Return ONLY a JSON object with exactly these keys:
+- "title": 1 unique, emotional, curiosity-driven blog title in {title_language}, under 60 characters, avoiding clichés and not repeating the topic word for word
+- "excerpt": a 1-2 sentence summary of the article, under 200 characters
+- "tags": a list of 3-5 short lowercase tags
+- "sections": a list of 7-9 objects with "heading" (section subheading in {article_language}) and "points" (2-4 key points the section must cover). The first section is the introduction and the last one is the conclusion."""
+    
+    def _build_section_prompt(self, outline, index, language, writing_style, words):
+        """Build the prompt for one section of an outlined article."""
+        if language == "id":
+            article_language = "Indonesian"
+            style_desc = STYLE_DESCRIPTIONS.get(writing_style, "profesional")
+        else:
+            article_language = "English"
+            style_desc = STYLE_DESCRIPTIONS_EN.get(writing_style, "professional")
+        
+        sections = outline["sections"]
+        heading, points = sections[index]
+        overview = "\n".join(f"{i + 1}. {h}" for i, (h, _) in enumerate(sections))
+        point_list = "\n".join(f"- {point}" for point in points)
+        if index == 0:
+            role = "This is the introduction: hook the reader and say what the article covers."
+        elif index == len(sections) - 1:
+            role = "This is the conclusion: summarize the key takeaways and end with a clear call to action."
+        else:
+            role = "Do not repeat what the other sections cover and do not add an introduction or conclusion."
+        
+        return f"""You are writing one section of the article "{outline['title']}" in {article_language} with a {style_desc} writing style.
+
+Article outline:
+{overview}
+
+Write only the section "{heading}" (about {words} words), covering:
+{point_list}
+
+{role}
+Use markdown for formatting and bullet points or numbered lists when appropriate. Do not include the section heading itself."""
+    
+    def _parse_outline(self, text, topic):
+        """Parse the outline JSON into title, excerpt, tags and (heading, points) sections."""
+        result = ArticleResult.from_json(text, topic)
+        data = json.loads(re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip()))
+        
+        sections = []
+        for section in data.get("sections") or []:
+            if isinstance(section, dict):
+                heading = str(section.get("heading") or "").strip()
+                points = section.get("points") or []
+            else:
+                heading, points = str(section).strip(), []
+            if isinstance(points, str):
+                points = [points]
+            if heading:
+                sections.append((heading.lstrip("#").strip(), [str(p).strip() for p in points if str(p).strip()]))
+        
+        if len(sections) < 2:
+            raise ValueError(f"Outline has {len(sections)} section(s)")
+        return {"title": result.title, "excerpt": result.excerpt, "tags": result.tags, "sections": sections}
+    
+    def generate_sectioned_article(self, topic, language="id", writing_style="professional", use_cache=True):
+        """
+        Generate a long article from an outline, writing its sections in parallel.
+        
+        One request plans title, excerpt, tags and section headings; then every
+        section is generated concurrently on the keys with the most headroom and
+        the results are stitched together, so the wall time is roughly that of
+        the outline plus the slowest section instead of one long decode.
+        
+        Args:
+            topic (str): The topic for the article
+            language (str): Language code (id=Indonesian, en=English)
+            writing_style (str): Writing style for the article
+            use_cache (bool): Reuse a cached response (False when regenerating the topic)
+        
+        Returns:
+            ArticleResult: Stitched article or None if failed
+        """
+        try:
+            result = self._generate_sectioned_content(topic, language, writing_style, use_cache)
+        
+            if result and len(result.body) > 200:
+                self.logger.info(f"Successfully generated sectioned article: {result.title} ({len(result.body)} characters)")
+                return result
+            else:
+                self.logger.warning("Generated content is too short or empty")
+                return None
+        
+        except Exception as e:
+            self.logger.error(f"Error generating sectioned article: {str(e)}")
             return None
     
+    def _generate_sectioned_content(self, topic, language, writing_style, use_cache=True):
+        """Generate an ArticleResult from an outline and parallel sections (raises on API errors)."""
+        detected_lang = self.detect_language(topic)
+        outline_prompt = self._build_outline_prompt(topic, language, writing_style, detected_lang)
+        outline_text = self._call_model(outline_prompt, expected_output_tokens=512, json_mode=True, use_cache=use_cache)
+        
+        try:
+            outline = self._parse_outline(outline_text, topic)
+        except (ValueError, AttributeError) as e:
+            # Without a usable outline, fall back to generating the article in one request
+            self.logger.warning(f"Article outline could not be parsed ({str(e)}), generating in one request")
+            return self._generate_structured_content(topic, language, writing_style, use_cache)
+        
+        sections = outline["sections"]
+        words = max(120, int(self.config.MIN_ARTICLE_LENGTH * 1.2 / len(sections)))
+        prompts = [
+            self._build_section_prompt(outline, i, language, writing_style, words)
+            for i in range(len(sections))
+        ]
+        
+        max_workers = len(sections)
+        if self.key_pool.max_in_flight:
+            max_workers = min(max_workers, len(self.api_keys) * self.key_pool.max_in_flight)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="gemini-section") as executor:
+            texts = list(executor.map(
+                lambda prompt: self._call_model(prompt, expected_output_tokens=words * 2, use_cache=use_cache), prompts
+            ))
+        
+        parts = []
+        for (heading, _), text in zip(sections, texts):
+            # Drop the heading if the model repeated it anyway
+            text = re.sub(r"^\s*#+\s*" + re.escape(heading) + r"\s*\n", "", text.strip(), flags=re.IGNORECASE)
+            parts.append(f"## {heading}\n\n{text.strip()}")
+        
+        body = "\n\n".join(parts)
+        self.logger.info(f"Stitched article from {len(sections)} sections generated in parallel")
+        return ArticleResult(
+            title=outline["title"],
+            body=body,
+            excerpt=outline["excerpt"] or extract_excerpt_from_content(body),
+            tags=outline["tags"]
+        )
+
+    def generate_articles_concurrently(self, keywords, language="id", writing_style="professional",
+                                       max_concurrency_per_key=None, structured=False, sectioned=False,
+                                       uncached=()):
+        """
+        Generate articles for many keywords at once, spread over all API keys.
+        
+        Every key gets at most ``max_concurrency_per_key`` requests in flight and
+        the key pool keeps each one inside its rate budget, so throughput grows
+        with the number of keys in apikey.txt. Quota/rate limit errors are retried
+        with backoff on whichever key has headroom (see _call_model).
+        
+        Args:
+            keywords (list): Topics to generate articles for
+            language (str): Language code (id=Indonesian, en=English)
+            writing_style (str): Writing style for the articles
+            max_concurrency_per_key (int): In-flight requests allowed per key
+            structured (bool): Use single-request JSON generation (yields ArticleResult)
+            sectioned (bool): Generate each article from an outline with parallel sections (yields ArticleResult)
+            uncached (iterable): Keywords being regenerated; their cached responses are not reused
+            
+        Yields:
+            tuple: (keyword, article content / ArticleResult or None) in completion order
+        """
+        if max_concurrency_per_key is None:
+            max_concurrency_per_key = self.config.GEMINI_CONCURRENCY_PER_KEY
+        max_concurrency_per_key = max(1, int(max_concurrency_per_key))
+        
+        uncached = set(uncached)
+        
+        def worker(keyword):
+            use_cache = keyword not in uncached
+            try:
+                if structured or sectioned:
+                    generate = self._generate_sectioned_content if sectioned else self._generate_structured_content
+                    result = generate(keyword, language, writing_style, use_cache)
+                    if result and len(result.body) > 200:
+                        self.logger.info(f"Generated structured article for '{keyword}' ({len(result.body)} characters)")
+                        return result
+                    self.logger.warning(f"Generated content for '{keyword}' is too short or empty")
+                    return None
+                
+                content = self._generate_article_content(keyword, language, writing_style, use_cache)
+                if content and len(content) > 200:
+                    self.logger.info(f"Generated article for '{keyword}' ({len(content)} characters)")
+                    return content
+                self.logger.warning(f"Generated content for '{keyword}' is too short or empty")
+                return None
+            except Exception as e:
+                self.logger.error(f"Error generating article for '{keyword}': {str(e)}")
+                return None
+        
+        max_workers = max(1, min(len(keywords), len(self.api_keys) * max_concurrency_per_key))
+        # The limit applies to this batch only; the pool's own limit is restored afterwards
+        previous_limit = self.key_pool.max_in_flight
+        self.key_pool.max_in_flight = max_concurrency_per_key
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini") as executor:
+                futures = {executor.submit(worker, keyword): keyword for keyword in keywords}
+                try:
+                    for future in as_completed(futures):
+                        yield futures[future], future.result()
+                finally:
+                    # Stop queued work if the consumer stops iterating early
+                    for future in futures:
+                        future.cancel()
+        finally:
+            self.key_pool.max_in_flight = previous_limit
+    
     def close(self):
-        """Close the API connection (no cleanup needed for API)."""
+        """Close the API connection and the response cache."""
+        if self.cache is not None:
+            stats = self.cache.stats()
+            self.logger.info(f"Response cache: {stats['hits']} hits, {stats['misses']} misses")
+            if self._owns_cache:
+                self.cache.close()
         self.logger.info("Gemini API connection closed")
@@ -0,0 +1,205 @@
+"""
+Content-addressed store for downloaded post images.
+Processed images are saved once under their perceptual hash
+(images/store/ab/abcdef0123456789.jpg plus -{width}w variants), with an
+SQLite index from source URL to stored asset. A URL that was downloaded
+before, or a new URL whose picture is already stored, is served from the
+store without downloading or re-encoding it again.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+
+class ImageStore:
+    """Perceptual-hash keyed image assets plus a source URL index."""
+
+    def __init__(self, root: str = "images/store", index_path: Optional[str] = None,
+                 match_distance: int = 4):
+        """
+        Args:
+            root (str): Directory the asset files are written to
+            index_path (str): SQLite index file (default: root/index.db)
+            match_distance (int): Max differing hash bits for a new image to
+                be treated as an already stored one
+        """
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+        self.index_path = index_path or os.path.join(root, "index.db")
+        self.match_distance = match_distance
+        self.url_hits = 0
+        self.hash_hits = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.index_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS assets (
+                phash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                variants TEXT NOT NULL,
+                source_url TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                phash TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+        # All hashes in memory: a linear XOR/popcount scan over a few
+        # thousand ints is far cheaper than the download it saves
+        self._hashes = {row[0]: int(row[0], 16) for row in self._conn.execute("SELECT phash FROM assets")}
+
+    def _asset(self, phash: str) -> Optional[Dict]:
+        """Load an asset row; None if it is missing or its files were deleted."""
+        row = self._conn.execute(
+            "SELECT phash, path, width, height, variants FROM assets WHERE phash = ?", (phash,)
+        ).fetchone()
+        if row is None:
+            return None
+        asset = {
+            'phash': row[0],
+            'path': row[1],
+            'width': row[2],
+            'height': row[3],
+            'variants': json.loads(row[4]),
+        }
+        if not all(os.path.exists(variant['path']) for variant in asset['variants']):
+            self.logger.warning(f"Stored image {phash} has missing files, dropping it from the index")
+            self._conn.execute("DELETE FROM assets WHERE phash = ?", (phash,))
+            self._conn.execute("DELETE FROM urls WHERE phash = ?", (phash,))
+            self._hashes.pop(phash, None)
+            return None
+        return asset
+
+    def lookup_url(self, url: str) -> Optional[Dict]:
+        """
+        Find the stored asset a source URL was downloaded to before.
+
+        Returns:
+            dict: Asset (phash, path, width, height, variants) or None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT phash FROM urls WHERE url = ?", (url,)).fetchone()
+            asset = self._asset(row[0]) if row else None
+            if asset is not None:
+                self.url_hits += 1
+            return asset
+
+    def find_similar(self, phash: str, max_distance: Optional[int] = None) -> Optional[Dict]:
+        """
+        Find the stored asset closest to a perceptual hash.
+
+        Args:
+            phash (str): Perceptual hash of a new image
+            max_distance (int): Max differing bits (default: match_distance)
+
+        Returns:
+            dict: Closest asset within max_distance, or None
+        """
+        if max_distance is None:
+            max_distance = self.match_distance
+        target = int(phash, 16)
+        with self._lock:
+            candidates = []
+            for stored, value in self._hashes.items():
+                distance = (value ^ target).bit_count()
+                if distance <= max_distance:
+                    candidates.append((distance, stored))
+            # Closest first; _asset prunes a row whose files were deleted, then the next one is tried
+            for _, stored in sorted(candidates):
+                asset = self._asset(stored)
+                if asset is not None:
+                    return asset
+            return None
+
+    def link_url(self, url: str, phash: str):
+        """Point a source URL at a stored asset."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO urls (url, phash, created_at) VALUES (?, ?, ?)",
+                (url, phash, time.time())
+            )
+            self.hash_hits += 1
+
+    def path_for(self, phash: str) -> str:
+        """Primary file path for a hash (.jpg; ImageProcessor.save adjusts the extension); variants get a -{width}w suffix."""
+        return os.path.join(self.root, phash[:2], f"{phash}.jpg")
+
+    def add(self, phash: str, variants: List[Dict], source_url: Optional[str] = None,
+            path: Optional[str] = None) -> Dict:
+        """
+        Record an asset whose variants were written next to path_for(phash).
+
+        Args:
+            phash (str): Perceptual hash of the image
+            variants (list): Saved variants (width, height, format, bytes, path)
+            source_url (str): URL the image was downloaded from
+            path (str): Primary file actually written (default: path_for(phash))
+
+        Returns:
+            dict: The stored asset
+        """
+        path = path or self.path_for(phash)
+        widest = max(variants, key=lambda v: v['width'])
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO assets (phash, path, width, height, variants, source_url, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (phash, path, widest['width'], widest['height'], json.dumps(variants), source_url, now)
+            )
+            if source_url:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, phash, created_at) VALUES (?, ?, ?)",
+                    (source_url, phash, now)
+                )
+            self._hashes[phash] = int(phash, 16)
+            self.stored += 1
+        return {
+            'phash': phash,
+            'path': path,
+            'width': widest['width'],
+            'height': widest['height'],
+            'variants': variants,
+        }
+
+    def stats(self) -> Dict:
+        """Asset/URL counts and how often a download or processing step was skipped."""
+        with self._lock:
+            assets = self._conn.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+            urls = self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        return {
+            'assets': assets,
+            'urls': urls,
+            'url_hits': self.url_hits,
+            'hash_hits': self.hash_hits,
+            'stored': self.stored,
+        }
+
+    def close(self):
+        """Close the index database."""
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            self.logger.error(f"Error closing image store {self.index_path}: {str(e)}")
+
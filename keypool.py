@@ -0,0 +1,379 @@
+"""
+API key pool for Gemini key rotation.
+Tracks per-key request/token budgets, 429 cooldowns and health so every call
+goes to the key with the most headroom instead of blindly round-robin.
+"""
+
+import re
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+
+class NoKeyAvailableError(RuntimeError):
+    """Raised when no API key can serve a request within the allowed wait."""
+
+
+# Exception classes of google.api_core / HTTP clients that mean "slow down"
+RATE_LIMIT_ERROR_TYPES = ("ResourceExhausted", "TooManyRequests")
+RATE_LIMIT_PATTERN = re.compile(r"\b429\b|\bquota\b|\brate[- _]?limit|\bresource (?:has been )?exhausted", re.IGNORECASE)
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    """
+    HTTP status of an API error, if it can be told.
+
+    Looks at ``code`` (google.api_core exceptions), ``status_code`` and
+    ``response.status_code``, then at a leading "NNN " in the message.
+    """
+    for candidate in (getattr(error, "code", None), getattr(error, "status_code", None),
+                      getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(candidate, int) and 100 <= candidate <= 599:
+            return candidate
+    match = re.match(r"\s*(\d{3})\b", str(error))
+    return int(match.group(1)) if match else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check if an exception from the Gemini API is a quota/rate limit (429) error."""
+    if type(error).__name__ in RATE_LIMIT_ERROR_TYPES:
+        return True
+    status = error_status_code(error)
+    if status is not None:
+        return status == 429
+    return bool(RATE_LIMIT_PATTERN.search(str(error)))
+
+
+def retry_after_seconds(error: Exception, default: float) -> float:
+    """Extract the server-suggested retry delay from a 429 error, if any."""
+    message = str(error)
+    patterns = [
+        r"retry_delay\s*\{\s*seconds:\s*(\d+)",  # google.rpc.RetryInfo
+        r"retry[- ]after[:\s]+(\d+(?:\.\d+)?)",
+        r"retry in (\d+(?:\.\d+)?)\s*s",
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, message, re.IGNORECASE)
+        if match:
+            return float(match.group(1))
+    return default
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated = now
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.tokens
+
+    def consume(self, amount: float, now: float):
+        """Take tokens out of the bucket; may go negative to record overspend."""
+        self._refill(now)
+        self.tokens -= amount
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (capped at a full bucket)."""
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / self.refill_per_second
+
+
+class CircuitBreaker:
+    """
+    Per-key circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and the
+    key gets no traffic for ``open_seconds``. Then a single trial request is
+    let through (half-open): success closes the circuit, failure reopens it.
+    Not thread-safe on its own; KeyPool calls it under its lock.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, open_seconds: float = 120):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.opened = 0
+        self._trial_in_flight = False
+
+    def state(self, now: float) -> str:
+        if self.consecutive_failures < self.failure_threshold:
+            return self.CLOSED
+        if now < self.open_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self, now: float) -> bool:
+        """Whether a request may be sent now."""
+        state = self.state(now)
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            return not self._trial_in_flight
+        return False
+
+    def on_send(self, now: float):
+        if self.state(now) == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_cancelled(self):
+        """A request the caller abandoned: neither outcome, but it no longer holds the trial slot."""
+        self._trial_in_flight = False
+
+    def record_failure(self, now: float):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.consecutive_failures >= self.failure_threshold:
+            self.open_until = now + self.open_seconds
+            self.opened += 1
+
+
+@dataclass
+class KeyState:
+    """Budget and health bookkeeping for a single API key."""
+
+    index: int
+    requests: TokenBucket
+    tokens: TokenBucket
+    cooldown_until: float = 0.0
+    in_flight: int = 0
+    health: float = 1.0
+    successes: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    cancelled: int = 0
+    last_error: str = ""
+    streams: int = 0
+    ttft_avg: float = 0.0
+    tokens_per_second_avg: float = 0.0
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+
+
+class KeyPool:
+    """Thread-safe pool that hands out the API key with the most headroom."""
+
+    # Weight of the newest outcome in the exponentially weighted health score
+    HEALTH_ALPHA = 0.2
+    MIN_HEALTH = 0.05
+
+    def __init__(self, api_keys: List[str], requests_per_minute: int = 15,
+                 tokens_per_minute: int = 1000000, cooldown_seconds: float = 60,
+                 max_in_flight: Optional[int] = None, failure_threshold: int = 5,
+                 breaker_open_seconds: float = 120):
+        self.logger = logging.getLogger(__name__)
+        self.api_keys = list(api_keys)
+        self.cooldown_seconds = cooldown_seconds
+        self.max_in_flight = max_in_flight
+        self._cond = threading.Condition()
+        self._states = [
+            KeyState(
+                index=i,
+                requests=TokenBucket(requests_per_minute, requests_per_minute / 60.0),
+                tokens=TokenBucket(tokens_per_minute, tokens_per_minute / 60.0),
+                breaker=CircuitBreaker(failure_threshold, breaker_open_seconds),
+            )
+            for i in range(len(self.api_keys))
+        ]
+
+    def __len__(self):
+        return len(self.api_keys)
+
+    def _headroom(self, state: KeyState, now: float) -> float:
+        """Score a key by its tightest remaining budget, weighted by health."""
+        request_room = state.requests.available(now) / state.requests.capacity
+        token_room = state.tokens.available(now) / state.tokens.capacity
+        return min(request_room, token_room) * max(state.health, self.MIN_HEALTH)
+
+    def _is_ready(self, state: KeyState, estimated_tokens: int, now: float) -> bool:
+        if state.cooldown_until > now:
+            return False
+        if not state.breaker.allow(now):
+            return False
+        if self.max_in_flight is not None and state.in_flight >= self.max_in_flight:
+            return False
+        if state.requests.available(now) < 1:
+            return False
+        return state.tokens.time_until(estimated_tokens, now) == 0
+
+    def _wait_time(self, state: KeyState, estimated_tokens: int, now: float) -> Optional[float]:
+        """Seconds until a key could be ready, or None if only a release can free it."""
+        if self.max_in_flight is not None and state.in_flight >= self.max_in_flight:
+            return None
+        breaker_state = state.breaker.state(now)
+        if breaker_state == CircuitBreaker.HALF_OPEN and not state.breaker.allow(now):
+            # Waiting for the trial request to finish
+            return None
+        return max(
+            state.cooldown_until - now,
+            state.breaker.open_until - now if breaker_state == CircuitBreaker.OPEN else 0.0,
+            state.requests.time_until(1, now),
+            state.tokens.time_until(estimated_tokens, now),
+            0.0,
+        )
+
+    def acquire(self, estimated_tokens: int = 0, exclude: Iterable[int] = (),
+                timeout: Optional[float] = None) -> int:
+        """
+        Reserve budget on the best available key.
+
+        Args:
+            estimated_tokens (int): Expected prompt + output tokens for the call
+            exclude (iterable): Key indexes that must not be used
+            timeout (float): Maximum seconds to wait for a key (None waits forever)
+
+        Returns:
+            int: Index of the reserved key; pass it back to release()
+        """
+        excluded = set(exclude)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                candidates = [s for s in self._states if s.index not in excluded]
+                if not candidates:
+                    raise NoKeyAvailableError("All API keys are excluded")
+
+                ready = [s for s in candidates if self._is_ready(s, estimated_tokens, now)]
+                if ready:
+                    best = max(ready, key=lambda s: self._headroom(s, now))
+                    best.requests.consume(1, now)
+                    best.tokens.consume(estimated_tokens, now)
+                    best.in_flight += 1
+                    best.breaker.on_send(now)
+                    return best.index
+
+                waits = [w for w in (self._wait_time(s, estimated_tokens, now) for s in candidates) if w is not None]
+                wait = min(waits) if waits else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise NoKeyAvailableError(f"No API key available within {timeout}s")
+                    wait = remaining if wait is None else min(wait, remaining)
+
+                self.logger.debug(f"All API keys busy or cooling down, waiting {wait if wait is not None else 'for a release'}s")
+                self._cond.wait(wait)
+
+    def release(self, key_index: int, tokens_used: Optional[int] = None,
+                estimated_tokens: int = 0, error: Optional[Exception] = None,
+                cancelled: bool = False):
+        """
+        Return a key reserved with acquire() and record the call outcome.
+
+        Args:
+            key_index (int): Index returned by acquire()
+            tokens_used (int): Actual tokens reported by the API, if known
+            estimated_tokens (int): Estimate that was reserved in acquire()
+            error (Exception): Error raised by the call, None on success
+            cancelled (bool): The caller abandoned the call (e.g. closed a stream)
+                before it finished; only frees the slot, health and breaker are left alone
+        """
+        with self._cond:
+            now = time.monotonic()
+            state = self._states[key_index]
+            state.in_flight = max(0, state.in_flight - 1)
+
+            if tokens_used is not None:
+                # Settle the reservation against what the API actually counted
+                state.tokens.consume(tokens_used - estimated_tokens, now)
+
+            if cancelled:
+                state.cancelled += 1
+                state.breaker.record_cancelled()
+            elif error is None:
+                state.successes += 1
+                state.health += self.HEALTH_ALPHA * (1.0 - state.health)
+                state.breaker.record_success()
+            else:
+                state.failures += 1
+                state.last_error = str(error)[:200]
+                state.health += self.HEALTH_ALPHA * (0.0 - state.health)
+                state.breaker.record_failure(now)
+                if state.breaker.state(now) == CircuitBreaker.OPEN:
+                    self.logger.warning(
+                        f"API key {key_index + 1} failed {state.breaker.consecutive_failures} times in a row, "
+                        f"circuit open for {state.breaker.open_seconds:.0f}s"
+                    )
+                if is_rate_limit_error(error):
+                    state.rate_limited += 1
+                    cooldown = retry_after_seconds(error, self.cooldown_seconds)
+                    state.cooldown_until = max(state.cooldown_until, now + cooldown)
+                    # Drain the request bucket so the key is not picked again before refilling
+                    state.requests.tokens = min(state.requests.tokens, 0.0)
+                    self.logger.info(f"API key {key_index + 1} rate limited, cooling down for {cooldown:.0f}s")
+
+            self._cond.notify_all()
+
+    def record_stream(self, key_index: int, time_to_first_token: float, tokens_per_second: float):
+        """Record latency metrics of a streamed response (exponentially weighted averages)."""
+        with self._cond:
+            state = self._states[key_index]
+            if state.streams == 0:
+                state.ttft_avg = time_to_first_token
+                state.tokens_per_second_avg = tokens_per_second
+            else:
+                state.ttft_avg += self.HEALTH_ALPHA * (time_to_first_token - state.ttft_avg)
+                state.tokens_per_second_avg += self.HEALTH_ALPHA * (tokens_per_second - state.tokens_per_second_avg)
+            state.streams += 1
+
+    def best_key(self, exclude: Iterable[int] = ()) -> Optional[int]:
+        """Index of the key with the most headroom right now, without reserving it."""
+        excluded = set(exclude)
+        with self._cond:
+            now = time.monotonic()
+            candidates = [
+                s for s in self._states
+                if s.index not in excluded and s.cooldown_until <= now and s.breaker.allow(now)
+            ]
+            if not candidates:
+                return None
+            return max(candidates, key=lambda s: self._headroom(s, now)).index
+
+    def status(self) -> List[Dict]:
+        """Snapshot of every key's budget and health for display."""
+        with self._cond:
+            now = time.monotonic()
+            return [
+                {
+                    'index': s.index,
+                    'key_preview': f"...{self.api_keys[s.index][-6:]}",
+                    'requests_left': round(s.requests.available(now), 1),
+                    'tokens_left': int(s.tokens.available(now)),
+                    'cooldown_seconds': round(max(0.0, s.cooldown_until - now), 1),
+                    'in_flight': s.in_flight,
+                    'health': round(s.health, 3),
+                    'successes': s.successes,
+                    'failures': s.failures,
+                    'rate_limited': s.rate_limited,
+                    'cancelled': s.cancelled,
+                    'circuit': s.breaker.state(now),
+                    'streams': s.streams,
+                    'ttft_ms': round(s.ttft_avg * 1000),
+                    'tokens_per_sec': round(s.tokens_per_second_avg, 1),
+                }
+                for s in self._states
+            ]
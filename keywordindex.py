@@ -0,0 +1,192 @@
+"""
+Cross-run index of generated keywords and titles.
+Records which keyword produced which post, keyed by a normalized form of
+the keyword ("Tips Kopi", "kopi  tips!" -> "kopi tips"), plus the
+normalized title of the post. The scheduler consults it before generating
+so daily runs skip keywords that were written recently, refresh old ones
+in place under their existing post id, and never overwrite an unrelated
+post whose title slug happens to collide.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+SKIP = "skip"  # never regenerate a known keyword
+REFRESH = "refresh"  # regenerate a known keyword once it is older than refresh_days
+ALWAYS = "always"  # regenerate every keyword on every run
+
+POLICIES = (SKIP, REFRESH, ALWAYS)
+
+
+def _words(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.findall(r"\w+", text)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lowercase, accent-free words in sorted order, so word order and punctuation don't matter."""
+    return " ".join(sorted(_words(keyword)))
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, accent-free words joined by single spaces."""
+    return " ".join(_words(title))
+
+
+class KeywordIndex:
+    """Normalized keyword -> generated post, persisted next to the post store."""
+
+    def __init__(self, path: str = "posts.db"):
+        """
+        Args:
+            path (str): SQLite database file (the post store's, by default)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_index (
+                normalized_keyword TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                normalized_title TEXT NOT NULL,
+                generated_at REAL NOT NULL,
+                generations INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_keyword_index_title ON keyword_index (normalized_title)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_keyword_index_post ON keyword_index (post_id)")
+
+    def lookup(self, keyword: str) -> Optional[Dict]:
+        """
+        Index entry for a keyword (in any spelling that normalizes the same).
+
+        Returns:
+            dict: keyword, post_id, normalized_title, generated_at, generations; or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT keyword, post_id, normalized_title, generated_at, generations "
+                "FROM keyword_index WHERE normalized_keyword = ?", (normalize_keyword(keyword),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'keyword': row[0],
+            'post_id': row[1],
+            'normalized_title': row[2],
+            'generated_at': row[3],
+            'generations': row[4],
+        }
+
+    def title_owner(self, title: str) -> Optional[str]:
+        """Keyword that already produced a post with this (normalized) title, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT keyword FROM keyword_index WHERE normalized_title = ? LIMIT 1", (normalize_title(title),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def select(self, keywords: List[str], policy: str = REFRESH, refresh_days: float = 31) -> Dict[str, List[str]]:
+        """
+        Split keywords into the ones to generate and the ones to skip.
+
+        Duplicates within the list (after normalization) are dropped too.
+
+        Args:
+            keywords (list): Configured keywords
+            policy (str): SKIP, REFRESH or ALWAYS
+            refresh_days (float): Age after which REFRESH regenerates a keyword
+
+        Returns:
+            dict: {"generate": [...], "refresh": [...], "skip": [...]};
+                  "refresh" keywords are also in "generate"
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown keyword policy: {policy}")
+        cutoff = time.time() - refresh_days * 24 * 3600
+        selection = {'generate': [], 'refresh': [], 'skip': []}
+        seen = set()
+        for keyword in keywords:
+            normalized = normalize_keyword(keyword)
+            if not normalized or normalized in seen:
+                selection['skip'].append(keyword)
+                continue
+            seen.add(normalized)
+            entry = self.lookup(keyword) if policy != ALWAYS else None
+            if entry is None:
+                selection['generate'].append(keyword)
+            elif policy == REFRESH and entry['generated_at'] < cutoff:
+                selection['generate'].append(keyword)
+                selection['refresh'].append(keyword)
+            else:
+                selection['skip'].append(keyword)
+        return selection
+
+    def record(self, keyword: str, post: Dict):
+        """Remember that keyword produced post (replacing an earlier entry)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO keyword_index (normalized_keyword, keyword, post_id, normalized_title, generated_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (normalized_keyword) DO UPDATE SET "
+                "keyword = excluded.keyword, post_id = excluded.post_id, "
+                "normalized_title = excluded.normalized_title, generated_at = excluded.generated_at, "
+                "generations = generations + 1",
+                (normalize_keyword(keyword), keyword, post['id'], normalize_title(post.get('title', '')), time.time())
+            )
+
+    def backfill(self, posts: List[Dict]) -> int:
+        """
+        Index existing posts that carry a "keyword" (e.g. from before the index existed).
+
+        Keywords that are already indexed are left alone.
+
+        Returns:
+            int: Number of keywords added
+        """
+        added = 0
+        with self._lock:
+            for post in posts:
+                if not post.get('keyword') or not post.get('id'):
+                    continue
+                generated_at = time.time()
+                if post.get('scheduled_at'):
+                    try:
+                        generated_at = time.mktime(time.strptime(post['scheduled_at'][:19], "%Y-%m-%dT%H:%M:%S"))
+                    except ValueError:
+                        pass
+                added += self._conn.execute(
+                    "INSERT OR IGNORE INTO keyword_index "
+                    "(normalized_keyword, keyword, post_id, normalized_title, generated_at) VALUES (?, ?, ?, ?, ?)",
+                    (normalize_keyword(post['keyword']), post['keyword'], post['id'],
+                     normalize_title(post.get('title', '')), generated_at)
+                ).rowcount
+        return added
+
+    def count(self) -> int:
+        """Number of indexed keywords."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM keyword_index").fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            self.logger.error(f"Error closing keyword index {self.path}: {str(e)}")
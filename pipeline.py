@@ -0,0 +1,201 @@
+"""
+Staged processing pipeline.
+Items flow from a source iterator through stages connected by bounded
+queues; every stage has its own worker threads, so slow stages (image
+lookups, saving, deploying) run alongside the source (article generation)
+instead of after it, and a full queue slows the stage before it down.
+"""
+
+import time
+import queue
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Marks the end of the stream in a stage queue
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Counters of one pipeline stage."""
+
+    name: str
+    workers: int = 1
+    queue_size: int = 0
+    processed: int = 0
+    dropped: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_dict(self, queue_depth: int = 0) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or time.monotonic()) - self.started_at) if self.started_at else 0.0
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_size': self.queue_size,
+            'busy_seconds': round(self.busy_seconds, 2),
+            'per_minute': round(self.processed / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class _Stage:
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int, queue_size: int):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats(name, self.workers, queue_size)
+        self.finished_workers = 0
+
+
+class Pipeline:
+    """
+    Run items through a chain of stages with bounded queues between them.
+
+    Each stage function takes one item and returns the item for the next
+    stage, or None to drop it. Exceptions are logged and drop the item.
+    """
+
+    def __init__(self, name: str = "pipeline", report_interval: float = 0):
+        """
+        Args:
+            name (str): Name used in log lines
+            report_interval (float): Log queue depths every this many seconds (0 = only at the end)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.report_interval = report_interval
+        self.source_stats = StageStats("source")
+        self._stages: List[_Stage] = []
+        self._results: List[Any] = []
+        self._results_lock = threading.Lock()
+
+    def add_stage(self, name: str, func: Callable[[Any], Any], workers: int = 1, queue_size: int = 8) -> "Pipeline":
+        """
+        Append a stage.
+
+        Args:
+            name (str): Stage name for stats and logs
+            func (callable): item -> item for the next stage, or None to drop it
+            workers (int): Threads running this stage
+            queue_size (int): Capacity of the queue in front of this stage
+        """
+        self._stages.append(_Stage(name, func, workers, queue_size))
+        return self
+
+    def _put(self, stage: _Stage, item: Any):
+        stage.inbox.put(item)
+        depth = stage.inbox.qsize()
+        with stage.stats._lock:
+            stage.stats.max_queue_depth = max(stage.stats.max_queue_depth, depth)
+
+    def _emit(self, index: int, item: Any):
+        """Pass an item to the stage after ``index`` (or to the results)."""
+        if index + 1 < len(self._stages):
+            self._put(self._stages[index + 1], item)
+        else:
+            with self._results_lock:
+                self._results.append(item)
+
+    def _worker(self, index: int):
+        stage = self._stages[index]
+        while True:
+            item = stage.inbox.get()
+            if item is _DONE:
+                with stage.stats._lock:
+                    stage.finished_workers += 1
+                    last = stage.finished_workers == stage.workers
+                    if last:
+                        stage.stats.finished_at = time.monotonic()
+                # Each worker gets its own end marker; the last one to finish ends the next stage
+                if last and index + 1 < len(self._stages):
+                    for _ in range(self._stages[index + 1].workers):
+                        self._stages[index + 1].inbox.put(_DONE)
+                return
+
+            started = time.monotonic()
+            try:
+                result = stage.func(item)
+                outcome = 'processed' if result is not None else 'dropped'
+            except Exception as e:
+                self.logger.error(f"{self.name}: stage '{stage.name}' failed: {str(e)}")
+                result, outcome = None, 'failed'
+            with stage.stats._lock:
+                stage.stats.busy_seconds += time.monotonic() - started
+                setattr(stage.stats, outcome, getattr(stage.stats, outcome) + 1)
+            if result is not None:
+                self._emit(index, result)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-stage counters, current and max queue depth and throughput."""
+        return [self.source_stats.to_dict()] + [stage.stats.to_dict(stage.inbox.qsize()) for stage in self._stages]
+
+    def log_stats(self):
+        """Write one log line per stage."""
+        for stats in self.stats():
+            self.logger.info(
+                f"{self.name} [{stats['stage']}] {stats['processed']} done, {stats['dropped']} dropped, "
+                f"{stats['failed']} failed, queue {stats['queue_depth']}/{stats['queue_size']} "
+                f"(max {stats['max_queue_depth']}), busy {stats['busy_seconds']}s, {stats['per_minute']}/min"
+            )
+
+    def run(self, source: Iterable[Any]) -> List[Any]:
+        """
+        Feed every item of ``source`` through the stages and wait for the end.
+
+        The source is iterated in the calling thread; a full first queue
+        makes it wait.
+
+        Returns:
+            list: Items that came out of the last stage, in completion order
+        """
+        if not self._stages:
+            return list(source)
+
+        now = time.monotonic()
+        self.source_stats.started_at = now
+        for stage in self._stages:
+            stage.stats.started_at = now
+
+        threads = []
+        for index, stage in enumerate(self._stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index,),
+                                          name=f"{self.name}-{stage.name}-{n + 1}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        stop_reporting = threading.Event()
+        if self.report_interval > 0:
+            def report():
+                while not stop_reporting.wait(self.report_interval):
+                    self.log_stats()
+            threading.Thread(target=report, name=f"{self.name}-report", daemon=True).start()
+
+        try:
+            for item in source:
+                self.source_stats.processed += 1
+                self._put(self._stages[0], item)
+        except Exception as e:
+            self.logger.error(f"{self.name}: source failed: {str(e)}")
+            self.source_stats.failed += 1
+        finally:
+            self.source_stats.finished_at = time.monotonic()
+            for _ in range(self._stages[0].workers):
+                self._stages[0].inbox.put(_DONE)
+            for thread in threads:
+                thread.join()
+            stop_reporting.set()
+
+        return list(self._results)
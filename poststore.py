@@ -0,0 +1,318 @@
+"""
+Indexed post storage shared by the dashboard and the scheduler.
+Posts are kept in SQLite (WAL mode, so the Streamlit app can read while a
+scheduler process writes) as the full post JSON plus indexed columns for
+id, category, generated_by, keyword and scheduled_at, and a tag table.
+Lookups, filters and counts use the indexes instead of scanning every post.
+"""
+
+import os
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+def read_legacy_posts(snapshot_path: str = "posts.json") -> List[Dict]:
+    """Posts saved to posts.json before the store existed ([] if there is no file)."""
+    if not os.path.exists(snapshot_path):
+        return []
+    with open(snapshot_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _casefold(text: Optional[str]) -> Optional[str]:
+    return text.casefold() if text is not None else None
+
+
+class PostStore:
+    """SQLite-backed post collection keyed by post id, in insertion order."""
+
+    def __init__(self, path: str = "posts.db"):
+        """
+        Args:
+            path (str): SQLite database file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        # SQLite's lower() only folds ASCII; title search needs "É" to match "é"
+        self._conn.create_function("casefold", 1, _casefold, deterministic=True)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                title TEXT,
+                category TEXT,
+                generated_by TEXT,
+                keyword TEXT,
+                scheduled_at TEXT,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS post_tags (
+                post_id TEXT NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (post_id, tag)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_category ON posts (category)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_generated_by ON posts (generated_by, scheduled_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_keyword ON posts (keyword)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_scheduled_at ON posts (scheduled_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_post_tags_tag ON post_tags (tag)")
+
+    @staticmethod
+    def _row(post: Dict) -> tuple:
+        return (
+            post['id'],
+            post.get('title'),
+            post.get('category'),
+            post.get('generated_by'),
+            post.get('keyword'),
+            post.get('scheduled_at'),
+            json.dumps(post, ensure_ascii=False),
+        )
+
+    def _write(self, posts: Iterable[Dict], replace: bool, clear: bool = False) -> int:
+        """Insert (or upsert) posts in one transaction, optionally after deleting all posts."""
+        if replace:
+            # Keeps seq (the list position) of an existing post, unlike INSERT OR REPLACE
+            sql = ("INSERT INTO posts (id, title, category, generated_by, keyword, scheduled_at, data) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                   "title = excluded.title, category = excluded.category, generated_by = excluded.generated_by, "
+                   "keyword = excluded.keyword, scheduled_at = excluded.scheduled_at, data = excluded.data")
+        else:
+            sql = ("INSERT OR IGNORE INTO posts (id, title, category, generated_by, keyword, scheduled_at, data) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)")
+        written = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if clear:
+                    self._conn.execute("DELETE FROM posts")
+                for post in posts:
+                    if self._conn.execute(sql, self._row(post)).rowcount == 0:
+                        continue
+                    written += 1
+                    self._write_tags(post)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return written
+
+    def _write_tags(self, post: Dict):
+        self._conn.execute("DELETE FROM post_tags WHERE post_id = ?", (post['id'],))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO post_tags (post_id, tag) VALUES (?, ?)",
+            [(post['id'], tag) for tag in post.get('tags') or []]
+        )
+
+    def add_many(self, posts: Iterable[Dict]) -> List[str]:
+        """
+        Insert posts as new posts, never replacing an existing one.
+
+        A taken id gets a "-2", "-3", ... suffix (two articles whose titles
+        slug the same stay two posts); post['id'] is set to the id used.
+
+        Returns:
+            list: Ids the posts were stored under
+        """
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for post in posts:
+                    base_id, n = post['id'], 2
+                    while self._conn.execute("SELECT 1 FROM posts WHERE id = ?", (post['id'],)).fetchone():
+                        post['id'] = f"{base_id}-{n}"
+                        n += 1
+                    self._conn.execute(
+                        "INSERT INTO posts (id, title, category, generated_by, keyword, scheduled_at, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", self._row(post)
+                    )
+                    self._write_tags(post)
+                    ids.append(post['id'])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def add(self, post: Dict) -> str:
+        """Insert one new post (see add_many); returns the id it was stored under."""
+        return self.add_many([post])[0]
+
+    def insert_many(self, posts: Iterable[Dict]) -> int:
+        """
+        Bulk insert posts, skipping ids that already exist.
+
+        Returns:
+            int: Number of posts inserted
+        """
+        return self._write(posts, replace=False)
+
+    def upsert_many(self, posts: Iterable[Dict]) -> int:
+        """
+        Bulk insert or update posts by id (an updated post keeps its position).
+
+        For edits of existing posts; new posts go through add_many so they
+        cannot overwrite another post with the same id.
+
+        Returns:
+            int: Number of posts written
+        """
+        return self._write(posts, replace=True)
+
+    def upsert(self, post: Dict) -> bool:
+        """Insert or update one post."""
+        return self.upsert_many([post]) == 1
+
+    def replace_all(self, posts: List[Dict]) -> int:
+        """Replace the whole collection (e.g. on import); returns the number of posts stored."""
+        return self._write(posts, replace=True, clear=True)
+
+    def delete(self, post_id: str) -> bool:
+        """Delete a post by id; True if it existed."""
+        with self._lock:
+            return self._conn.execute("DELETE FROM posts WHERE id = ?", (post_id,)).rowcount > 0
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        """Post with this id, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _where(category: Optional[str], tag: Optional[str], generated_by: Optional[str],
+               keyword: Optional[str], title_contains: Optional[str]) -> tuple:
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if tag is not None:
+            clauses.append("id IN (SELECT post_id FROM post_tags WHERE tag = ?)")
+            params.append(tag)
+        if generated_by is not None:
+            clauses.append("generated_by = ?")
+            params.append(generated_by)
+        if keyword is not None:
+            clauses.append("keyword = ?")
+            params.append(keyword)
+        if title_contains:
+            clauses.append("instr(casefold(title), ?) > 0")
+            params.append(title_contains.casefold())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, category: Optional[str] = None, tag: Optional[str] = None,
+              generated_by: Optional[str] = None, keyword: Optional[str] = None,
+              title_contains: Optional[str] = None, newest_first: bool = False,
+              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Posts matching all given filters.
+
+        Args:
+            category (str): Exact category
+            tag (str): Tag the post must have
+            generated_by (str): e.g. "AI_Scheduled"
+            keyword (str): Keyword the post was generated from
+            title_contains (str): Case-insensitive title substring
+            newest_first (bool): Order by scheduled_at descending instead of insertion order
+            limit (int): Max posts to return
+
+        Returns:
+            list: Matching posts
+        """
+        where, params = self._where(category, tag, generated_by, keyword, title_contains)
+        sql = f"SELECT data FROM posts{where} ORDER BY " + ("scheduled_at DESC" if newest_first else "seq")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, category: Optional[str] = None, tag: Optional[str] = None,
+              generated_by: Optional[str] = None, keyword: Optional[str] = None,
+              title_contains: Optional[str] = None) -> int:
+        """Number of posts matching the filters (same arguments as query)."""
+        where, params = self._where(category, tag, generated_by, keyword, title_contains)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM posts{where}", params).fetchone()[0]
+
+    def all(self) -> List[Dict]:
+        """All posts in insertion order."""
+        return self.query()
+
+    def categories(self) -> List[str]:
+        """Distinct categories, sorted."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT category FROM posts WHERE category IS NOT NULL ORDER BY category"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def tags(self) -> List[str]:
+        """Distinct tags, sorted."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT tag FROM post_tags ORDER BY tag").fetchall()
+        return [row[0] for row in rows]
+
+    def import_legacy(self, snapshot_path: str = "posts.json") -> int:
+        """
+        Copy posts from posts.json into an empty store.
+
+        Returns:
+            int: Number of posts imported (0 if the store already had posts)
+        """
+        if self.count():
+            return 0
+        posts = read_legacy_posts(snapshot_path)
+        if not posts:
+            return 0
+        imported = self.insert_many(posts)
+        self.logger.info(f"Imported {imported} posts from {snapshot_path} into {self.path}")
+        return imported
+
+    def close(self):
+        """Close the database."""
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            self.logger.error(f"Error closing post store {self.path}: {str(e)}")
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_store() -> PostStore:
+    """
+    Get the process-wide PostStore at Config.POST_STORE_PATH.
+
+    On first use an empty store is filled from an existing posts.json.
+    """
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            from config import Config
+            config = Config()
+            _shared_store = PostStore(config.POST_STORE_PATH)
+            try:
+                _shared_store.import_legacy(config.POSTS_FILE)
+            except Exception as e:
+                _shared_store.logger.error(f"Error importing {config.POSTS_FILE}: {str(e)}")
+        return _shared_store
@@ -0,0 +1,73 @@
+"""
+Retry policy for calls to the Gemini API.
+Exponential backoff with full jitter spreads retries out instead of
+hammering the API again right away; KeyPool's circuit breaker keeps
+the retries away from keys that keep failing.
+"""
+
+import re
+import random
+import threading
+from typing import Optional
+
+from keypool import error_status_code, is_rate_limit_error, NoKeyAvailableError
+
+# Markers of transient server-side or network failures worth retrying
+TRANSIENT_ERROR_MARKERS = (
+    "500", "502", "503", "504", "internal", "unavailable", "deadline",
+    "timeout", "timed out", "connection", "reset by peer",
+)
+TRANSIENT_ERROR_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(marker) for marker in TRANSIENT_ERROR_MARKERS) + r")\b"
+)
+
+# Request errors that fail the same way however often they are retried
+PERMANENT_ERROR_TYPES = ("InvalidArgument", "Unauthenticated", "PermissionDenied", "NotFound",
+                         "FailedPrecondition", "BadRequest", "Forbidden", "Unauthorized")
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Check if an API error is transient (rate limit, 5xx or network problem)."""
+    if isinstance(error, NoKeyAvailableError):
+        # The key pool already waited as long as allowed
+        return False
+    if type(error).__name__ in PERMANENT_ERROR_TYPES:
+        return False
+    status = error_status_code(error)
+    if status is not None and 400 <= status < 500 and status not in (408, 429):
+        # 400/401/403/404: bad request, key or model; fail fast
+        return False
+    if is_rate_limit_error(error):
+        return True
+    if status is not None and status >= 500:
+        return True
+    message = f"{type(error).__name__} {error}".lower()
+    return bool(TRANSIENT_ERROR_PATTERN.search(message))
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Attempt n (starting at 0) waits a random time between 0 and
+    min(max_delay, base_delay * 2 ** n) seconds.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retrying after failed attempt number ``attempt``."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        with self._lock:
+            return self._rng.uniform(0, ceiling)
+
+    def should_retry(self, attempt: int, error: Exception) -> bool:
+        """Whether failed attempt number ``attempt`` should be retried."""
+        return attempt + 1 < self.max_attempts and is_retryable_error(error)
+
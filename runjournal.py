@@ -0,0 +1,201 @@
+"""
+Checkpoint journal for scheduled generation runs.
+Every keyword of a run has a state (pending, generated, saved, deployed or
+failed) that is written to SQLite as soon as it changes, together with the
+generated post until it is saved. A run that dies part way is resumed by
+the next scheduler start: finished keywords are skipped and generated but
+unsaved posts are saved without calling Gemini again.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+PENDING = "pending"
+GENERATED = "generated"
+SAVED = "saved"
+DEPLOYED = "deployed"
+FAILED = "failed"
+
+
+class RunJournal:
+    """Per-keyword progress of scheduled runs, kept across process restarts."""
+
+    def __init__(self, path: str = "scheduler_runs.db", max_attempts: int = 3):
+        """
+        Args:
+            path (str): SQLite database file
+            max_attempts (int): Generation attempts per keyword before a resumed run stops retrying it
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                settings TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_keywords (
+                run_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                keyword TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                post TEXT,
+                post_id TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, keyword)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_run_keywords_state ON run_keywords (run_id, state)")
+
+    def start_or_resume(self, keywords: List[str], settings: Dict) -> Dict:
+        """
+        Resume the latest unfinished run, or start a new one.
+
+        A resumed run keeps its own keywords and settings, so it finishes the
+        work it started even if the configuration changed in between.
+
+        Args:
+            keywords (list): Keywords for a new run
+            settings (dict): Generation settings (language, category, ...) for a new run
+
+        Returns:
+            dict: {"id", "settings", "resumed"}
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, settings FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if row:
+                return {'id': row[0], 'settings': json.loads(row[1]), 'resumed': True}
+
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                run_id = self._conn.execute(
+                    "INSERT INTO runs (settings, started_at) VALUES (?, ?)",
+                    (json.dumps(settings, ensure_ascii=False), now)
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO run_keywords (run_id, position, keyword, state, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, i, keyword, PENDING, now) for i, keyword in enumerate(dict.fromkeys(keywords))]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return {'id': run_id, 'settings': settings, 'resumed': False}
+
+    def keywords_to_generate(self, run_id: int) -> List[str]:
+        """Pending keywords plus failed ones with attempts left, in run order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT keyword FROM run_keywords WHERE run_id = ? AND "
+                "(state = ? OR (state = ? AND attempts < ?)) ORDER BY position",
+                (run_id, PENDING, FAILED, self.max_attempts)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def generated_posts(self, run_id: int) -> List[Dict]:
+        """Posts that were generated but not saved yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT post FROM run_keywords WHERE run_id = ? AND state = ? ORDER BY position",
+                (run_id, GENERATED)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def mark(self, run_id: int, keyword: str, state: str, post: Optional[Dict] = None,
+             error: Optional[str] = None):
+        """
+        Record a keyword's new state.
+
+        Args:
+            run_id (int): Run
+            keyword (str): Keyword
+            state (str): GENERATED (pass the post), SAVED, DEPLOYED or FAILED
+            post (dict): Generated post, kept until the keyword is saved (with SAVED only its id is kept)
+            error (str): Failure reason
+        """
+        attempts = 1 if state in (GENERATED, FAILED) else 0
+        with self._lock:
+            self._conn.execute(
+                "UPDATE run_keywords SET state = ?, attempts = attempts + ?, "
+                "post = CASE WHEN ? = 'generated' THEN ? ELSE NULL END, "
+                "post_id = COALESCE(?, post_id), error = ?, updated_at = ? WHERE run_id = ? AND keyword = ?",
+                (state, attempts, state, json.dumps(post, ensure_ascii=False) if post else None,
+                 post['id'] if post else None, error, time.time(), run_id, keyword)
+            )
+
+    def mark_deployed(self, run_id: int) -> int:
+        """Move every saved keyword of a run to deployed; returns how many."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE run_keywords SET state = ?, updated_at = ? WHERE run_id = ? AND state = ?",
+                (DEPLOYED, time.time(), run_id, SAVED)
+            ).rowcount
+
+    def counts(self, run_id: int) -> Dict[str, int]:
+        """Number of keywords per state."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM run_keywords WHERE run_id = ? GROUP BY state", (run_id,)
+            ).fetchall()
+        counts = {state: 0 for state in (PENDING, GENERATED, SAVED, DEPLOYED, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def is_complete(self, run_id: int, deploy: bool) -> bool:
+        """True when nothing is left to generate, save or (with deploy) deploy."""
+        counts = self.counts(run_id)
+        open_work = counts[PENDING] + counts[GENERATED] + (counts[SAVED] if deploy else 0)
+        return open_work == 0 and not self.keywords_to_generate(run_id)
+
+    def finish(self, run_id: int):
+        """Close a run so the next start begins a new one."""
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def latest_run(self) -> Optional[Dict]:
+        """Most recent run with its state counts, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, settings, started_at, finished_at FROM runs ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'settings': json.loads(row[1]),
+            'started_at': row[2],
+            'finished_at': row[3],
+            'counts': self.counts(row[0]),
+        }
+
+    def close(self):
+        """Close the database."""
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception as e:
+            self.logger.error(f"Error closing run journal {self.path}: {str(e)}")
@@ -6,22 +6,29 @@ Automatically generates articles from keywords and deploys them.
 
 import os
 import json
-import time
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Import modules from existing codebase
-from gemini import GeminiScraper
-from utils import generate_post_id, extract_excerpt_from_content
-from templates import get_modern_template, get_magazine_template, get_corporate_template, get_business_template, get_tech_template, get_minimal_template
-import requests
+from gemini import GeminiScraper, ArticleResult
+from utils import generate_post_id, extract_excerpt_from_content, split_title_and_content, insert_images_to_content, lead_image
+from config import Config
+from pipeline import Pipeline
+from poststore import get_shared_store
+from runjournal import RunJournal, GENERATED, SAVED, FAILED
+from keywordindex import KeywordIndex, REFRESH
 
 class ScheduledArticleGenerator:
     def __init__(self, config_file="scheduler_config.json"):
         self.config_file = config_file
         self.logger = self._setup_logging()
         self.config = self._load_config()
+        # Keyword -> Future of its image lookup, started while the article is still streaming
+        self._image_prefetch = {}
+        self._image_executor = None
         
     def _setup_logging(self):
         """Setup logging for scheduler."""
@@ -50,23 +57,16 @@ class ScheduledArticleGenerator:
             self.logger.error(f"Error loading config: {str(e)}")
             return {}
     
-    def _save_posts_to_file(self, posts: List[Dict], filename="posts.json"):
-        """Save posts to JSON file."""
+    def _save_posts(self, posts: List[Dict], update: bool = False) -> bool:
+        """Add posts to the shared post store (update=True: replace the posts with their ids)."""
         try:
-            # Load existing posts if file exists
-            existing_posts = []
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    existing_posts = json.load(f)
-            
-            # Add new posts
-            existing_posts.extend(posts)
-            
-            # Save all posts
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(existing_posts, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"Saved {len(posts)} new posts to {filename}")
+            store = get_shared_store()
+            if update:
+                written = store.upsert_many(posts)
+                self.logger.info(f"Updated {written} posts in the post store")
+            else:
+                written = len(store.add_many(posts))
+                self.logger.info(f"Saved {written} new posts to the post store")
             return True
         except Exception as e:
             self.logger.error(f"Error saving posts: {str(e)}")
@@ -74,6 +74,8 @@ class ScheduledArticleGenerator:
     
     def _deploy_articles_to_cloudflare(self, posts: List[Dict]) -> bool:
         """Deploy articles to Cloudflare Worker."""
+        import requests
+        
         try:
             # Get Cloudflare config from environment or config file
             cf_account_id = self.config.get('cf_account_id') or os.getenv('CF_ACCOUNT_ID')
@@ -100,10 +102,7 @@ class ScheduledArticleGenerator:
             current_script = response.text
             
             # Load all posts from file
-            all_posts = []
-            if os.path.exists("posts.json"):
-                with open("posts.json", 'r', encoding='utf-8') as f:
-                    all_posts = json.load(f)
+            all_posts = get_shared_store().all()
             
             # Update script with new posts data
             posts_json = json.dumps(all_posts, indent=2)
@@ -140,80 +139,324 @@ class ScheduledArticleGenerator:
             self.logger.error(f"Error deploying to Cloudflare: {str(e)}")
             return False
     
+    def _build_post(self, keyword: str, article: ArticleResult, language: str, category: str) -> Dict:
+        """Turn a generated article into a post dict."""
+        title = article.title
+        content = article.body
+        post_id = generate_post_id(title)
+        excerpt = article.excerpt or extract_excerpt_from_content(content)
+        
+        # Prefer tags suggested by the model, fall back to auto tags
+        if article.tags:
+            auto_tags = list(dict.fromkeys([category.lower()] + article.tags))[:5]
+        else:
+            auto_tags = self._generate_auto_tags(keyword, title, category)
+        
+        return {
+            "id": post_id,
+            "title": title,
+            "author": "AI Scheduler",
+            "date": datetime.now().strftime("%Y-%m-%d"),
+            "excerpt": excerpt,
+            "content": content,
+            "category": category,
+            "tags": auto_tags,
+            "generated_by": "AI_Scheduled",
+            "keyword": keyword,
+            "language": language,
+            "scheduled_at": datetime.now().isoformat()
+        }
+    
     def generate_articles_from_keywords(self, keywords: List[str], language="id", 
-                                      category="Teknologi", writing_style="informatif") -> List[Dict]:
-        """Generate articles from list of keywords."""
+                                      category="Teknologi", writing_style="informatif",
+                                      gemini: Optional[GeminiScraper] = None) -> List[Dict]:
+        """Generate articles from list of keywords (optionally with a caller-owned GeminiScraper)."""
+        return self.run_pipeline(keywords, language, category, writing_style, gemini=gemini)
+    
+    def run_pipeline(self, keywords: List[str], language="id", category="Teknologi",
+                     writing_style="informatif", gemini: Optional[GeminiScraper] = None,
+                     save: bool = False, deploy: bool = False,
+                     journal: Optional[RunJournal] = None, run_id: Optional[int] = None,
+                     index: Optional[KeywordIndex] = None) -> List[Dict]:
+        """
+        Generate, post-process and optionally save and deploy articles as a pipeline.
+        
+        Gemini results feed bounded queues for the post, image, save and
+        deploy stages, so a finished article is illustrated, saved and
+        (with ``deploy_every``) deployed while the next ones are still being
+        written.
+        
+        Args:
+            keywords (list): Keywords to write about
+            language (str): Article language
+            category (str): Post category
+            writing_style (str): Writing style
+            gemini (GeminiScraper): Caller-owned scraper (default: a new one, closed at the end)
+            save (bool): Save every finished post to the post store
+            deploy (bool): Deploy to Cloudflare every ``deploy_every`` saved posts and at the end
+            journal (RunJournal): Checkpoint every keyword's state under run_id; the
+                run's generated-but-unsaved posts are fed in without calling Gemini
+            run_id (int): Run in the journal
+            index (KeywordIndex): Record saved keywords; a keyword generated before keeps its post id
+            
+        Returns:
+            list: Finished posts in completion order
+        """
         generated_posts = []
+        owns_gemini = gemini is None
+        include_images = self.config.get('include_images', False)
         
         try:
-            gemini = GeminiScraper()
+            if owns_gemini:
+                gemini = GeminiScraper()
             
-            for i, keyword in enumerate(keywords):
-                self.logger.info(f"Generating article {i+1}/{len(keywords)}: {keyword}")
-                
-                try:
-                    # Generate article content
-                    article_content = gemini.generate_article(keyword, language, writing_style)
-                    
-                    if article_content:
-                        # Process content
-                        lines = article_content.split('\n')
-                        title = keyword  # Default title
-                        content_start = 0
-                        
-                        # Extract title from content
-                        for j, line in enumerate(lines):
-                            if line.strip():
-                                if line.startswith('#'):
-                                    title = line.replace('#', '').strip()
-                                    content_start = j + 1
-                                    break
-                                elif len(line.strip()) < 100:
-                                    title = line.strip()
-                                    content_start = j + 1
-                                    break
-                        
-                        content = '\n'.join(lines[content_start:]).strip()
-                        post_id = generate_post_id(title)
-                        excerpt = extract_excerpt_from_content(content)
-                        
-                        # Generate auto tags
-                        auto_tags = self._generate_auto_tags(keyword, title, category)
-                        
-                        new_post = {
-                            "id": post_id,
-                            "title": title,
-                            "author": "AI Scheduler",
-                            "date": datetime.now().strftime("%Y-%m-%d"),
-                            "excerpt": excerpt,
-                            "content": content,
-                            "category": category,
-                            "tags": auto_tags,
-                            "generated_by": "AI_Scheduled",
-                            "keyword": keyword,
-                            "language": language,
-                            "scheduled_at": datetime.now().isoformat()
-                        }
-                        
-                        generated_posts.append(new_post)
-                        self.logger.info(f"Successfully generated: {title}")
-                        
-                    else:
-                        self.logger.error(f"Failed to generate content for: {keyword}")
-                
-                except Exception as e:
-                    self.logger.error(f"Error generating article for '{keyword}': {str(e)}")
-                
-                # Add delay between requests
-                time.sleep(2)
+            ready_posts = journal.generated_posts(run_id) if journal else []
+            total = len(ready_posts) + len(keywords)
+            pipeline = self._build_pipeline(total, language, category, save, deploy, journal, run_id, index)
+            if journal and deploy:
+                # Saved by an earlier attempt of this run but never deployed
+                self._deploy_pending += journal.counts(run_id)[SAVED]
+            
+            # Keywords generated before are being refreshed: don't get the cached article back
+            uncached = [keyword for keyword in keywords if index.lookup(keyword)] if index else []
+            results = enumerate(itertools.chain(
+                ((post['keyword'], post) for post in ready_posts),
+                self._generation_results(gemini, keywords, language, writing_style, uncached) if keywords else []
+            ))
+            try:
+                generated_posts = pipeline.run(results)
+            finally:
+                self._stop_image_prefetch()
+            pipeline.log_stats()
             
-            gemini.close()
+            if deploy and self._deploy_pending:
+                # Posts saved since the last rolling deploy
+                self._deploy_stage_flush()
+            
+            if include_images:
+                from bingimage import get_shared_scraper
+                connection_stats = get_shared_scraper().get_connection_stats()
+                self.logger.info(f"Image HTTP: {connection_stats['requests']} requests over "
+                                 f"{connection_stats['connections']} connections "
+                                 f"({connection_stats['reuse_rate']:.0%} reused, {connection_stats['hosts']} hosts)")
             
         except Exception as e:
             self.logger.error(f"Error in bulk generation: {str(e)}")
+        finally:
+            if owns_gemini and gemini is not None:
+                gemini.close()
         
         return generated_posts
     
+    def _generation_results(self, gemini: GeminiScraper, keywords: List[str], language: str, writing_style: str,
+                            uncached: List[str] = ()):
+        """(keyword, article) pairs from Gemini, concurrently or one by one as configured."""
+        structured = self.config.get('structured_generation', True)
+        stream = self.config.get('stream_generation', False)
+        sectioned = self.config.get('sectioned_generation', False)
+        
+        if self.config.get('concurrent_generation', True):
+            # Spread keywords over all API keys; posts arrive in completion order
+            self.logger.info(f"Generating {len(keywords)} articles concurrently with {len(gemini.api_keys)} API key(s)")
+            return gemini.generate_articles_concurrently(
+                keywords, language, writing_style,
+                self.config.get('max_concurrency_per_key'),
+                structured=structured,
+                sectioned=sectioned,
+                uncached=uncached
+            )
+        return self._generate_sequentially(gemini, keywords, language, writing_style,
+                                           structured, stream, sectioned, uncached)
+    
+    def _build_pipeline(self, total: int, language: str, category: str, save: bool, deploy: bool,
+                        journal: Optional[RunJournal] = None, run_id: Optional[int] = None,
+                        index: Optional[KeywordIndex] = None) -> Pipeline:
+        """Stages after generation: post building, images, saving and rolling deploy."""
+        queue_size = self.config.get('pipeline_queue_size', 8)
+        pipeline = Pipeline("scheduler", report_interval=self.config.get('pipeline_report_interval', 60))
+        
+        def build(item):
+            i, (keyword, article) = item
+            if isinstance(article, dict):
+                # Generated by an earlier attempt of this run
+                self.logger.info(f"[{i+1}/{total}] Resumed: {article['title']}")
+                return article
+            if not article:
+                self.logger.error(f"[{i+1}/{total}] Failed to generate content for: {keyword}")
+                if journal:
+                    journal.mark(run_id, keyword, FAILED, error="generation failed")
+                return None
+            if not isinstance(article, ArticleResult):
+                article = ArticleResult.from_markdown(article, keyword)
+            new_post = self._build_post(keyword, article, language, category)
+            if journal:
+                journal.mark(run_id, keyword, GENERATED, post=new_post)
+            self.logger.info(f"[{i+1}/{total}] Successfully generated: {new_post['title']}")
+            return new_post
+        
+        pipeline.add_stage("post", build, queue_size=queue_size)
+        
+        if self.config.get('include_images', False):
+            max_images = self.config.get('max_images_per_post', Config().MAX_IMAGES_PER_POST)
+            
+            def images(post):
+                self._add_images(post, max_images)
+                return post
+            
+            if self.config.get('stream_generation', False):
+                # Streamed articles start their image lookup as soon as the title is in
+                self._image_executor = ThreadPoolExecutor(
+                    max_workers=self.config.get('image_workers', 4), thread_name_prefix="image-prefetch"
+                )
+                self._image_prefetch_max = max_images
+            
+            pipeline.add_stage("images", images, workers=self.config.get('image_workers', 4), queue_size=queue_size)
+        
+        if save:
+            def save_post(post):
+                update = self._claim_post_id(post, index) if index else False
+                if not self._save_posts([post], update):
+                    return None
+                if index:
+                    index.record(post['keyword'], post)
+                if journal:
+                    # post['id'] may have changed on save
+                    journal.mark(run_id, post['keyword'], SAVED, post=post)
+                return post
+            
+            pipeline.add_stage("save", save_post, queue_size=queue_size)
+        
+        self._deploy_pending = 0
+        self._deploy_run = (journal, run_id)
+        if deploy:
+            deploy_every = self.config.get('deploy_every', 0)
+            
+            def rolling_deploy(post):
+                self._deploy_pending += 1
+                if deploy_every and self._deploy_pending >= deploy_every:
+                    self._deploy_stage_flush()
+                return post
+            
+            pipeline.add_stage("deploy", rolling_deploy, queue_size=queue_size)
+        
+        return pipeline
+    
+    def _claim_post_id(self, post: Dict, index: KeywordIndex) -> bool:
+        """
+        Decide whether a post replaces the keyword's earlier post.
+        
+        A refreshed keyword reuses its earlier post id (refresh in place). Other
+        posts are saved as new posts, which get a unique id from the store, so
+        they never overwrite another keyword's post.
+        
+        Returns:
+            bool: True to update the post with post['id'], False to add it as new
+        """
+        entry = index.lookup(post['keyword'])
+        if entry:
+            post['id'] = entry['post_id']
+            return True
+        
+        owner = index.title_owner(post['title'])
+        if owner:
+            self.logger.warning(f"'{post['keyword']}' produced the same title as '{owner}': {post['title']}")
+        
+        # Saved by an earlier attempt that died before indexing it
+        existing = get_shared_store().get(post['id'])
+        return existing is not None and existing.get('keyword') == post['keyword']
+    
+    def _deploy_stage_flush(self):
+        """Deploy everything saved so far and reset the pending count."""
+        self.logger.info(f"Deploying after {self._deploy_pending} new post(s)...")
+        if self._deploy_articles_to_cloudflare([]):
+            self.logger.info("Auto-deploy completed successfully")
+            self._deploy_pending = 0
+            journal, run_id = self._deploy_run
+            if journal:
+                journal.mark_deployed(run_id)
+        else:
+            self.logger.error("Auto-deploy failed")
+    
+    def _prefetch_images(self, keyword: str):
+        """Start the image lookup for a keyword in the background (streamed generation with images)."""
+        if self._image_executor is None or keyword in self._image_prefetch:
+            return
+        from bingimage import get_shared_scraper
+        self._image_prefetch[keyword] = self._image_executor.submit(
+            get_shared_scraper().get_post_images, keyword, self._image_prefetch_max
+        )
+    
+    def _stop_image_prefetch(self):
+        """Shut down the prefetch threads and forget lookups nobody collected."""
+        if self._image_executor is not None:
+            self._image_executor.shutdown(wait=True, cancel_futures=True)
+            self._image_executor = None
+        self._image_prefetch.clear()
+    
+    def _add_images(self, post: Dict, max_images: int):
+        """Insert Bing images into a post (thumbnail-first), using the shared pooled scraper."""
+        keyword = post['keyword']
+        try:
+            from bingimage import get_shared_scraper
+            prefetched = self._image_prefetch.pop(keyword, None)
+            if prefetched is not None:
+                # Started while the article was streaming; usually done by now
+                images = prefetched.result()
+            else:
+                images = get_shared_scraper().get_post_images(keyword, max_images)
+            if not images:
+                self.logger.warning(f"No images found for: {keyword}")
+                return
+            post['content'] = insert_images_to_content(post['content'], images, keyword)
+            post['image'] = lead_image(images)
+        except Exception as e:
+            self.logger.error(f"Error adding images for '{keyword}': {str(e)}")
+    
+    def _generate_sequentially(self, gemini: GeminiScraper, keywords: List[str], language: str,
+                               writing_style: str, structured: bool = True, stream: bool = False,
+                               sectioned: bool = False, uncached: List[str] = ()):
+        """Generate articles one at a time, yielding (keyword, article) pairs."""
+        uncached = set(uncached)
+        for i, keyword in enumerate(keywords):
+            self.logger.info(f"Generating article {i+1}/{len(keywords)}: {keyword}")
+            use_cache = keyword not in uncached
+            if stream:
+                yield keyword, self._generate_streamed(gemini, keyword, language, writing_style, use_cache)
+            elif sectioned:
+                yield keyword, gemini.generate_sectioned_article(keyword, language, writing_style, use_cache)
+            elif structured:
+                yield keyword, gemini.generate_structured_article(keyword, language, writing_style, use_cache)
+            else:
+                yield keyword, gemini.generate_article(keyword, language, writing_style, use_cache)
+
+    
+    def _generate_streamed(self, gemini: GeminiScraper, keyword: str, language: str,
+                           writing_style: str, use_cache: bool = True) -> Optional[ArticleResult]:
+        """
+        Generate an article through the streaming API, parsing the title as soon as it arrives.
+        
+        With images enabled, the image lookup starts at that point and overlaps
+        the rest of the stream, so the images stage mostly collects its result.
+        """
+        try:
+            article_content = ""
+            title_seen = False
+            for chunk in gemini.generate_article_stream(keyword, language, writing_style, use_cache):
+                article_content += chunk
+                if not title_seen and '\n' in article_content.lstrip():
+                    title_seen = True
+                    title, _ = split_title_and_content(article_content, keyword)
+                    self.logger.info(f"Title for '{keyword}' received early: {title}")
+                    self._prefetch_images(keyword)
+            
+            if len(article_content.strip()) > 200:
+                return ArticleResult.from_markdown(article_content, keyword)
+            self.logger.warning(f"Streamed content for '{keyword}' is too short or empty")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error streaming article for '{keyword}': {str(e)}")
+            return None
+    
     def _generate_auto_tags(self, keyword: str, title: str, category: str) -> List[str]:
         """Generate automatic tags from keyword, title, and category."""
         tags = []
@@ -241,6 +484,7 @@ class ScheduledArticleGenerator:
         """Main function to run scheduled article generation."""
         self.logger.info("Starting scheduled article generation...")
         
+        index = journal = None
         try:
             # Get keywords from config
             keywords = self.config.get('keywords', [])
@@ -254,36 +498,68 @@ class ScheduledArticleGenerator:
             writing_style = self.config.get('writing_style', 'informatif')
             auto_deploy = self.config.get('auto_deploy', True)
             
-            self.logger.info(f"Processing {len(keywords)} keywords...")
+            # Only spend quota on keywords that were never generated (or are due for a refresh)
+            index = KeywordIndex(Config().POST_STORE_PATH)
+            if not index.count():
+                index.backfill(get_shared_store().all())
+            selection = index.select(keywords, self.config.get('keyword_policy', REFRESH),
+                                     self.config.get('keyword_refresh_days', Config().KEYWORD_REFRESH_DAYS))
+            if selection['skip'] or selection['refresh']:
+                self.logger.info(f"Keyword index: {len(selection['skip'])} skipped as already generated, "
+                                 f"{len(selection['refresh'])} due for a refresh")
+            keywords = selection['generate']
+            
+            if not self.config.get('resume_runs', True):
+                self.logger.info(f"Processing {len(keywords)} keywords...")
+                generated_posts = self.run_pipeline(
+                    keywords, language, category, writing_style,
+                    save=True, deploy=auto_deploy, index=index
+                )
+                self._log_run_result(generated_posts)
+                return
+            
+            # Every keyword's progress is checkpointed, so a run that dies part way is
+            # resumed by the next start instead of regenerating finished keywords
+            journal = RunJournal(self.config.get('run_journal_path', Config().RUN_JOURNAL_PATH),
+                                 max_attempts=self.config.get('run_max_attempts', Config().RUN_MAX_ATTEMPTS))
+            run = journal.start_or_resume(keywords, {
+                'language': language,
+                'category': category,
+                'writing_style': writing_style,
+            })
+            settings = run['settings']
+            todo = journal.keywords_to_generate(run['id'])
+            if run['resumed']:
+                self.logger.info(f"Resuming run {run['id']}: {journal.counts(run['id'])}")
+            self.logger.info(f"Processing {len(todo)} keywords...")
             
-            # Generate articles
-            generated_posts = self.generate_articles_from_keywords(
-                keywords, language, category, writing_style
+            # Generate, save and deploy as one pipeline: each post is saved as soon as it is
+            # ready, and deployed every deploy_every posts (or once at the end)
+            generated_posts = self.run_pipeline(
+                todo, settings['language'], settings['category'], settings['writing_style'],
+                save=True, deploy=auto_deploy, journal=journal, run_id=run['id'], index=index
             )
+            self._log_run_result(generated_posts)
             
-            if generated_posts:
-                self.logger.info(f"Successfully generated {len(generated_posts)} articles")
-                
-                # Save posts to file
-                if self._save_posts_to_file(generated_posts):
-                    self.logger.info("Posts saved successfully")
-                    
-                    # Auto deploy if enabled
-                    if auto_deploy:
-                        self.logger.info("Starting auto-deploy...")
-                        if self._deploy_articles_to_cloudflare(generated_posts):
-                            self.logger.info("Auto-deploy completed successfully")
-                        else:
-                            self.logger.error("Auto-deploy failed")
-                else:
-                    self.logger.error("Failed to save posts")
+            if journal.is_complete(run['id'], auto_deploy):
+                journal.finish(run['id'])
+                self.logger.info(f"Run {run['id']} finished: {journal.counts(run['id'])}")
             else:
-                self.logger.warning("No articles were generated")
+                self.logger.warning(f"Run {run['id']} left open for the next start: {journal.counts(run['id'])}")
                 
         except Exception as e:
             self.logger.error(f"Error in scheduled generation: {str(e)}")
-        
-        self.logger.info("Scheduled article generation completed")
+        finally:
+            if journal is not None:
+                journal.close()
+            if index is not None:
+                index.close()
+    
+    def _log_run_result(self, generated_posts: List[Dict]):
+        if generated_posts:
+            self.logger.info(f"Successfully generated and saved {len(generated_posts)} articles")
+        else:
+            self.logger.warning("No articles were generated")
 
 def main():
     """Main entry point for scheduled execution."""
@@ -9,6 +9,10 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from config import Config
+from poststore import get_shared_store
+from runjournal import RunJournal
+
 class SchedulerManager:
     def __init__(self, config_file="scheduler_config.json"):
         self.config_file = config_file
@@ -42,6 +46,15 @@ class SchedulerManager:
             "category": "Teknologi",
             "writing_style": "informatif",
             "auto_deploy": True,
+            "concurrent_generation": True,
+            "structured_generation": True,
+            "include_images": False,
+            "max_images_per_post": 3,
+            "max_concurrency_per_key": 2,
+            "deploy_every": 0,
+            "keyword_policy": "refresh",
+            "keyword_refresh_days": 31,
+            "image_workers": 4,
             "cf_account_id": "",
             "cf_api_token": "",
             "worker_name": "",
@@ -123,6 +136,38 @@ class SchedulerManager:
                     value=config.get('auto_deploy', True),
                     help="Otomatis deploy artikel ke Cloudflare Worker setelah generate"
                 )
+                
+                deploy_every = st.number_input(
+                    "🔁 Deploy setiap N artikel",
+                    min_value=0, max_value=50,
+                    value=config.get('deploy_every', 0),
+                    help="Deploy bergulir selama generate berjalan (0 = sekali di akhir)"
+                )
+                
+                policies = {
+                    "refresh": "🔄 Perbarui keyword lama",
+                    "skip": "⏭️ Lewati keyword yang sudah pernah dibuat",
+                    "always": "🔁 Selalu generate ulang",
+                }
+                keyword_policy = st.selectbox(
+                    "🗂️ Keyword yang sudah pernah di-generate",
+                    options=list(policies),
+                    format_func=lambda x: policies[x],
+                    index=list(policies).index(config.get('keyword_policy', 'refresh')),
+                    help="Run harian hanya memakai kuota untuk keyword baru (atau yang perlu diperbarui)"
+                )
+                keyword_refresh_days = st.number_input(
+                    "📅 Perbarui setelah (hari)",
+                    min_value=1, max_value=365,
+                    value=config.get('keyword_refresh_days', 31),
+                    help="Sebaiknya lebih lama dari masa cache respons Gemini (30 hari)"
+                )
+                
+                include_images = st.checkbox(
+                    "🖼️ Sertakan gambar dari Bing",
+                    value=config.get('include_images', False),
+                    help="Satu sesi HTTP dipakai ulang untuk semua keyword dalam satu run"
+                )
             
             if st.form_submit_button("💾 Simpan Pengaturan Keywords", use_container_width=True):
                 keywords_list = [k.strip() for k in keywords_text.strip().split('\n') if k.strip()]
@@ -135,6 +180,10 @@ class SchedulerManager:
                     config['category'] = category
                     config['writing_style'] = writing_style
                     config['auto_deploy'] = auto_deploy
+                    config['include_images'] = include_images
+                    config['deploy_every'] = int(deploy_every)
+                    config['keyword_policy'] = keyword_policy
+                    config['keyword_refresh_days'] = int(keyword_refresh_days)
                     
                     if self.save_config(config):
                         st.success(f"✅ Pengaturan disimpan! {len(keywords_list)} keywords siap untuk generate.")
@@ -329,32 +378,47 @@ class SchedulerManager:
         else:
             st.info("📝 Belum ada log scheduler. Jalankan scheduler untuk melihat log.")
         
+        # Progress of the latest scheduled run (resumed on the next start if unfinished);
+        # same journal path as ScheduledArticleGenerator.run_scheduled_generation
+        journal_path = self.load_config().get('run_journal_path', Config().RUN_JOURNAL_PATH)
+        if os.path.exists(journal_path):
+            try:
+                journal = RunJournal(journal_path)
+                try:
+                    run = journal.latest_run()
+                finally:
+                    journal.close()
+                if run:
+                    counts = run['counts']
+                    done = counts['saved'] + counts['deployed']
+                    total = sum(counts.values())
+                    status = "✅ selesai" if run['finished_at'] else "⏸️ belum selesai, dilanjutkan pada run berikutnya"
+                    st.info(f"🔄 Run terakhir #{run['id']}: {done}/{total} keyword tersimpan "
+                            f"({counts['deployed']} di-deploy, {counts['failed']} gagal) - {status}")
+            except Exception as e:
+                st.error(f"Error reading run journal: {str(e)}")
+        
         # Check generated posts
-        if os.path.exists("posts.json"):
-            st.subheader("📚 Generated Posts")
+        st.subheader("📚 Generated Posts")
+        
+        try:
+            store = get_shared_store()
+            scheduled_count = store.count(generated_by='AI_Scheduled')
             
-            try:
-                with open("posts.json", "r", encoding="utf-8") as f:
-                    posts = json.load(f)
+            if scheduled_count:
+                st.success(f"✅ {scheduled_count} artikel berhasil di-generate via scheduler")
                 
-                scheduled_posts = [p for p in posts if p.get('generated_by') == 'AI_Scheduled']
+                # Show recent posts
+                recent_posts = store.query(generated_by='AI_Scheduled', newest_first=True, limit=5)
                 
-                if scheduled_posts:
-                    st.success(f"✅ {len(scheduled_posts)} artikel berhasil di-generate via scheduler")
-                    
-                    # Show recent posts
-                    recent_posts = sorted(scheduled_posts, key=lambda x: x.get('scheduled_at', ''), reverse=True)[:5]
-                    
-                    for post in recent_posts:
-                        with st.expander(f"📄 {post['title']} - {post.get('date', 'Unknown date')}"):
-                            st.write(f"**Keyword:** {post.get('keyword', 'N/A')}")
-                            st.write(f"**Category:** {post.get('category', 'N/A')}")
-                            st.write(f"**Generated at:** {post.get('scheduled_at', 'N/A')}")
-                            st.write(f"**Excerpt:** {post['excerpt']}")
-                else:
-                    st.info("📝 Belum ada artikel yang di-generate via scheduler.")
-                    
-            except Exception as e:
-                st.error(f"Error loading posts: {str(e)}")
-        else:
-            st.info("📝 Belum ada file posts.json.")
+                for post in recent_posts:
+                    with st.expander(f"📄 {post['title']} - {post.get('date', 'Unknown date')}"):
+                        st.write(f"**Keyword:** {post.get('keyword', 'N/A')}")
+                        st.write(f"**Category:** {post.get('category', 'N/A')}")
+                        st.write(f"**Generated at:** {post.get('scheduled_at', 'N/A')}")
+                        st.write(f"**Excerpt:** {post['excerpt']}")
+            else:
+                st.info("📝 Belum ada artikel yang di-generate via scheduler.")
+                
+        except Exception as e:
+            st.error(f"Error loading posts: {str(e)}")
@@ -6,31 +6,35 @@ import time
 from datetime import datetime
 import base64
 import re
-from utils import generate_post_id, extract_excerpt_from_content, truncate_text
+import importlib.util
+from utils import generate_post_id, extract_excerpt_from_content, truncate_text, insert_images_to_content, lead_image
+from poststore import get_shared_store
 
-# Import markdown with fallback
-try:
-    import markdown
-    MARKDOWN_AVAILABLE = True
-except ImportError:
-    MARKDOWN_AVAILABLE = False
+def _modules_available(*names):
+    """Check that modules are installed without importing them"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+# Heavy modules (markdown, Gemini, Bing scraper) are only imported when first used
+MARKDOWN_AVAILABLE = _modules_available("markdown")
+if not MARKDOWN_AVAILABLE:
     st.warning("⚠️ Markdown tidak tersedia. Install: pip install markdown")
 
-# Import AI modules with error handling
-try:
-    from gemini import GeminiScraper
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+GEMINI_AVAILABLE = _modules_available("google.generativeai", "langdetect", "langcodes")
+if not GEMINI_AVAILABLE:
     st.warning("⚠️ Gemini AI tidak tersedia. Install: pip install google-generativeai langdetect langcodes")
 
-try:
-    from bingimage import BingImageScraper
-    BING_AVAILABLE = True
-except ImportError:
-    BING_AVAILABLE = False
+BING_AVAILABLE = _modules_available("bs4", "PIL")
+if not BING_AVAILABLE:
     st.warning("⚠️ Bing Image scraper tidak tersedia. Install: pip install beautifulsoup4 pillow")
 
+def render_markdown(text):
+    """Convert markdown to HTML (markdown package is imported on first use)"""
+    import markdown
+    return markdown.markdown(text)
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Blog Management Dashboard",
@@ -79,8 +83,6 @@ def init_session_state():
     """Initialize session state variables"""
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
-    if 'posts' not in st.session_state:
-        st.session_state.posts = []
     if 'cf_account_id' not in st.session_state:
         st.session_state.cf_account_id = ""
     if 'cf_api_token' not in st.session_state:
@@ -102,6 +104,32 @@ def init_session_state():
             'popup_ad': {'code': '', 'enabled': False}
         }
 
+def load_posts():
+    """All posts, read from the shared post store (the scheduler adds posts in the background)"""
+    try:
+        return get_shared_store().all()
+    except Exception as e:
+        st.error(f"Error loading posts: {str(e)}")
+        return []
+
+def save_post(post):
+    """Add a new post to the shared post store; a taken ID gets a -2, -3, ... suffix"""
+    requested_id = post['id']
+    try:
+        get_shared_store().add(post)
+    except Exception as e:
+        st.warning(f"⚠️ Post belum tersimpan ke database: {str(e)}")
+        return
+    if post['id'] != requested_id:
+        st.info(f"ℹ️ ID '{requested_id}' sudah dipakai, post disimpan dengan ID '{post['id']}'")
+
+def delete_post(post_id):
+    """Remove a post from the shared post store"""
+    try:
+        get_shared_store().delete(post_id)
+    except Exception as e:
+        st.warning(f"⚠️ Post belum terhapus dari database: {str(e)}")
+
 def get_account_name(account_id, api_token):
     """Ambil nama akun berdasarkan account_id"""
     try:
@@ -219,7 +247,7 @@ def create_subdomain_route(subdomain, domain):
         if not worker_exists:
             st.info("🚀 Worker belum ada, mendeploy worker terlebih dahulu...")
             from templates import get_modern_template
-            worker_script = get_modern_template().replace('{{POSTS_DATA}}', json.dumps(st.session_state.posts, indent=2))
+            worker_script = get_modern_template().replace('{{POSTS_DATA}}', json.dumps(load_posts(), indent=2))
             if not deploy_worker(worker_script):
                 st.error("❌ Gagal deploy worker. Periksa API Token permissions.")
                 return False
@@ -532,11 +560,11 @@ def deploy_articles_only():
 
         # Convert markdown to HTML untuk posts
         processed_posts = []
-        for post in st.session_state.posts:
+        for post in load_posts():
             processed_post = post.copy()
             if MARKDOWN_AVAILABLE:
-                processed_post['content'] = markdown.markdown(post['content'])
-                processed_post['excerpt'] = markdown.markdown(post['excerpt'])
+                processed_post['content'] = render_markdown(post['content'])
+                processed_post['excerpt'] = render_markdown(post['excerpt'])
             else:
                 processed_post['content'] = post['content'].replace('\n', '<br>')
                 processed_post['excerpt'] = post['excerpt'].replace('\n', '<br>')
@@ -591,11 +619,11 @@ def deploy_template_only():
                 existing_posts = json.loads(posts_str)
             except json.JSONDecodeError:
                 st.warning("⚠️ Tidak dapat membaca artikel existing. Akan menggunakan artikel dari dashboard.")
-                existing_posts = st.session_state.posts
+                existing_posts = load_posts()
 
-        # Jika tidak ada posts di script, gunakan dari session state
+        # Jika tidak ada posts di script, gunakan dari post store
         if not existing_posts:
-            existing_posts = st.session_state.posts
+            existing_posts = load_posts()
 
         # Generate script baru dengan template terbaru tapi posts lama
         from templates import (get_modern_template, get_magazine_template, get_corporate_template,
@@ -632,21 +660,22 @@ def deploy_template_only():
         return False
 
 def generate_worker_script():
-    """Generate worker script dengan posts dan ads dari session state"""
+    """Generate worker script dengan posts dari post store dan ads dari session state"""
     from templates import (get_modern_template, get_magazine_template, get_corporate_template,
                           get_business_template, get_tech_template, get_minimal_template)
 
     # Convert markdown to HTML
-    for post in st.session_state.posts:
+    posts = load_posts()
+    for post in posts:
         if MARKDOWN_AVAILABLE:
-            post['content'] = markdown.markdown(post['content'])
-            post['excerpt'] = markdown.markdown(post['excerpt'])
+            post['content'] = render_markdown(post['content'])
+            post['excerpt'] = render_markdown(post['excerpt'])
         else:
             # Simple fallback - replace line breaks
             post['content'] = post['content'].replace('\n', '<br>')
             post['excerpt'] = post['excerpt'].replace('\n', '<br>')
 
-    posts_json = json.dumps(st.session_state.posts, indent=2)
+    posts_json = json.dumps(posts, indent=2)
     ads_json = json.dumps(st.session_state.ads_config, indent=2)
 
     # Get selected template
@@ -856,24 +885,17 @@ def manage_posts():
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        # Get all unique categories
-        all_categories = list(set([post.get('category', 'Tanpa Kategori') for post in st.session_state.posts]))
+        # Unique categories and tags come from the post store indexes
+        store = get_shared_store()
         selected_category = st.selectbox(
             "Filter berdasarkan Kategori:",
-            options=["Semua Kategori"] + sorted(all_categories)
+            options=["Semua Kategori"] + store.categories()
         )
 
     with col2:
-        # Get all unique tags
-        all_tags = []
-        for post in st.session_state.posts:
-            if post.get('tags'):
-                all_tags.extend(post['tags'])
-        unique_tags = list(set(all_tags))
-
         selected_tag = st.selectbox(
             "Filter berdasarkan Tag:",
-            options=["Semua Tags"] + sorted(unique_tags)
+            options=["Semua Tags"] + store.tags()
         )
 
     with col3:
@@ -883,19 +905,14 @@ def manage_posts():
         )
 
     # Apply filters
-    filtered_posts = st.session_state.posts.copy()
-
-    if selected_category != "Semua Kategori":
-        filtered_posts = [p for p in filtered_posts if p.get('category') == selected_category]
-
-    if selected_tag != "Semua Tags":
-        filtered_posts = [p for p in filtered_posts if p.get('tags') and selected_tag in p['tags']]
-
-    if search_query:
-        filtered_posts = [p for p in filtered_posts if search_query.lower() in p['title'].lower()]
+    filtered_posts = store.query(
+        category=selected_category if selected_category != "Semua Kategori" else None,
+        tag=selected_tag if selected_tag != "Semua Tags" else None,
+        title_contains=search_query or None
+    )
 
     # Show stats
-    st.info(f"📊 Menampilkan {len(filtered_posts)} dari {len(st.session_state.posts)} total postingan")
+    st.info(f"📊 Menampilkan {len(filtered_posts)} dari {store.count()} total postingan")
 
     # Daftar posts yang ada
     st.subheader("📚 Daftar Postingan")
@@ -923,7 +940,7 @@ def manage_posts():
                 col1, col2, col3 = st.columns([1, 1, 3])
                 with col1:
                     if st.button(f"🗑️ Hapus", key=f"delete_{i}"):
-                        st.session_state.posts.pop(i)
+                        delete_post(post['id'])
                         st.rerun()
                 with col2:
                     if st.button(f"👁️ Preview", key=f"preview_{i}"):
@@ -934,7 +951,7 @@ def manage_posts():
                     st.markdown("**Preview Konten:**")
                     # Convert markdown to HTML for preview
                     if MARKDOWN_AVAILABLE:
-                        html_content = markdown.markdown(post['content'])
+                        html_content = render_markdown(post['content'])
                         st.markdown(html_content, unsafe_allow_html=True)
                     else:
                         # Simple preview without markdown
@@ -1011,6 +1028,24 @@ def single_article_form():
                 placeholder="Akan di-generate otomatis jika kosong"
             )
 
+            structured_mode = st.checkbox(
+                "⚡ Mode cepat (1 request)",
+                value=True,
+                help="Judul, excerpt, tags dan artikel dibuat dalam satu request Gemini"
+            )
+
+            stream_mode = st.checkbox(
+                "📡 Tampilkan proses menulis (streaming)",
+                value=False,
+                help="Artikel ditampilkan langsung selama ditulis oleh Gemini (mengabaikan mode cepat)"
+            )
+
+            sectioned_mode = st.checkbox(
+                "🧩 Tulis per bagian secara paralel",
+                value=False,
+                help="Buat outline dulu, lalu semua bagian artikel ditulis bersamaan dengan beberapa API key (lebih cepat untuk artikel panjang)"
+            )
+
         generate_btn = st.form_submit_button("🚀 Generate Post", use_container_width=True)
 
         if generate_btn:
@@ -1018,7 +1053,7 @@ def single_article_form():
                 generate_ai_post(keyword, language, author, category, writing_style, include_images,
                                max_images if include_images else 0,
                                image_keyword if include_images else "",
-                               custom_post_id)
+                               custom_post_id, structured_mode, stream_mode, sectioned_mode)
             else:
                 st.error("❌ Keyword/topik harus diisi!")
 
@@ -1072,12 +1107,26 @@ def bulk_articles_form():
             if bulk_include_images:
                 bulk_max_images = st.slider("Jumlah Gambar per artikel:", 1, 3, 1, key="bulk_max_images")
 
+            bulk_structured = st.checkbox(
+                "⚡ Mode cepat (1 request)",
+                value=True,
+                help="Judul, excerpt, tags dan artikel dibuat dalam satu request Gemini",
+                key="bulk_structured"
+            )
+
+            bulk_concurrent = st.checkbox(
+                "⚡ Generate paralel",
+                value=True,
+                help="Generate beberapa artikel sekaligus dengan semua API key yang tersedia",
+                key="bulk_concurrent"
+            )
+
             delay_between_requests = st.slider(
                 "⏱️ Delay antar request (detik):",
                 min_value=1,
                 max_value=10,
                 value=3,
-                help="Jeda antar request untuk menghindari rate limiting"
+                help="Jeda antar request untuk menghindari rate limiting (hanya mode berurutan)"
             )
 
         # API Key management
@@ -1099,9 +1148,10 @@ def bulk_articles_form():
 
             if show_api_status and GEMINI_AVAILABLE:
                 try:
+                    from gemini import GeminiScraper
                     test_gemini = GeminiScraper()
                     key_info = test_gemini.get_current_key_info()
-                    st.info(f"🔑 Total API keys: {key_info['total_keys']}\n📍 Current: {key_info['key_preview']}")
+                    st.info(f"🔑 Total API keys: {key_info['total_keys']} ({key_info['available_keys']} siap dipakai)\n📍 Current: {key_info['key_preview']}")
                     test_gemini.close()
                 except:
                     st.warning("⚠️ Tidak dapat memuat API keys")
@@ -1131,31 +1181,61 @@ def bulk_articles_form():
                         bulk_include_images,
                         bulk_max_images if bulk_include_images else 0,
                         delay_between_requests,
-                        temp_api_keys
+                        temp_api_keys,
+                        bulk_concurrent,
+                        bulk_structured
                     )
             else:
                 st.error("❌ Daftar keywords harus diisi!")
 
-def generate_ai_post(keyword, language, author, category, writing_style, include_images, max_images, image_keyword, custom_post_id):
+def generate_ai_post(keyword, language, author, category, writing_style, include_images, max_images, image_keyword, custom_post_id, structured=False, stream=False, sectioned=False):
     """Generate post menggunakan AI"""
 
     progress_bar = st.progress(0)
     status_text = st.empty()
 
     try:
+        from gemini import GeminiScraper, ArticleResult
+
         # Step 1: Initialize Gemini
         status_text.text("🤖 Menginisialisasi Gemini AI...")
         progress_bar.progress(10)
 
         gemini = GeminiScraper()
+        # Regenerating a keyword must not get the cached article back
+        use_cache = not is_regeneration(keyword)
 
         # Step 2: Generate content
         status_text.text("✍️ Menghasilkan konten artikel...")
         progress_bar.progress(30)
 
-        article_content = gemini.generate_article(keyword, language, writing_style)
+        if stream:
+            # Render the article live while Gemini writes it
+            live_preview = st.empty()
+            article_content = ""
+            for chunk in gemini.generate_article_stream(keyword, language, writing_style, use_cache):
+                article_content += chunk
+                live_preview.markdown(article_content)
+                # A full article is roughly 8000 characters; move the bar between 30% and 50%
+                progress_bar.progress(min(49, 30 + int(len(article_content) / 8000 * 20)))
+            live_preview.empty()
+
+            article = ArticleResult.from_markdown(article_content, keyword) if len(article_content.strip()) > 200 else None
+
+            key_metrics = gemini.get_key_status()[gemini.current_key_index]
+            if key_metrics['streams']:
+                st.caption(f"⏱️ Token pertama {key_metrics['ttft_ms']} ms, {key_metrics['tokens_per_sec']} token/detik")
+            structured = False
+        elif sectioned:
+            article = gemini.generate_sectioned_article(keyword, language, writing_style, use_cache)
+            structured = True
+        elif structured:
+            article = gemini.generate_structured_article(keyword, language, writing_style, use_cache)
+        else:
+            article_content = gemini.generate_article(keyword, language, writing_style, use_cache)
+            article = ArticleResult.from_markdown(article_content, keyword) if article_content else None
 
-        if not article_content:
+        if not article:
             st.error("❌ Gagal menghasilkan konten artikel. Coba lagi.")
             return
 
@@ -1163,43 +1243,27 @@ def generate_ai_post(keyword, language, author, category, writing_style, include
         status_text.text("📝 Memproses konten...")
         progress_bar.progress(50)
 
-        # Extract title from content (first line or first heading)
-        lines = article_content.split('\n')
-        title = keyword  # Default title
-        content_start = 0
-
-        for i, line in enumerate(lines):
-            if line.strip():
-                # Check if it's a heading
-                if line.startswith('#'):
-                    title = line.replace('#', '').strip()
-                    content_start = i + 1
-                    break
-                elif len(line.strip()) < 100:  # Likely a title
-                    title = line.strip()
-                    content_start = i + 1
-                    break
-
-        # Get content without title
-        content = '\n'.join(lines[content_start:]).strip()
+        title = article.title
+        content = article.body
 
         # Generate post ID
         post_id = custom_post_id if custom_post_id else generate_post_id(title)
 
         # Step 4: Get images if requested
-        image_urls = []
+        images = []
         if include_images and BING_AVAILABLE:
             status_text.text("🖼️ Mencari gambar...")
             progress_bar.progress(70)
 
             try:
-                bing_scraper = BingImageScraper()
+                from bingimage import get_shared_scraper
+                # Shared scraper: keep-alive connections survive between posts
+                bing_scraper = get_shared_scraper()
                 search_query = image_keyword if image_keyword else keyword
-                image_urls = bing_scraper.get_image_urls(search_query, max_images)
-                bing_scraper.close()
+                images = bing_scraper.get_post_images(search_query, max_images)
 
-                if image_urls:
-                    st.success(f"✅ Ditemukan {len(image_urls)} gambar")
+                if images:
+                    st.success(f"✅ Ditemukan {len(images)} gambar")
                 else:
                     st.warning("⚠️ Tidak ada gambar yang ditemukan")
 
@@ -1207,21 +1271,21 @@ def generate_ai_post(keyword, language, author, category, writing_style, include
                 st.warning(f"⚠️ Error saat mencari gambar: {str(e)}")
 
         # Step 5: Insert images into content
-        if image_urls:
+        if images:
             status_text.text("🎨 Menyisipkan gambar ke konten...")
             progress_bar.progress(85)
 
-            content = insert_images_to_content(content, image_urls, keyword)
+            content = insert_images_to_content(content, images, keyword)
 
         # Step 6: Create post
         status_text.text("💾 Menyimpan post...")
         progress_bar.progress(95)
 
-        # Extract excerpt
-        excerpt = extract_excerpt_from_content(content)
+        # Extract excerpt (images were inserted, so re-extract unless the model gave one)
+        excerpt = article.excerpt if structured else extract_excerpt_from_content(content)
 
         # Generate auto tags from keyword and title
-        auto_tags = generate_auto_tags(keyword, title, category)
+        auto_tags = merge_generated_tags(article.tags, category) or generate_auto_tags(keyword, title, category)
 
         new_post = {
             "id": post_id,
@@ -1236,8 +1300,11 @@ def generate_ai_post(keyword, language, author, category, writing_style, include
             "keyword": keyword,
             "language": language
         }
+        if images:
+            # Listing cards show the small thumbnail instead of a placeholder
+            new_post["image"] = lead_image(images)
 
-        st.session_state.posts.append(new_post)
+        save_post(new_post)
 
         # Step 7: Complete
         progress_bar.progress(100)
@@ -1263,6 +1330,19 @@ def generate_ai_post(keyword, language, author, category, writing_style, include
         progress_bar.empty()
         status_text.empty()
 
+def is_regeneration(keyword):
+    """True if a post was already generated from this keyword"""
+    try:
+        return get_shared_store().count(keyword=keyword) > 0
+    except Exception:
+        return False
+
+def merge_generated_tags(tags, category):
+    """Combine model-suggested tags with the category tag (max 5)"""
+    if not tags:
+        return []
+    return list(dict.fromkeys([category.lower()] + tags))[:5]
+
 def generate_auto_tags(keyword, title, category):
     """Generate automatic tags from keyword, title, and category"""
     tags = []
@@ -1286,34 +1366,6 @@ def generate_auto_tags(keyword, title, category):
     tags = list(dict.fromkeys(tags))[:5]
     return tags
 
-def insert_images_to_content(content, image_urls, keyword):
-    """Insert images into content at strategic positions"""
-    if not image_urls:
-        return content
-
-    lines = content.split('\n')
-    new_lines = []
-    image_index = 0
-
-    # Insert first image after introduction (first paragraph)
-    paragraph_count = 0
-
-    for i, line in enumerate(lines):
-        new_lines.append(line)
-
-        # Check if this is end of a paragraph
-        if line.strip() and i < len(lines) - 1 and not lines[i + 1].strip():
-            paragraph_count += 1
-
-            # Insert image after first paragraph, then every 3 paragraphs
-            if (paragraph_count == 1 or paragraph_count % 3 == 0) and image_index < len(image_urls):
-                new_lines.append("")  # Empty line
-                new_lines.append(f'<img src="{image_urls[image_index]}" alt="{keyword}" style="width: 100%; max-width: 600px; height: auto; border-radius: 8px; margin: 1rem 0;">')
-                new_lines.append("")  # Empty line
-                image_index += 1
-
-    return '\n'.join(new_lines)
-
 def manual_post_form():
     """Form untuk membuat post manual"""
     st.subheader("✍️ Buat Post Manual")
@@ -1368,13 +1420,13 @@ def manual_post_form():
                         "category": category,
                         "tags": tags
                     }
-                    st.session_state.posts.append(new_post)
+                    save_post(new_post)
                     st.success("✅ Post berhasil ditambahkan!")
                     st.rerun()
                 else:
                     st.error("❌ Judul, ID, dan Konten wajib diisi!")
 
-def generate_bulk_articles(keywords_list, language, author, category, writing_style, include_images, max_images, delay, additional_api_keys):
+def generate_bulk_articles(keywords_list, language, author, category, writing_style, include_images, max_images, delay, additional_api_keys, concurrent=False, structured=False):
     """Generate multiple articles in bulk with API key rotation"""
 
     # Setup progress tracking
@@ -1421,61 +1473,51 @@ def generate_bulk_articles(keywords_list, language, author, category, writing_st
                 f.write('\n'.join(all_keys))
 
         # Initialize Gemini scraper
+        from gemini import GeminiScraper, ArticleResult
         gemini = GeminiScraper()
 
-        for i, keyword in enumerate(keywords_list):
-            current_progress = (i / total_keywords)
-            progress_bar.progress(current_progress)
-
-            with current_status:
-                st.text(f"🔄 Processing {i+1}/{total_keywords}: {keyword[:50]}...")
-
-            # Show current API key info
+        if concurrent:
             key_info = gemini.get_current_key_info()
             with api_status:
-                st.text(f"🔑 Using API key {key_info['current_index'] + 1}/{key_info['total_keys']} ({key_info['key_preview']})")
+                st.text(f"🔑 Generate paralel dengan {key_info['total_keys']} API key")
+            results = gemini.generate_articles_concurrently(
+                keywords_list, language, writing_style, structured=structured,
+                uncached=[k for k in keywords_list if is_regeneration(k)]
+            )
+        else:
+            results = _generate_bulk_sequentially(gemini, keywords_list, language, writing_style, delay, current_status, api_status, structured)
+
+        for i, (keyword, article) in enumerate(results):
+            with current_status:
+                st.text(f"🔄 Selesai {i+1}/{total_keywords}: {keyword[:50]}...")
 
             try:
-                # Generate article
-                article_content = gemini.generate_article(keyword, language, writing_style)
-
-                if article_content:
-                    # Process content similar to single article generation
-                    lines = article_content.split('\n')
-                    title = keyword  # Default title
-                    content_start = 0
-
-                    for j, line in enumerate(lines):
-                        if line.strip():
-                            if line.startswith('#'):
-                                title = line.replace('#', '').strip()
-                                content_start = j + 1
-                                break
-                            elif len(line.strip()) < 100:
-                                title = line.strip()
-                                content_start = j + 1
-                                break
-
-                    content = '\n'.join(lines[content_start:]).strip()
+                if article:
+                    if not isinstance(article, ArticleResult):
+                        article = ArticleResult.from_markdown(article, keyword)
+
+                    title = article.title
+                    content = article.body
                     post_id = generate_post_id(title)
 
                     # Handle images if requested
-                    image_urls = []
+                    images = []
                     if include_images and BING_AVAILABLE:
                         try:
-                            bing_scraper = BingImageScraper()
-                            image_urls = bing_scraper.get_image_urls(keyword, max_images)
-                            bing_scraper.close()
+                            from bingimage import get_shared_scraper
+                            # One pooled scraper for the whole run instead of new connections per keyword
+                            bing_scraper = get_shared_scraper()
+                            images = bing_scraper.get_post_images(keyword, max_images)
 
-                            if image_urls:
-                                content = insert_images_to_content(content, image_urls, keyword)
+                            if images:
+                                content = insert_images_to_content(content, images, keyword)
                         except Exception as img_error:
                             with results_container:
                                 st.warning(f"⚠️ {keyword}: Gagal menambah gambar - {str(img_error)}")
 
                     # Create post
-                    excerpt = extract_excerpt_from_content(content)
-                    auto_tags = generate_auto_tags(keyword, title, category)
+                    excerpt = article.excerpt if structured else extract_excerpt_from_content(content)
+                    auto_tags = merge_generated_tags(article.tags, category) or generate_auto_tags(keyword, title, category)
 
                     new_post = {
                         "id": post_id,
@@ -1490,8 +1532,10 @@ def generate_bulk_articles(keywords_list, language, author, category, writing_st
                         "keyword": keyword,
                         "language": language
                     }
+                    if images:
+                        new_post["image"] = lead_image(images)
 
-                    st.session_state.posts.append(new_post)
+                    save_post(new_post)
                     successful_posts.append(keyword)
 
                     with results_container:
@@ -1507,10 +1551,7 @@ def generate_bulk_articles(keywords_list, language, author, category, writing_st
                 with results_container:
                     st.error(f"❌ {i+1}/{total_keywords}: Error - {keyword}: {str(e)}")
 
-            # Delay between requests
-            if i < total_keywords - 1:  # Don't delay after last request
-                import time
-                time.sleep(delay)
+            progress_bar.progress((i + 1) / total_keywords)
 
         # Final progress
         progress_bar.progress(1.0)
@@ -1532,6 +1573,17 @@ def generate_bulk_articles(keywords_list, language, author, category, writing_st
             with col3:
                 st.metric("📈 Success Rate", f"{(len(successful_posts)/total_keywords)*100:.1f}%")
 
+            cache_stats = gemini.get_cache_stats()
+            if cache_stats:
+                st.caption(f"💾 Cache respons Gemini: {cache_stats['hits']} hit, {cache_stats['misses']} miss ({cache_stats['entries']} entri)")
+
+            if include_images and BING_AVAILABLE:
+                from bingimage import get_shared_scraper
+                connection_stats = get_shared_scraper().get_connection_stats()
+                if connection_stats['requests']:
+                    st.caption(f"🔌 Koneksi gambar: {connection_stats['requests']} request lewat {connection_stats['connections']} koneksi "
+                               f"({connection_stats['reuse_rate'] * 100:.0f}% dipakai ulang, {connection_stats['hosts']} host)")
+
             if failed_keywords:
                 st.error("❌ Keywords yang gagal:")
                 for keyword in failed_keywords:
@@ -1564,6 +1616,29 @@ def generate_bulk_articles(keywords_list, language, author, category, writing_st
             except:
                 pass
 
+def _generate_bulk_sequentially(gemini, keywords_list, language, writing_style, delay, current_status, api_status, structured=False):
+    """Generate bulk articles one by one, yielding (keyword, article) pairs"""
+    total_keywords = len(keywords_list)
+
+    for i, keyword in enumerate(keywords_list):
+        with current_status:
+            st.text(f"🔄 Processing {i+1}/{total_keywords}: {keyword[:50]}...")
+
+        # Show current API key info
+        key_info = gemini.get_current_key_info()
+        with api_status:
+            st.text(f"🔑 Using API key {key_info['current_index'] + 1}/{key_info['total_keys']} ({key_info['key_preview']})")
+
+        use_cache = not is_regeneration(keyword)
+        if structured:
+            yield keyword, gemini.generate_structured_article(keyword, language, writing_style, use_cache)
+        else:
+            yield keyword, gemini.generate_article(keyword, language, writing_style, use_cache)
+
+        # Delay between requests
+        if i < total_keywords - 1:  # Don't delay after last request
+            time.sleep(delay)
+
 def template_page():
     """Halaman untuk memilih template"""
     from templates import get_template_config
@@ -1767,6 +1842,9 @@ def deploy_page():
     st.info(f"Worker akan di-deploy ke: **https://{st.session_state.worker_subdomain}**")
     st.info(f"🎨 Template yang digunakan: **{template_name}**")
 
+    # Dibaca ulang dari post store: scheduler bisa menambah post kapan saja
+    posts = load_posts()
+
     # Tab untuk memisahkan deploy
     tab1, tab2, tab3 = st.tabs(["🚀 Deploy Lengkap", "📝 Deploy Artikel Saja", "🎨 Deploy Template Saja"])
 
@@ -1774,9 +1852,9 @@ def deploy_page():
         st.subheader("🚀 Deploy Lengkap (Template + Artikel)")
         st.write("Deploy template dan semua artikel sekaligus.")
 
-        if st.session_state.posts:
+        if posts:
             st.subheader("📋 Preview Posts")
-            for post in st.session_state.posts:
+            for post in posts:
                 st.markdown(f"• **{post['title']}** (ID: {post['id']})")
 
             st.markdown("---")
@@ -1798,11 +1876,11 @@ def deploy_page():
         st.subheader("📝 Deploy Artikel Saja")
         st.write("Update hanya data artikel tanpa mengubah template yang sudah ada.")
 
-        if st.session_state.posts:
+        if posts:
             st.info("💡 Ini akan mengupdate hanya data artikel di worker yang sudah ada. Template tetap menggunakan yang sebelumnya.")
 
             st.subheader("📋 Artikel yang akan di-update:")
-            for post in st.session_state.posts:
+            for post in posts:
                 st.markdown(f"• **{post['title']}** (ID: {post['id']})")
 
             if st.button("📝 Update Artikel", type="secondary", use_container_width=True):
@@ -1972,8 +2050,9 @@ def settings_page():
 
     with col1:
         if st.button("📥 Export Posts"):
-            if st.session_state.posts:
-                posts_json = json.dumps(st.session_state.posts, indent=2)
+            posts = load_posts()
+            if posts:
+                posts_json = json.dumps(posts, indent=2)
                 st.download_button(
                     label="💾 Download posts.json",
                     data=posts_json,
@@ -1988,7 +2067,7 @@ def settings_page():
         if uploaded_file:
             try:
                 imported_posts = json.load(uploaded_file)
-                st.session_state.posts = imported_posts
+                get_shared_store().replace_all(imported_posts)
                 st.success("✅ Posts berhasil di-import!")
                 st.rerun()
             except:
@@ -47,6 +47,15 @@ function getAdCode(adType) {
   return adsConfig[adType].code;
 }
 
+// Listing card thumbnail: the small image saved in post.image, never the full-size one
+function postThumbnail(post) {
+  if (!post.image || !post.image.thumbnail) {
+    return '';
+  }
+  const size = post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : '';
+  return `<div class="post-thumbnail"><a href="/${post.id}"><img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${size}></a></div>`;
+}
+
 const BLOG_CONFIG = {
   title: "Business Solutions Blog",
   subtitle: "Expert Insights & Business Growth Strategies",
@@ -202,6 +211,7 @@ function getHomePage(currentDomain) {
       <div class="featured-grid">
         ${featuredPosts.map(post => `
           <article class="featured-card">
+            ${postThumbnail(post)}
             <h3><a href="/${post.id}">${post.title}</a></h3>
             <div class="post-meta">
               <time datetime="${post.date}">📅 ${post.date}</time>
@@ -220,6 +230,7 @@ function getHomePage(currentDomain) {
       <div class="articles-grid">
         ${recentPosts.map(post => `
           <article class="article-card">
+            ${postThumbnail(post)}
             <h4><a href="/${post.id}">${post.title}</a></h4>
             <div class="article-meta">
               <time datetime="${post.date}">${post.date}</time>
@@ -310,6 +321,7 @@ function getCategoryPage(category, currentDomain) {
     <div class="posts-grid">
       ${categoryPosts.map(post => `
         <article class="post-card">
+          ${postThumbnail(post)}
           <h3><a href="/${post.id}">${post.title}</a></h3>
           <div class="post-meta">
             <time datetime="${post.date}">📅 ${post.date}</time>
@@ -352,6 +364,7 @@ function getTagPage(tag, currentDomain) {
     <div class="posts-grid">
       ${tagPosts.map(post => `
         <article class="post-card">
+          ${postThumbnail(post)}
           <h3><a href="/${post.id}">${post.title}</a></h3>
           <div class="post-meta">
             <time datetime="${post.date}">📅 ${post.date}</time>
@@ -657,6 +670,7 @@ const HTML_TEMPLATE = `
         grid-template-columns: 1fr;
       }
     }
+    .post-thumbnail img { display: block; width: 100%; height: auto; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 8px; margin-bottom: 1rem; }
   </style>
 </head>
 <body>
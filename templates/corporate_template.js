@@ -46,6 +46,15 @@ if (!adsConfig || !adsConfig[adType] || !adsConfig[adType].enabled || !adsConfig
 return adsConfig[adType].code;
 }
 
+// Listing card thumbnail: the small image saved in post.image, never the full-size one
+function postThumbnail(post) {
+if (!post.image || !post.image.thumbnail) {
+  return '';
+}
+const size = post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : '';
+return `<div class="post-thumbnail"><a href="/${post.id}"><img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${size}></a></div>`;
+}
+
 const BLOG_CONFIG = {
 title: "Corporate Blog",
 subtitle: "Insights & Industry Knowledge",
@@ -190,6 +199,7 @@ const content = `
     <div class="posts-grid">
       ${recentPosts.map(post => `
         <article class="post-card">
+          ${postThumbnail(post)}
           <div class="post-header">
             <h3><a href="/${post.id}">${post.title}</a></h3>
             <div class="post-meta">
@@ -282,6 +292,7 @@ const content = `
   <div class="posts-grid">
     ${categoryPosts.map(post => `
       <article class="post-card">
+        ${postThumbnail(post)}
         <h3><a href="/${post.id}">${post.title}</a></h3>
         <div class="post-meta">
           <span>📅 ${post.date}</span>
@@ -325,6 +336,7 @@ const content = `
   <div class="posts-grid">
     ${tagPosts.map(post => `
       <article class="post-card">
+        ${postThumbnail(post)}
         <h3><a href="/${post.id}">${post.title}</a></h3>
         <div class="post-meta">
           <span>📅 ${post.date}</span>
@@ -671,6 +683,7 @@ const HTML_TEMPLATE = `
               grid-template-columns: 1fr;
           }
       }
+    .post-thumbnail img { display: block; width: 100%; height: auto; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 8px; margin-bottom: 1rem; }
   </style>
 </head>
 <body>
@@ -42,6 +42,15 @@ if (!adsConfig || !adsConfig[adType] || !adsConfig[adType].enabled || !adsConfig
 return adsConfig[adType].code;
 }
 
+// Listing card thumbnail: the small image saved in post.image, never the full-size one
+function postThumbnail(post) {
+if (!post.image || !post.image.thumbnail) {
+  return '';
+}
+const size = post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : '';
+return `<div class="post-thumbnail"><a href="/${post.id}"><img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${size}></a></div>`;
+}
+
 const BLOG_CONFIG = {
 title: "News Magazine",
 subtitle: "Portal Berita dan Informasi Terkini",
@@ -184,6 +193,7 @@ const content = `
   <div class="featured-section">
     ${latestPost ? `
       <div class="featured-post">
+        ${postThumbnail(latestPost)}
         <h2><a href="/${latestPost.id}">${latestPost.title}</a></h2>
         <div class="post-meta">
           <span>&#128197; ${latestPost.date}</span>
@@ -205,6 +215,7 @@ const content = `
   <div class="posts-grid">
     ${otherPosts.map(post => `
       <article class="post-card">
+        ${postThumbnail(post)}
         <h3><a href="/${post.id}">${post.title}</a></h3>
         <div class="post-meta">
           <span>&#128197; ${post.date}</span>
@@ -276,6 +287,7 @@ const content = `
   <div class="posts-grid">
     ${categoryPosts.map(post => `
       <article class="post-card">
+        ${postThumbnail(post)}
         <h3><a href="/${post.id}">${post.title}</a></h3>
         <div class="post-meta">
           <span>&#128197; ${post.date}</span>
@@ -319,6 +331,7 @@ const content = `
   <div class="posts-grid">
     ${tagPosts.map(post => `
       <article class="post-card">
+        ${postThumbnail(post)}
         <h3><a href="/${post.id}">${post.title}</a></h3>
         <div class="post-meta">
           <span>&#128197; ${post.date}</span>
@@ -590,6 +603,7 @@ const HTML_TEMPLATE = `
               font-size: 1.5rem;
           }
       }
+    .post-thumbnail img { display: block; width: 100%; height: auto; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 8px; margin-bottom: 1rem; }
   </style>
 </head>
 <body>
@@ -46,6 +46,15 @@ function getAdCode(adType) {
   return adsConfig[adType].code;
 }
 
+// Listing card thumbnail: the small image saved in post.image, never the full-size one
+function postThumbnail(post) {
+  if (!post.image || !post.image.thumbnail) {
+    return '';
+  }
+  const size = post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : '';
+  return `<div class="post-thumbnail"><a href="/${post.id}"><img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${size}></a></div>`;
+}
+
 const BLOG_CONFIG = {
   title: "Minimal Portfolio",
   subtitle: "Clean & Simple Design Blog",
@@ -198,6 +207,7 @@ function getHomePage(currentDomain) {
       <div class="posts-list">
         ${recentPosts.map(post => `
           <article class="post-item" itemscope itemtype="http://schema.org/BlogPosting">
+            ${postThumbnail(post)}
             <header class="post-header">
               <h3 itemprop="headline"><a href="/${post.id}">${post.title}</a></h3>
               <div class="post-meta">
@@ -315,6 +325,7 @@ function getCategoryPage(category, currentDomain) {
     <div class="archive-posts">
       ${categoryPosts.map(post => `
         <article class="archive-item">
+          ${postThumbnail(post)}
           <h2><a href="/${post.id}">${post.title}</a></h2>
           <div class="archive-meta">
             <time datetime="${post.date}">${formatDate(post.date)}</time>
@@ -361,6 +372,7 @@ function getTagPage(tag, currentDomain) {
     <div class="archive-posts">
       ${tagPosts.map(post => `
         <article class="archive-item">
+          ${postThumbnail(post)}
           <h2><a href="/${post.id}">${post.title}</a></h2>
           <div class="archive-meta">
             <time datetime="${post.date}">${formatDate(post.date)}</time>
@@ -933,6 +945,7 @@ const HTML_TEMPLATE = `
         align-items: center;
       }
     }
+    .post-thumbnail img { display: block; width: 100%; height: auto; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 8px; margin-bottom: 1rem; }
   </style>
 </head>
 <body>
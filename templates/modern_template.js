@@ -44,9 +44,19 @@ function getAdCode(adType) {
 if (!adsConfig || !adsConfig[adType] || !adsConfig[adType].enabled || !adsConfig[adType].code) {
   return '';
 }
+
 return adsConfig[adType].code;
 }
 
+// Listing card thumbnail: the small image saved in post.image, never the full-size one
+function postThumbnail(post) {
+if (!post.image || !post.image.thumbnail) {
+  return '';
+}
+const size = post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : '';
+return `<div class="post-thumbnail"><a href="/${post.id}"><img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${size}></a></div>`;
+}
+
 const BLOG_CONFIG = {
 title: "My Modern Blog",
 subtitle: "Berbagi pengetahuan dan pengalaman",
@@ -160,6 +170,7 @@ function getHomePage(currentDomain) {
 const domain = new URL(currentDomain).hostname || BLOG_CONFIG.domain;
 const postsHtml = posts.map(post => `
   <article class="post-card">
+    ${postThumbnail(post)}
     <h2 class="post-title">
       <a href="/${post.id}">${post.title}</a>
     </h2>
@@ -308,6 +319,7 @@ const categoryPosts = posts.filter(post =>
 
 const postsHtml = categoryPosts.map(post => `
   <article class="post-card">
+    ${postThumbnail(post)}
     <h2 class="post-title">
       <a href="/${post.id}">${post.title}</a>
     </h2>
@@ -363,6 +375,7 @@ const tagPosts = posts.filter(post =>
 
 const postsHtml = tagPosts.map(post => `
   <article class="post-card">
+    ${postThumbnail(post)}
     <h2 class="post-title">
       <a href="/${post.id}">${post.title}</a>
     </h2>
@@ -750,6 +763,7 @@ const HTML_TEMPLATE = `
               padding: 0 15px;
           }
       }
+    .post-thumbnail img { display: block; width: 100%; height: auto; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 8px; margin-bottom: 1rem; }
   </style>
 </head>
 <body>
@@ -46,6 +46,15 @@ function getAdCode(adType) {
   return adsConfig[adType].code;
 }
 
+// Listing card thumbnail: the small image saved in post.image, never the full-size one
+function postThumbnail(post) {
+  if (!post.image || !post.image.thumbnail) {
+    return '';
+  }
+  const size = post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : '';
+  return `<div class="post-thumbnail"><a href="/${post.id}"><img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${size}></a></div>`;
+}
+
 const BLOG_CONFIG = {
   title: "TechInsights Blog",
   subtitle: "Coding, Innovation & Technology Trends",
@@ -207,6 +216,7 @@ function getHomePage(currentDomain) {
       <div class="featured-grid">
         ${featuredPosts.map(post => `
           <article class="featured-post">
+            ${postThumbnail(post)}
             <div class="post-header">
               <h3><a href="/${post.id}">${post.title}</a></h3>
               <div class="post-meta">
@@ -233,6 +243,7 @@ function getHomePage(currentDomain) {
       <div class="posts-grid">
         ${recentPosts.map(post => `
           <article class="post-card">
+            ${postThumbnail(post)}
             <h4><a href="/${post.id}">${post.title}</a></h4>
             <div class="card-meta">
               <time datetime="${post.date}">${post.date}</time>
@@ -359,6 +370,7 @@ function getCategoryPage(category, currentDomain) {
     <div class="category-posts">
       ${categoryPosts.map(post => `
         <article class="category-post">
+          ${postThumbnail(post)}
           <h3><a href="/${post.id}">${post.title}</a></h3>
           <div class="post-meta">
             <time datetime="${post.date}">📅 ${post.date}</time>
@@ -409,6 +421,7 @@ function getTagPage(tag, currentDomain) {
     <div class="tag-posts">
       ${tagPosts.map(post => `
         <article class="tag-post">
+          ${postThumbnail(post)}
           <h3><a href="/${post.id}">${post.title}</a></h3>
           <div class="post-meta">
             <time datetime="${post.date}">📅 ${post.date}</time>
@@ -942,6 +955,7 @@ const HTML_TEMPLATE = `
         gap: 1rem;
       }
     }
+    .post-thumbnail img { display: block; width: 100%; height: auto; aspect-ratio: 16 / 9; object-fit: cover; border-radius: 8px; margin-bottom: 1rem; }
   </style>
 </head>
 <body>
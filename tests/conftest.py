@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in tmp_path with a fresh shared post store (Config paths are relative to the cwd)."""
+    import poststore
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(poststore, "_shared_store", None)
+    yield tmp_path
+    if poststore._shared_store is not None:
+        poststore._shared_store.close()
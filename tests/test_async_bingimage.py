@@ -0,0 +1,26 @@
+import asyncio
+import os
+
+from async_bingimage import AsyncBingImageScraper
+from fake_backends import FakeAsyncBingBackend
+
+
+def test_download_images_without_store_leaves_only_picked_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def run():
+        backend = FakeAsyncBingBackend(time_scale=0, image_size=(400, 300), distinct_images=50, seed=1)
+        scraper = AsyncBingImageScraper(backend=backend, cache=False, store=False)
+        scraper.image_processor.max_workers = 1
+        try:
+            return scraper, await scraper.download_images("kopi susu", max_images=2)
+        finally:
+            await scraper.close()
+
+    scraper, assets = asyncio.run(run())
+
+    assert 0 < len(assets) <= 2
+    picked = {os.path.splitext(os.path.basename(asset["path"]))[0] for asset in assets}
+    for name in os.listdir(tmp_path / "images"):
+        # Primary file "kopi_susu_1.jpg" or variant "kopi_susu_1-640w.webp"
+        assert os.path.splitext(name)[0].split("-")[0] in picked
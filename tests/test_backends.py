@@ -0,0 +1,60 @@
+import sys
+import types
+
+import pytest
+
+from backends import GenaiBackend
+
+
+class FakeClient:
+    def __init__(self, client_options=None):
+        self.client_options = client_options
+
+
+class FakeModel:
+    """google-generativeai 0.8 GenerativeModel: uses _client when it is set."""
+
+    def __init__(self, model_name, generation_config=None):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self._client = None
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    google = types.ModuleType("google")
+    google.__path__ = []
+    ai = types.ModuleType("google.ai")
+    ai.__path__ = []
+    glm = types.ModuleType("google.ai.generativelanguage")
+    glm.GenerativeServiceClient = FakeClient
+    genai = types.ModuleType("google.generativeai")
+    genai.GenerativeModel = FakeModel
+    for name, module in [("google", google), ("google.ai", ai),
+                         ("google.ai.generativelanguage", glm), ("google.generativeai", genai)]:
+        monkeypatch.setitem(sys.modules, name, module)
+    return genai
+
+
+def test_each_api_key_gets_its_own_client(fake_genai):
+    backend = GenaiBackend("gemini-1.5-flash")
+    config = {"temperature": 0.9}
+
+    first = backend.get_model("key-a", config)
+    second = backend.get_model("key-b", config)
+
+    assert first._client is not second._client
+    assert first._client.client_options == {"api_key": "key-a"}
+    assert second._client.client_options == {"api_key": "key-b"}
+    assert backend.get_model("key-a", dict(config)) is first
+    assert backend.get_model("key-a", {"temperature": 0.1}) is not first
+
+
+def test_sdk_without_per_model_client_is_rejected(fake_genai):
+    class NewModel:
+        def __init__(self, model_name, generation_config=None):
+            pass
+
+    fake_genai.GenerativeModel = NewModel
+    with pytest.raises(RuntimeError, match="google-generativeai"):
+        GenaiBackend("gemini-1.5-flash").get_model("key-a")
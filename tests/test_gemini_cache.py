@@ -0,0 +1,80 @@
+from backends import GeminiBackend
+from cache import DiskCache
+from gemini import GeminiScraper
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class CountingBackend(GeminiBackend):
+    """Answers "article 1", "article 2", ... so each real call is distinguishable."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, api_key, prompt, generation_config, stream=False):
+        self.calls += 1
+        return _Response(f"article {self.calls}")
+
+
+def make_scraper(tmp_path):
+    backend = CountingBackend()
+    cache = DiskCache(str(tmp_path / "cache.db"))
+    return GeminiScraper(api_keys=["a"], backend=backend, cache=cache), backend
+
+
+def test_repeated_prompt_is_served_from_cache(tmp_path):
+    scraper, backend = make_scraper(tmp_path)
+    assert scraper._call_model("Tulis artikel kopi", 100) == "article 1"
+    assert scraper._call_model("Tulis artikel kopi", 100) == "article 1"
+    assert backend.calls == 1
+
+
+def test_regeneration_bypasses_cache_and_refreshes_it(tmp_path):
+    scraper, backend = make_scraper(tmp_path)
+    scraper._call_model("Tulis artikel kopi", 100)
+    assert scraper._call_model("Tulis artikel kopi", 100, use_cache=False) == "article 2"
+    assert backend.calls == 2
+    # The regenerated article replaces the cached one
+    assert scraper._call_model("Tulis artikel kopi", 100) == "article 2"
+    assert backend.calls == 2
+
+
+def test_batch_concurrency_limit_is_restored_afterwards(tmp_path):
+    scraper, backend = make_scraper(tmp_path)
+    default_limit = scraper.key_pool.max_in_flight
+    seen = []
+    generate = backend.generate_content
+
+    def recording_generate(*args, **kwargs):
+        seen.append(scraper.key_pool.max_in_flight)
+        return generate(*args, **kwargs)
+
+    backend.generate_content = recording_generate
+    results = list(scraper.generate_articles_concurrently(["kopi", "teh"], max_concurrency_per_key=5))
+    assert len(results) == 2 and seen and set(seen) == {5}
+    assert scraper.key_pool.max_in_flight == default_limit
+
+    # Also when the consumer stops early
+    batch = scraper.generate_articles_concurrently(["kopi", "teh", "susu"], max_concurrency_per_key=7)
+    next(batch)
+    batch.close()
+    assert scraper.key_pool.max_in_flight == default_limit
+
+
+def test_abandoned_stream_releases_key_as_cancelled(tmp_path):
+    scraper, backend = make_scraper(tmp_path)
+    backend.generate_content = lambda api_key, prompt, generation_config, stream=False: iter(
+        [_Response("Kopi "), _Response("susu "), _Response("enak.")]
+    )
+
+    stream = scraper._stream_model("Tulis artikel kopi", 100)
+    assert next(stream) == "Kopi "
+    stream.close()
+
+    status = scraper.key_pool.status()[0]
+    assert (status['successes'], status['failures'], status['cancelled'], status['in_flight']) == (0, 0, 1, 0)
+    assert status['health'] == 1.0
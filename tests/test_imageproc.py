@@ -0,0 +1,51 @@
+import io
+import os
+import threading
+
+import pytest
+
+from imageproc import FORMAT_EXTENSIONS, ImageProcessor
+
+
+def test_concurrent_get_pool_creates_one_spawn_pool():
+    processor = ImageProcessor(max_workers=2)
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def get():
+        barrier.wait()
+        pools.append(processor._get_pool())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len({id(pool) for pool in pools}) == 1
+        assert pools[0]._mp_context.get_start_method() == "spawn"
+    finally:
+        processor.close()
+    assert processor._pool is None
+
+
+def _jpeg(size=(800, 600)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 100, 50)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("formats, primary", [
+    (("webp", "jpeg"), "kopi_1.jpg"),
+    (("webp",), "kopi_1.webp"),
+])
+def test_primary_file_is_named_after_its_format(tmp_path, formats, primary):
+    processor = ImageProcessor(widths=(320, 640), formats=formats, max_workers=1)
+    variants = processor.save(processor.process(_jpeg()), str(tmp_path / "kopi_1.jpg"))
+
+    paths = {os.path.basename(v["path"]): v["format"] for v in variants}
+    assert primary in paths
+    for name, fmt in paths.items():
+        assert name.endswith(FORMAT_EXTENSIONS[fmt])
@@ -0,0 +1,27 @@
+import os
+
+from imagestore import ImageStore
+
+
+def add_asset(store, phash):
+    path = store.path_for(phash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"jpeg")
+    return store.add(phash, [{"width": 640, "height": 480, "format": "jpeg", "bytes": 4, "path": path}],
+                     source_url=f"https://example.com/{phash}.jpg")
+
+
+def test_find_similar_falls_back_to_next_closest_when_files_are_missing(tmp_path):
+    store = ImageStore(root=str(tmp_path / "store"), match_distance=4)
+    closest = add_asset(store, "ff00ff00ff00ff01")
+    fallback = add_asset(store, "ff00ff00ff00ff07")
+    os.remove(closest["path"])
+
+    assert store.find_similar("ff00ff00ff00ff00")["phash"] == fallback["phash"]
+    # The stale row is pruned, not just skipped
+    assert store.stats()["assets"] == 1 and store.lookup_url("https://example.com/ff00ff00ff00ff01.jpg") is None
+
+    os.remove(fallback["path"])
+    assert store.find_similar("ff00ff00ff00ff00") is None
+    store.close()
@@ -0,0 +1,80 @@
+import pytest
+
+from fake_backends import FakeAPIError
+from keypool import CircuitBreaker, KeyPool, NoKeyAvailableError, is_rate_limit_error
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+@pytest.mark.parametrize("error", [
+    FakeAPIError(429, "Resource has been exhausted (e.g. check quota)."),
+    ResourceExhausted("quota"),
+    Exception("Quota exceeded for metric generate_content_requests"),
+    Exception("Rate limit reached, retry in 20s"),
+])
+def test_rate_limit_errors(error):
+    assert is_rate_limit_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    Exception("400 models/gemini-x is not supported for generateContent"),
+    Exception("could not generate"),
+    FakeAPIError(403, "API key not valid"),
+    FakeAPIError(500, "An internal error has occurred."),
+])
+def test_other_errors_are_not_rate_limits(error):
+    assert not is_rate_limit_error(error)
+
+
+def test_breaker_opens_after_threshold_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=10)
+    breaker.record_failure(now=0)
+    assert breaker.allow(now=0)
+    breaker.record_failure(now=0)
+    assert breaker.state(now=5) == CircuitBreaker.OPEN
+    assert not breaker.allow(now=5)
+
+    # One trial request after the open period; a second one waits for its outcome
+    assert breaker.allow(now=10)
+    breaker.on_send(now=10)
+    assert not breaker.allow(now=10)
+    breaker.record_success()
+    assert breaker.state(now=10) == CircuitBreaker.CLOSED
+
+
+def test_pool_skips_key_with_open_breaker():
+    pool = KeyPool(["a", "b"], requests_per_minute=1000, failure_threshold=1, breaker_open_seconds=60)
+    first = pool.acquire()
+    pool.release(first, error=FakeAPIError(500, "internal"))
+    for _ in range(3):
+        index = pool.acquire(timeout=0.1)
+        assert index != first
+        pool.release(index)
+
+
+def test_rate_limited_key_cools_down_but_permanent_error_does_not():
+    pool = KeyPool(["a"], requests_per_minute=1000, cooldown_seconds=60)
+    index = pool.acquire()
+    pool.release(index, error=Exception("400 models/x is not supported for generateContent"))
+    assert pool.acquire(timeout=0.1) == index
+    pool.release(index, error=FakeAPIError(429, "Resource has been exhausted (e.g. check quota)."))
+    with pytest.raises(NoKeyAvailableError):
+        pool.acquire(timeout=0.1)
+
+
+def test_cancelled_call_frees_slot_without_changing_health_or_breaker():
+    pool = KeyPool(["a"], requests_per_minute=1000, max_in_flight=1, failure_threshold=1, breaker_open_seconds=0)
+    index = pool.acquire()
+    pool.release(index, error=FakeAPIError(500, "internal"))
+    health = pool.status()[0]['health']
+
+    # Half-open trial request abandoned by the caller: the breaker stays half-open
+    index = pool.acquire(timeout=0.1)
+    pool.release(index, cancelled=True)
+    status = pool.status()[0]
+    assert (status['successes'], status['cancelled'], status['in_flight']) == (0, 1, 0)
+    assert status['health'] == health and status['circuit'] == CircuitBreaker.HALF_OPEN
+    # ...and lets the next trial through
+    pool.release(pool.acquire(timeout=0.1))
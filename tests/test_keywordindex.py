@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+import keywordindex
+from keywordindex import KeywordIndex, ALWAYS, REFRESH, SKIP, normalize_keyword, normalize_title
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = KeywordIndex(str(tmp_path / "posts.db"))
+    yield index
+    index.close()
+
+
+def test_normalization_ignores_case_accents_punctuation_and_word_order():
+    assert normalize_keyword("Tips Kopi") == normalize_keyword("kopi  tips!") == "kopi tips"
+    assert normalize_keyword("Café Crème") == "cafe creme"
+    assert normalize_title("Tips  Kopi: Panduan!") == "tips kopi panduan"
+
+
+def test_select_skips_known_keywords_and_duplicates(index):
+    index.record("kopi susu", {"id": "kopi-susu", "title": "Kopi Susu"})
+
+    selection = index.select(["Susu Kopi", "teh tarik", "Teh  Tarik!", ""], SKIP)
+
+    assert selection == {'generate': ["teh tarik"], 'refresh': [], 'skip': ["Susu Kopi", "Teh  Tarik!", ""]}
+
+
+def test_refresh_regenerates_only_entries_older_than_refresh_days(index, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(keywordindex.time, "time", lambda: now - 40 * 24 * 3600)
+    index.record("kopi susu", {"id": "kopi-susu", "title": "Kopi Susu"})
+    monkeypatch.setattr(keywordindex.time, "time", lambda: now)
+    index.record("teh tarik", {"id": "teh-tarik", "title": "Teh Tarik"})
+
+    selection = index.select(["kopi susu", "teh tarik"], REFRESH, refresh_days=31)
+
+    assert selection == {'generate': ["kopi susu"], 'refresh': ["kopi susu"], 'skip': ["teh tarik"]}
+    assert index.select(["kopi susu", "teh tarik"], ALWAYS)['generate'] == ["kopi susu", "teh tarik"]
+    with pytest.raises(ValueError):
+        index.select(["kopi susu"], "sometimes")
+
+
+def test_record_replaces_entry_and_counts_generations(index):
+    index.record("kopi susu", {"id": "kopi-susu", "title": "Kopi Susu"})
+    index.record("Susu Kopi", {"id": "kopi-susu", "title": "Kopi Susu Terbaru"})
+
+    entry = index.lookup("kopi susu")
+    assert entry['generations'] == 2
+    assert entry['keyword'] == "Susu Kopi"
+    assert entry['normalized_title'] == "kopi susu terbaru"
+    assert index.title_owner("KOPI SUSU terbaru!") == "Susu Kopi"
+    assert index.title_owner("Teh Tarik") is None
+    assert index.count() == 1
+
+
+def test_backfill_indexes_keyword_posts_once(index):
+    posts = [
+        {"id": "kopi-susu", "title": "Kopi Susu", "keyword": "kopi susu", "scheduled_at": "2024-01-02T03:04:05.123"},
+        {"id": "manual", "title": "Tanpa Keyword"},
+    ]
+    index.record("teh tarik", {"id": "teh-tarik", "title": "Teh Tarik"})
+
+    assert index.backfill(posts + [{"id": "other", "title": "Lain", "keyword": "teh tarik"}]) == 1
+    assert index.backfill(posts) == 0
+    assert index.lookup("teh tarik")['post_id'] == "teh-tarik"
+    assert time.localtime(index.lookup("kopi susu")['generated_at']).tm_year == 2024
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from pipeline import Pipeline
+
+
+def test_items_flow_through_multi_worker_stages():
+    pipeline = Pipeline("test")
+    pipeline.add_stage("double", lambda x: x * 2, workers=3, queue_size=2)
+    pipeline.add_stage("inc", lambda x: x + 1, workers=2, queue_size=2)
+
+    results = pipeline.run(range(50))
+
+    assert sorted(results) == [x * 2 + 1 for x in range(50)]
+    stats = {s['stage']: s for s in pipeline.stats()}
+    assert stats['source']['processed'] == 50
+    assert stats['double']['processed'] == stats['inc']['processed'] == 50
+    assert stats['double']['max_queue_depth'] <= 2
+
+
+def test_none_drops_and_exceptions_fail_only_that_item():
+    def check(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return None if x % 2 else x
+
+    pipeline = Pipeline("test")
+    pipeline.add_stage("check", check, workers=2)
+    pipeline.add_stage("keep", lambda x: x)
+
+    assert sorted(pipeline.run(range(8))) == [0, 2, 4, 6]
+    stats = {s['stage']: s for s in pipeline.stats()}
+    assert stats['check']['failed'] == 1
+    assert stats['check']['dropped'] == 3
+    assert stats['keep']['processed'] == 4
+
+
+def test_failing_source_still_drains_and_stops_every_worker():
+    def source():
+        yield 1
+        yield 2
+        raise RuntimeError("generator died")
+
+    before = threading.active_count()
+    pipeline = Pipeline("test")
+    pipeline.add_stage("slow", lambda x: time.sleep(0.01) or x, workers=3)
+    pipeline.add_stage("last", lambda x: x, workers=2)
+
+    assert sorted(pipeline.run(source())) == [1, 2]
+    assert pipeline.source_stats.failed == 1
+    assert threading.active_count() == before
+
+
+def test_without_stages_run_returns_the_source():
+    assert Pipeline("test").run(iter([1, 2])) == [1, 2]
@@ -0,0 +1,71 @@
+import json
+
+from poststore import PostStore
+
+
+def test_import_legacy_reads_posts_json_into_an_empty_store(tmp_path):
+    snapshot = tmp_path / "posts.json"
+    snapshot.write_text(json.dumps([{"id": "a", "title": "A"}, {"id": "b", "title": "B"}]))
+    store = PostStore(str(tmp_path / "posts.db"))
+
+    assert store.import_legacy(str(snapshot)) == 2
+    assert [post['id'] for post in store.all()] == ["a", "b"]
+    # Only an empty store imports
+    assert store.import_legacy(str(snapshot)) == 0
+    store.close()
+
+
+def make_store(tmp_path):
+    return PostStore(str(tmp_path / "posts.db"))
+
+
+def test_add_suffixes_taken_ids_instead_of_overwriting(tmp_path):
+    store = make_store(tmp_path)
+    first = {"id": "tips-kopi", "title": "Tips Kopi", "keyword": "kopi"}
+    second = {"id": "tips-kopi", "title": "Tips Kopi!", "keyword": "kopi tubruk"}
+    third = {"id": "tips-kopi", "title": "Tips Kopi?", "keyword": "kopi susu"}
+
+    assert store.add(first) == "tips-kopi"
+    assert store.add_many([second, third]) == ["tips-kopi-2", "tips-kopi-3"]
+
+    assert second["id"] == "tips-kopi-2"
+    assert [post["keyword"] for post in store.all()] == ["kopi", "kopi tubruk", "kopi susu"]
+    assert store.get("tips-kopi-3")["id"] == "tips-kopi-3"
+    store.close()
+
+
+def test_upsert_updates_in_place_and_replaces_tags(tmp_path):
+    store = make_store(tmp_path)
+    store.add_many([{"id": "a", "title": "A", "tags": ["x"]}, {"id": "b", "title": "B", "tags": ["x"]}])
+
+    assert store.upsert({"id": "a", "title": "A2", "tags": ["y"]})
+
+    assert [post["title"] for post in store.all()] == ["A2", "B"]
+    assert store.count(tag="x") == 1 and store.count(tag="y") == 1
+    assert store.tags() == ["x", "y"]
+    store.close()
+
+
+def test_delete_removes_tags(tmp_path):
+    store = make_store(tmp_path)
+    store.add({"id": "a", "title": "A", "tags": ["x"]})
+
+    assert store.delete("a")
+    assert not store.delete("a")
+    assert store.tags() == []
+    store.close()
+
+
+def test_title_search_folds_non_ascii_case(tmp_path):
+    store = make_store(tmp_path)
+    store.add_many([
+        {"id": "a", "title": "ÉCLAIR Kopi Café"},
+        {"id": "b", "title": "Straße Kopi"},
+        {"id": "c", "title": "Teh Tarik"},
+    ])
+
+    assert [post["id"] for post in store.query(title_contains="éclair")] == ["a"]
+    assert [post["id"] for post in store.query(title_contains="CAFÉ")] == ["a"]
+    assert [post["id"] for post in store.query(title_contains="strasse")] == ["b"]
+    assert store.count(title_contains="kopi") == 2
+    store.close()
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from backends import GeminiBackend
+from fake_backends import FakeAPIError
+from gemini import GeminiScraper
+from keypool import NoKeyAvailableError
+from retry import RetryPolicy, is_retryable_error
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class ScriptedBackend(GeminiBackend):
+    """Raises the scripted errors in order, then answers."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate_content(self, api_key, prompt, generation_config, stream=False):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return _Response("ok")
+
+
+def make_scraper(backend, max_attempts=4):
+    scraper = GeminiScraper(api_keys=["a", "b"], backend=backend, cache=False)
+    scraper.retry_policy = RetryPolicy(max_attempts=max_attempts, base_delay=0.001, max_delay=0.002)
+    return scraper
+
+
+def test_delay_is_full_jitter_capped_by_max_delay():
+    policy = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=4.0, rng=random.Random(1))
+    for attempt in range(6):
+        ceiling = min(4.0, 2 ** attempt)
+        assert all(0 <= policy.delay(attempt) <= ceiling for _ in range(50))
+
+
+def test_should_retry_stops_after_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+    error = FakeAPIError(503, "The service is currently unavailable.")
+    assert policy.should_retry(0, error)
+    assert policy.should_retry(1, error)
+    assert not policy.should_retry(2, error)
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (FakeAPIError(429, "Resource has been exhausted (e.g. check quota)."), True),
+    (FakeAPIError(500, "An internal error has occurred."), True),
+    (TimeoutError("The read operation timed out"), True),
+    (FakeAPIError(400, "models/x is not supported for generateContent"), False),
+    (FakeAPIError(401, "Request had invalid authentication credentials"), False),
+    (FakeAPIError(403, "API key not valid"), False),
+    (NoKeyAvailableError("No API key available within 5s"), False),
+])
+def test_is_retryable_error(error, retryable):
+    assert is_retryable_error(error) is retryable
+
+
+def test_transient_errors_are_retried_until_success():
+    backend = ScriptedBackend([FakeAPIError(500, "internal"), FakeAPIError(503, "unavailable")])
+    assert make_scraper(backend)._call_model("prompt", 10) == "ok"
+    assert backend.calls == 3
+
+
+def test_permanent_errors_fail_fast():
+    backend = ScriptedBackend([FakeAPIError(400, "models/x is not supported for generateContent")])
+    with pytest.raises(FakeAPIError):
+        make_scraper(backend)._call_model("prompt", 10)
+    assert backend.calls == 1
@@ -0,0 +1,51 @@
+from runjournal import RunJournal, GENERATED, SAVED, FAILED, DEPLOYED
+
+
+def test_crashed_run_resumes_with_its_own_keywords_and_settings(tmp_path):
+    path = str(tmp_path / "runs.db")
+    journal = RunJournal(path)
+    run = journal.start_or_resume(["a", "b", "c", "a"], {"language": "id"})
+    journal.mark(run['id'], "a", GENERATED, post={"id": "post-a", "keyword": "a"})
+    journal.mark(run['id'], "a", SAVED)
+    journal.mark(run['id'], "b", GENERATED, post={"id": "post-b", "keyword": "b"})
+    journal.close()  # the process dies here, the run is never finished
+
+    journal = RunJournal(path)
+    resumed = journal.start_or_resume(["x"], {"language": "en"})
+
+    assert resumed == {'id': run['id'], 'settings': {"language": "id"}, 'resumed': True}
+    assert journal.keywords_to_generate(run['id']) == ["c"]
+    assert journal.generated_posts(run['id']) == [{"id": "post-b", "keyword": "b"}]
+    assert not journal.is_complete(run['id'], deploy=False)
+    journal.close()
+
+
+def test_failed_keywords_are_retried_until_max_attempts(tmp_path):
+    journal = RunJournal(str(tmp_path / "runs.db"), max_attempts=2)
+    run_id = journal.start_or_resume(["a"], {})['id']
+
+    journal.mark(run_id, "a", FAILED, error="quota")
+    assert journal.keywords_to_generate(run_id) == ["a"]
+    journal.mark(run_id, "a", FAILED, error="quota")
+    assert journal.keywords_to_generate(run_id) == []
+    assert journal.is_complete(run_id, deploy=False)
+    journal.close()
+
+
+def test_deploy_completes_a_run_and_finish_starts_a_new_one(tmp_path):
+    journal = RunJournal(str(tmp_path / "runs.db"))
+    run_id = journal.start_or_resume(["a", "b"], {})['id']
+    for keyword in ("a", "b"):
+        journal.mark(run_id, keyword, GENERATED, post={"id": keyword})
+        journal.mark(run_id, keyword, SAVED, post={"id": f"{keyword}-2"})
+
+    assert journal.is_complete(run_id, deploy=False)
+    assert not journal.is_complete(run_id, deploy=True)
+    assert journal.mark_deployed(run_id) == 2
+    assert journal.counts(run_id)[DEPLOYED] == 2
+    assert journal.is_complete(run_id, deploy=True)
+
+    journal.finish(run_id)
+    assert journal.latest_run()['finished_at'] is not None
+    assert journal.start_or_resume(["c"], {})['resumed'] is False
+    journal.close()
@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from keywordindex import KeywordIndex
+from runjournal import RunJournal, GENERATED, SAVED
+from scheduler import ScheduledArticleGenerator
+
+
+def make_generator(workdir, **config):
+    config_file = workdir / "scheduler_config.json"
+    config_file.write_text(json.dumps(dict({
+        "keywords": ["kopi susu", "teh tarik"],
+        "auto_deploy": False,
+        "run_journal_path": str(workdir / "runs.db"),
+    }, **config)))
+    return ScheduledArticleGenerator(str(config_file))
+
+
+@pytest.mark.parametrize("resume_runs", [True, False])
+def test_index_and_journal_are_closed_when_the_run_fails(workdir, monkeypatch, resume_runs):
+    closed = []
+    for cls in (KeywordIndex, RunJournal):
+        close = cls.close
+        monkeypatch.setattr(cls, "close", lambda self, close=close, cls=cls: (closed.append(cls), close(self)))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("pipeline crashed")
+
+    generator = make_generator(workdir, resume_runs=resume_runs)
+    monkeypatch.setattr(generator, "run_pipeline", fail)
+    generator.run_scheduled_generation()
+
+    assert sorted(cls.__name__ for cls in closed) == (["KeywordIndex", "RunJournal"] if resume_runs else ["KeywordIndex"])
+
+
+class OneTitleGemini:
+    """Every keyword gets the same article title, so the title slugs collide."""
+
+    api_keys = ["a"]
+
+    def generate_structured_article(self, topic, language="id", writing_style="informatif", use_cache=True):
+        return "# Panduan Lengkap Kopi\n\n" + f"Artikel tentang {topic}. " * 30
+
+    generate_article = generate_structured_article
+
+
+def test_colliding_titles_are_saved_as_separate_posts_and_refresh_updates_in_place(workdir):
+    from poststore import get_shared_store
+
+    generator = make_generator(workdir, concurrent_generation=False)
+    index = KeywordIndex("posts.db")
+    generator.run_pipeline(["kopi susu", "kopi tubruk"], gemini=OneTitleGemini(), save=True, index=index)
+
+    store = get_shared_store()
+    posts = store.all()
+    assert [post['id'] for post in posts] == ["panduan-lengkap-kopi", "panduan-lengkap-kopi-2"]
+    assert [post['keyword'] for post in posts] == ["kopi susu", "kopi tubruk"]
+
+    # Regenerating a keyword replaces its own post, not the other one
+    generator.run_pipeline(["kopi tubruk"], gemini=OneTitleGemini(), save=True, index=index)
+    assert [post['keyword'] for post in store.all()] == ["kopi susu", "kopi tubruk"]
+    assert index.lookup("kopi tubruk")['generations'] == 2
+    index.close()
+
+
+class CountingGemini:
+    api_keys = ["a"]
+
+    def __init__(self):
+        self.topics = []
+
+    def generate_structured_article(self, topic, language="id", writing_style="informatif", use_cache=True):
+        self.topics.append(topic)
+        return f"# Artikel {topic}\n\n" + f"Isi tentang {topic}. " * 30
+
+    def close(self):
+        pass
+
+
+def test_interrupted_run_resumes_without_regenerating_finished_keywords(workdir, monkeypatch):
+    import scheduler
+    from poststore import get_shared_store
+
+    # State left by a run that died after saving "kopi susu" and generating "teh tarik"
+    journal = RunJournal(str(workdir / "runs.db"))
+    run = journal.start_or_resume(["kopi susu", "teh tarik", "es cendol"],
+                                  {"language": "id", "category": "Kuliner", "writing_style": "santai"})
+    saved = {"id": "artikel-kopi-susu", "title": "Artikel kopi susu", "keyword": "kopi susu"}
+    get_shared_store().add(saved)
+    journal.mark(run['id'], "kopi susu", GENERATED, post=saved)
+    journal.mark(run['id'], "kopi susu", SAVED)
+    journal.mark(run['id'], "teh tarik", GENERATED,
+                 post={"id": "artikel-teh-tarik", "title": "Artikel teh tarik", "keyword": "teh tarik"})
+    journal.close()
+
+    gemini = CountingGemini()
+    monkeypatch.setattr(scheduler, "GeminiScraper", lambda: gemini)
+    make_generator(workdir, keywords=["kopi susu", "teh tarik", "es cendol"], keyword_policy="always",
+                   concurrent_generation=False).run_scheduled_generation()
+
+    assert gemini.topics == ["es cendol"]
+    assert sorted(post['keyword'] for post in get_shared_store().all()) == ["es cendol", "kopi susu", "teh tarik"]
+    assert get_shared_store().get("artikel-es-cendol")['category'] == "Kuliner"
+    journal = RunJournal(str(workdir / "runs.db"))
+    latest = journal.latest_run()
+    assert latest['id'] == run['id'] and latest['finished_at'] is not None
+    assert latest['counts'][SAVED] == 3
+    journal.close()
+
+
+def test_second_scheduled_run_skips_already_generated_keywords(workdir, monkeypatch):
+    import scheduler
+
+    gemini = CountingGemini()
+    monkeypatch.setattr(scheduler, "GeminiScraper", lambda: gemini)
+    generator = make_generator(workdir, keyword_policy="skip", concurrent_generation=False)
+
+    generator.run_scheduled_generation()
+    assert sorted(gemini.topics) == ["kopi susu", "teh tarik"]
+
+    gemini.topics.clear()
+    generator.run_scheduled_generation()
+    assert gemini.topics == []
+
+
+def test_owned_gemini_is_closed_when_the_pipeline_fails(workdir, monkeypatch):
+    import scheduler
+
+    closed = []
+    gemini = CountingGemini()
+    gemini.close = lambda: closed.append(True)
+    monkeypatch.setattr(scheduler, "GeminiScraper", lambda: gemini)
+    generator = make_generator(workdir, concurrent_generation=False)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("pipeline crashed")
+
+    monkeypatch.setattr(generator, "_build_pipeline", fail)
+    assert generator.run_pipeline(["kopi susu"]) == []
+    assert closed == [True]
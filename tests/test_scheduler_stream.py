@@ -0,0 +1,55 @@
+import json
+import threading
+
+import bingimage
+from scheduler import ScheduledArticleGenerator
+
+
+class StreamingGemini:
+    """Streams a title line, then the body only once the image lookup has started (or 2s passed)."""
+
+    api_keys = ["a"]
+
+    def __init__(self, lookup_started):
+        self.lookup_started = lookup_started
+        self.overlapped = []
+
+    def generate_article_stream(self, topic, language="id", writing_style="informatif", use_cache=True):
+        yield f"# Panduan {topic}\n"
+        self.overlapped.append(self.lookup_started.wait(2))
+        yield "Isi artikel yang cukup panjang. " * 20
+
+
+class FakeScraper:
+    def __init__(self, lookup_started):
+        self.lookup_started = lookup_started
+        self.queries = []
+
+    def get_post_images(self, query, max_images=3, verify=None):
+        self.queries.append(query)
+        self.lookup_started.set()
+        return [f"https://example.com/{query.replace(' ', '-')}.jpg"]
+
+    def get_connection_stats(self):
+        return {'requests': 0, 'connections': 0, 'reuse_rate': 0.0, 'hosts': 0}
+
+
+def test_streamed_article_starts_image_lookup_before_stream_ends(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / "scheduler_config.json"
+    config_file.write_text(json.dumps({
+        "concurrent_generation": False,
+        "stream_generation": True,
+        "include_images": True,
+        "max_images_per_post": 1,
+    }))
+    lookup_started = threading.Event()
+    scraper = FakeScraper(lookup_started)
+    monkeypatch.setattr(bingimage, "get_shared_scraper", lambda: scraper)
+    gemini = StreamingGemini(lookup_started)
+
+    posts = ScheduledArticleGenerator(str(config_file)).run_pipeline(["kopi susu"], gemini=gemini)
+
+    assert gemini.overlapped == [True]
+    assert scraper.queries == ["kopi susu"]
+    assert len(posts) == 1 and posts[0]['image']['url'] == "https://example.com/kopi-susu.jpg"
@@ -0,0 +1,78 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+TEMPLATES = ["business", "corporate", "magazine", "minimal", "modern", "tech"]
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is needed to render the templates")
+
+# Just enough of the Workers runtime to load a template and call its page functions
+RUNTIME_STUBS = """
+globalThis.addEventListener = () => {};
+globalThis.Response = class Response {
+  constructor(body, init) { this.body = body; this.init = init; }
+};
+"""
+
+RENDER_HOME = """
+Promise.resolve(getHomePage('https://example.com/')).then(response => {
+  process.stdout.write(typeof response === 'string' ? response : response.body);
+});
+"""
+
+POSTS = [
+    {
+        "id": "kopi-susu",
+        "title": "Kopi Susu",
+        "date": "2026-10-01",
+        "author": "Admin",
+        "category": "Minuman",
+        "tags": ["kopi"],
+        "excerpt": "Resep kopi susu.",
+        "content": "Isi artikel.",
+        "image": {
+            "url": "https://images.example.com/kopi-full.jpg",
+            "thumbnail": "https://tse1.mm.bing.net/th?id=kopi&w=600",
+            "width": 1600,
+            "height": 1067,
+        },
+    },
+    {
+        "id": "teh-tarik",
+        "title": "Teh Tarik",
+        "date": "2026-09-30",
+        "author": "Admin",
+        "category": "Minuman",
+        "tags": ["teh"],
+        "excerpt": "Resep teh tarik.",
+        "content": "Isi artikel.",
+    },
+]
+
+
+def render_home(tmp_path, name):
+    with open(os.path.join(TEMPLATES_DIR, f"{name}_template.js"), encoding="utf-8") as f:
+        script = f.read()
+    script = script.replace("{{POSTS_DATA}}", json.dumps(POSTS)).replace("{{ADS_CONFIG}}", "{}")
+    path = tmp_path / f"{name}.js"
+    path.write_text(RUNTIME_STUBS + script + RENDER_HOME, encoding="utf-8")
+    result = subprocess.run(["node", str(path)], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+@pytest.mark.parametrize("name", TEMPLATES)
+def test_home_page_cards_show_lazy_thumbnail_not_full_image(tmp_path, name):
+    page = render_home(tmp_path, name)
+
+    thumbnails = re.findall(r'<div class="post-thumbnail">.*?</div>', page, re.S)
+    assert len(thumbnails) == 1
+    assert 'src="https://tse1.mm.bing.net/th?id=kopi&w=600"' in thumbnails[0]
+    assert 'loading="lazy"' in thumbnails[0] and 'width="1600" height="1067"' in thumbnails[0]
+    assert "kopi-full.jpg" not in page
+    assert "Teh Tarik" in page
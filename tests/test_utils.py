@@ -0,0 +1,38 @@
+import re
+
+from bingimage import BingImageScraper
+from fake_backends import FakeBingBackend
+from utils import image_tag, insert_images_to_content, lead_image
+
+
+def download(tmp_path, monkeypatch, formats=("webp", "jpeg")):
+    monkeypatch.chdir(tmp_path)
+    scraper = BingImageScraper(backend=FakeBingBackend(time_scale=0, image_size=(1600, 1067), seed=3),
+                               cache=False, store=False)
+    scraper.image_processor.formats = formats
+    scraper.image_processor.max_workers = 1
+    return scraper.download_images("kopi susu", max_images=2, max_workers=2)
+
+
+def test_downloaded_assets_embed_as_picture_with_webp_and_jpeg_srcsets(tmp_path, monkeypatch):
+    assets = download(tmp_path, monkeypatch)
+    assert assets and all(asset['variants'] for asset in assets)
+
+    tag = image_tag(assets[0], "Kopi <susu>", url_for=lambda v: "https://cdn.example.com/" + v['path'])
+
+    webp = re.search(r'<source type="image/webp" srcset="([^"]+)"', tag).group(1)
+    jpeg = re.search(r'<img src="[^"]+\.jpg" srcset="([^"]+)"', tag).group(1)
+    assert [entry.split()[1] for entry in webp.split(", ")] == ["320w", "640w", "960w", "1200w"]
+    assert all(entry.split()[0].endswith(".jpg") for entry in jpeg.split(", "))
+    assert 'width="1200" height="800"' in tag and 'alt="Kopi &lt;susu&gt;"' in tag
+
+
+def test_assets_work_for_content_and_listing_card(tmp_path, monkeypatch):
+    assets = download(tmp_path, monkeypatch, formats=("webp",))
+
+    content = insert_images_to_content("Pembuka.\n\nIsi.\n\nPenutup.", assets, "kopi")
+    card = lead_image(assets)
+
+    assert content.count("<picture>") == 1 and "<source" not in content
+    assert card['url'].endswith(".webp") and card['thumbnail'].endswith("-320w.webp")
+    assert (card['width'], card['height']) == (1200, 800)
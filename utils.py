@@ -4,9 +4,10 @@ Utility functions for the blog system.
 
 import re
 import os
+import html
 import logging
 from urllib.parse import urlparse
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 def clean_filename(filename: str) -> str:
     """Clean filename for safe file operations."""
@@ -36,6 +37,20 @@ def is_valid_image_url(url: str) -> bool:
     except Exception:
         return False
 
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """Detect the image MIME type from the first bytes of a file (None if not an image)."""
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data.startswith(b'BM'):
+        return 'image/bmp'
+    return None
+
 def setup_logging(level=logging.INFO) -> logging.Logger:
     """Setup logging configuration."""
     logging.basicConfig(
@@ -71,6 +86,28 @@ def extract_excerpt_from_content(content: str, max_length: int = 200) -> str:
     
     return excerpt.strip() or clean_content[:max_length] + "..."
 
+def split_title_and_content(article_content: str, default_title: str) -> Tuple[str, str]:
+    """Split generated markdown into (title, content) using its first heading or short line."""
+    lines = article_content.split('\n')
+    title = default_title
+    content_start = 0
+    
+    for i, line in enumerate(lines):
+        if line.strip():
+            # Check if it's a heading
+            if line.startswith('#'):
+                title = line.replace('#', '').strip()
+                content_start = i + 1
+                break
+            elif len(line.strip()) < 100:  # Likely a title
+                title = line.strip()
+                content_start = i + 1
+                break
+    
+    # Get content without title
+    content = '\n'.join(lines[content_start:]).strip()
+    return title, content
+
 def generate_post_id(title: str) -> str:
     """Generate URL-friendly post ID from title."""
     # Convert to lowercase and replace spaces with hyphens
@@ -80,3 +117,144 @@ def generate_post_id(title: str) -> str:
     post_id = post_id.strip('-')                # Remove leading/trailing hyphens
     
     return post_id[:50]  # Limit length
+
+IMAGE_STYLE = "width: 100%; max-width: 600px; height: auto; border-radius: 8px; margin: 1rem 0;"
+IMAGE_SIZES = "(max-width: 600px) 100vw, 600px"
+
+def _variant_url(variant: Dict) -> str:
+    return variant.get('url') or variant['path'].replace(os.sep, '/')
+
+def _primary_variant(asset: Dict) -> Dict:
+    """The variant written to the asset's own path (widest JPEG, or widest of the first format)."""
+    for variant in asset['variants']:
+        if variant['path'] == asset['path']:
+            return variant
+    return max(asset['variants'], key=lambda v: v['width'])
+
+def picture_tag(asset: Dict, alt: str, lazy: bool = True, url_for: Optional[Callable[[Dict], str]] = None) -> str:
+    """
+    Build a <picture> for a downloaded image (BingImageScraper.download_images() asset).
+    
+    Every format except the primary one becomes a <source> with a width
+    srcset (WebP first, so browsers that support it never fetch the JPEG);
+    the <img> serves the primary format's widths.
+    
+    Args:
+        asset (dict): Asset with "path", "width", "height" and "variants"
+        alt (str): Alt text
+        lazy (bool): Add loading="lazy"
+        url_for (callable): Maps a variant to its public URL (default: its url, else its path)
+    """
+    from imageproc import FORMAT_MIME_TYPES, build_srcset
+    
+    url_for = url_for or _variant_url
+    variants = asset['variants']
+    primary = _primary_variant(asset)
+    sources = ''.join(
+        f'<source type="{FORMAT_MIME_TYPES[fmt]}" '
+        f'srcset="{html.escape(build_srcset(variants, fmt, url_for), quote=True)}" sizes="{IMAGE_SIZES}">'
+        for fmt in dict.fromkeys(v['format'] for v in variants) if fmt != primary['format']
+    )
+    srcset = html.escape(build_srcset(variants, primary['format'], url_for), quote=True)
+    loading = 'loading="lazy" ' if lazy else ''
+    return (
+        f'<picture>{sources}<img src="{html.escape(url_for(primary), quote=True)}" srcset="{srcset}" '
+        f'sizes="{IMAGE_SIZES}" width="{primary["width"]}" height="{primary["height"]}" '
+        f'alt="{html.escape(alt, quote=True)}" {loading}decoding="async" style="{IMAGE_STYLE}"></picture>'
+    )
+
+def image_tag(image: Union[str, Dict], alt: str, lazy: bool = True,
+              url_for: Optional[Callable[[Dict], str]] = None) -> str:
+    """
+    Build an <img> tag for a post image.
+    
+    ``image`` is either a plain URL, a dict from
+    BingImageScraper.get_post_images() or a downloaded asset (see
+    picture_tag). For get_post_images() dicts, the small Bing thumbnail
+    is the src and the full image is only offered through srcset, so
+    browsers download it only when it is actually displayed large.
+    Explicit width/height let the browser reserve space before loading.
+    """
+    if isinstance(image, dict) and image.get('variants'):
+        return picture_tag(image, alt, lazy, url_for)
+    alt = html.escape(alt, quote=True)
+    loading = 'loading="lazy" ' if lazy else ''
+    if isinstance(image, str):
+        return f'<img src="{html.escape(image, quote=True)}" alt="{alt}" {loading}decoding="async" style="{IMAGE_STYLE}">'
+    
+    url = html.escape(image['url'], quote=True)
+    thumbnail = html.escape(image.get('thumbnail') or '', quote=True)
+    width, height = image.get('width') or 0, image.get('height') or 0
+    thumbnail_width = image.get('thumbnail_width') or 0
+    
+    attributes = [f'src="{thumbnail or url}"']
+    if thumbnail:
+        if thumbnail_width and width > thumbnail_width:
+            attributes.append(f'srcset="{thumbnail} {thumbnail_width}w, {url} {width}w"')
+            attributes.append(f'sizes="{IMAGE_SIZES}"')
+        elif not thumbnail_width:
+            # Thumbnail size unknown: treat it as the 1x image
+            attributes.append(f'srcset="{thumbnail} 1x, {url} 2x"')
+    if width and height:
+        attributes.append(f'width="{width}" height="{height}"')
+    return f'<img {" ".join(attributes)} alt="{alt}" {loading}decoding="async" style="{IMAGE_STYLE}">'
+
+def lead_image(images: List[Union[str, Dict]], url_for: Optional[Callable[[Dict], str]] = None) -> Optional[Dict]:
+    """Listing card image for a post (thumbnail, full URL and size), or None."""
+    if not images:
+        return None
+    image = images[0]
+    if isinstance(image, str):
+        return {'url': image, 'thumbnail': image, 'width': 0, 'height': 0}
+    if image.get('variants'):
+        # Downloaded asset: the smallest variant of the primary format is the card thumbnail
+        url_for = url_for or _variant_url
+        primary = _primary_variant(image)
+        smallest = min((v for v in image['variants'] if v['format'] == primary['format']), key=lambda v: v['width'])
+        return {
+            'url': url_for(primary),
+            'thumbnail': url_for(smallest),
+            'width': primary['width'],
+            'height': primary['height'],
+        }
+    return {
+        'url': image['url'],
+        'thumbnail': image.get('thumbnail') or image['url'],
+        'width': image.get('width') or 0,
+        'height': image.get('height') or 0,
+    }
+
+def insert_images_to_content(content: str, images: List[Union[str, Dict]], keyword: str,
+                             url_for: Optional[Callable[[Dict], str]] = None) -> str:
+    """
+    Insert images into content at strategic positions.
+    
+    ``images`` are URLs, get_post_images() dicts or download_images() assets
+    (``url_for`` maps an asset variant to its public URL, see picture_tag).
+    """
+    if not images:
+        return content
+
+    lines = content.split('\n')
+    new_lines = []
+    image_index = 0
+
+    # Insert first image after introduction (first paragraph)
+    paragraph_count = 0
+
+    for i, line in enumerate(lines):
+        new_lines.append(line)
+
+        # Check if this is end of a paragraph
+        if line.strip() and i < len(lines) - 1 and not lines[i + 1].strip():
+            paragraph_count += 1
+
+            # Insert image after first paragraph, then every 3 paragraphs
+            if (paragraph_count == 1 or paragraph_count % 3 == 0) and image_index < len(images):
+                new_lines.append("")  # Empty line
+                # The first image is usually in the first screen, so it is not lazy-loaded
+                new_lines.append(image_tag(images[image_index], keyword, lazy=image_index > 0, url_for=url_for))
+                new_lines.append("")  # Empty line
+                image_index += 1
+
+    return '\n'.join(new_lines)
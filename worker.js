@@ -393,6 +393,13 @@ const HTML_TEMPLATE = `
             min-height: 150px;
         }
 
+        .post-thumbnail img {
+            width: 100%;
+            height: 100%;
+            max-height: 200px;
+            object-fit: cover;
+        }
+
         .post-image-placeholder {
             color: white;
             text-align: center;
@@ -1007,9 +1014,13 @@ function getHomePage() {
   const postsHtml = posts.map((post, index) => `
     <article class="post-card" data-aos="fade-up" data-aos-delay="${index * 100}">
       <div class="post-thumbnail">
+        ${post.image ? `
+        <img src="${post.image.thumbnail}" alt="${post.title}" loading="lazy" decoding="async"${post.image.width && post.image.height ? ` width="${post.image.width}" height="${post.image.height}"` : ''}>
+        ` : `
         <div class="post-image-placeholder">
           <span class="post-number">#${index + 1}</span>
         </div>
+        `}
       </div>
       <div class="post-content-wrapper">
         <h2 class="post-title">